@@ -1,17 +1,38 @@
 'use client';
 
-import React, { useState } from 'react';
+import React, { useState, useRef } from 'react';
 import { motion, AnimatePresence } from 'framer-motion';
 import { XMarkIcon, DocumentTextIcon, CloudArrowUpIcon } from '@heroicons/react/24/outline';
 import { useAuthContext } from '@/contexts/AuthContext';
 
+// CV summaries are generated by a background job; poll its status until it finishes
+const JOB_POLL_INTERVAL_MS = 2000;
+const JOB_POLL_TIMEOUT_MS = 3 * 60 * 1000;
+
 const CVUpload = ({ isOpen, onClose, onUploadSuccess }) => {
     const [file, setFile] = useState(null);
     const [uploading, setUploading] = useState(false);
+    const [processing, setProcessing] = useState(false);
     const [summary, setSummary] = useState('');
     const [error, setError] = useState('');
+    const pollCancelled = useRef(false);
     const { authFetch } = useAuthContext();
 
+    const waitForJob = async (jobId) => {
+        const deadline = Date.now() + JOB_POLL_TIMEOUT_MS;
+        while (!pollCancelled.current && Date.now() < deadline) {
+            const { job } = await authFetch(`/jobs/${jobId}`);
+            if (job.status === 'succeeded') {
+                return job.result;
+            }
+            if (job.status === 'failed') {
+                throw new Error(job.error || 'Failed to process CV');
+            }
+            await new Promise((resolve) => setTimeout(resolve, JOB_POLL_INTERVAL_MS));
+        }
+        return null;
+    };
+
     const handleFileChange = (e) => {
         const selectedFile = e.target.files[0];
         if (selectedFile) {
@@ -43,29 +64,42 @@ const CVUpload = ({ isOpen, onClose, onUploadSuccess }) => {
                 body: formData,
             });
 
-            setSummary(response.summary);
+            // 200 with `unchanged` when this CV is already on file;
+            // otherwise a job_id for the summary being generated
+            let result = response;
+            if (!response.unchanged && response.job_id) {
+                pollCancelled.current = false;
+                setProcessing(true);
+                result = await waitForJob(response.job_id);
+                if (!result) {
+                    if (!pollCancelled.current) {
+                        setError('Your CV was uploaded and is still being processed. Check back shortly for the summary.');
+                    }
+                    return;
+                }
+            }
+
+            setSummary(result.summary);
             
             if (onUploadSuccess) {
-                onUploadSuccess(response);
+                onUploadSuccess(result);
             }
 
-            // Auto-close after 3 seconds of showing summary
-            setTimeout(() => {
-                onClose();
-            }, 3000);
-
         } catch (error) {
             setError(error.message || 'Failed to upload CV');
         } finally {
             setUploading(false);
+            setProcessing(false);
         }
     };
 
     const resetForm = () => {
+        pollCancelled.current = true;
         setFile(null);
         setSummary('');
         setError('');
         setUploading(false);
+        setProcessing(false);
     };
 
     const handleClose = () => {
@@ -167,7 +201,7 @@ const CVUpload = ({ isOpen, onClose, onUploadSuccess }) => {
                                         {uploading ? (
                                             <div className="flex items-center space-x-2">
                                                 <div className="w-4 h-4 border-2 border-white border-t-transparent rounded-full animate-spin"></div>
-                                                <span>Processing...</span>
+                                                <span>{processing ? 'Generating summary...' : 'Uploading...'}</span>
                                             </div>
                                         ) : (
                                             'Upload CV'
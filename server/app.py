@@ -11,6 +11,15 @@ import firebase_admin
 from firebase_admin import credentials, auth
 from utils.cloudinary_storage import init_cloudinary
 from utils.email_service import init_mail
+from utils.counters import init_counters
+from utils.cache import init_response_cache
+from utils.stats import init_aggregate_stats
+from utils.materialized_stats import init_materialized_stats
+from utils.jobs import init_jobs
+from utils.upload_executor import init_upload_executor
+from utils.chunked_upload import init_chunked_uploads
+from utils.upload_limits import init_upload_limits
+from utils.ai_agent import init_ai_agent
 
 load_dotenv()
 
@@ -87,6 +96,56 @@ def create_app():
     except Exception as e:
         print(f"⚠️ Flask-Mail initialization failed: {e}")
 
+    # Initialize buffered project counters
+    try:
+        init_counters(app)
+        print(f"✅ Project counters flushing every {app.config.get('COUNTER_FLUSH_INTERVAL')}s")
+    except Exception as e:
+        print(f"⚠️ Project counter initialization failed: {e}")
+
+    # Initialize response cache
+    try:
+        init_response_cache(app)
+    except Exception as e:
+        print(f"⚠️ Response cache initialization failed: {e}")
+
+    # Initialize admin aggregate stats
+    try:
+        init_aggregate_stats(app)
+        init_materialized_stats(app)
+    except Exception as e:
+        print(f"⚠️ Aggregate stats initialization failed: {e}")
+
+    # Initialize background jobs
+    try:
+        init_jobs(app)
+    except Exception as e:
+        print(f"⚠️ Background job initialization failed: {e}")
+
+    # Initialize concurrent media uploads
+    try:
+        init_upload_executor(app)
+    except Exception as e:
+        print(f"⚠️ Upload executor initialization failed: {e}")
+
+    # Reject oversized uploads before their body is read
+    try:
+        init_upload_limits(app)
+    except Exception as e:
+        print(f"⚠️ Upload size limit initialization failed: {e}")
+
+    # Initialize the spool directory for resumable chunked uploads
+    try:
+        init_chunked_uploads(app)
+    except Exception as e:
+        print(f"⚠️ Chunked upload initialization failed: {e}")
+
+    # Register AI document commands
+    try:
+        init_ai_agent(app)
+    except Exception as e:
+        print(f"⚠️ AI agent command registration failed: {e}")
+
     api = Api(app)
 
     from resources.auth import setup_routes as auth_setup_routes
@@ -99,6 +158,7 @@ def create_app():
     from resources.ai_agent import setup_ai_routes
     from resources.mpesa import setup_routes as mpesa_setup_routes
     from resources.contributions import setup_routes as contributions_setup_routes
+    from resources.jobs import setup_routes as jobs_setup_routes
 
     
     auth_setup_routes(api)
@@ -111,6 +171,7 @@ def create_app():
     setup_ai_routes(api)
     mpesa_setup_routes(api)
     contributions_setup_routes(api)
+    jobs_setup_routes(api)
     
     # ✅ Create default roles on app startup  
     # Use a background function to avoid blocking the main thread
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Project PDF extraction benchmark: serial vs utils/pdf_pipeline.py
+
+Writes synthetic multi-page PDFs to a temporary directory that stands in for
+the Firebase bucket (every read sleeps to simulate download latency), then
+extracts them the old way - download and parse one document at a time - and
+through PdfPipeline, checking that both return the same text in the same order.
+
+Usage:
+    python server/benchmarks/pdf_pipeline_benchmark.py [pdf_count ...]
+
+Defaults to 5, 10 and 20 PDFs. Set BENCH_LATENCY (seconds per download,
+default 0.15) and BENCH_PAGES (pages per PDF, default 40) to vary the load.
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.pdf_pipeline import PdfPipeline, extract_pdf_bytes  # noqa: E402
+
+LATENCY = float(os.getenv('BENCH_LATENCY', 0.15))
+PAGES = int(os.getenv('BENCH_PAGES', 40))
+LINES_PER_PAGE = 45
+
+def build_pdf(seed, pages):
+    """Minimal valid PDF with `pages` pages of Helvetica text"""
+    objects = [
+        b'<< /Type /Catalog /Pages 2 0 R >>',
+        None,  # page tree, filled in below
+        b'<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>',
+    ]
+    kids = []
+    for page in range(pages):
+        lines = [
+            f'({seed}-{page}-{line} project documentation line with some filler text) Tj T*'
+            for line in range(LINES_PER_PAGE)
+        ]
+        stream = ('BT /F1 10 Tf 12 TL 40 800 Td ' + ' '.join(lines) + ' ET').encode()
+        objects.append(b'<< /Length %d >>\nstream\n%s\nendstream' % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] '
+            b'/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>' % content_id
+        )
+        kids.append(len(objects))
+    objects[1] = b'<< /Type /Pages /Kids [%s] /Count %d >>' % (
+        b' '.join(b'%d 0 R' % kid for kid in kids), len(kids)
+    )
+
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += b'%d 0 obj\n%s\nendobj\n' % (number, body)
+    xref = len(out)
+    out += b'xref\n0 %d\n0000000000 65535 f \n' % (len(objects) + 1)
+    for offset in offsets:
+        out += b'%010d 00000 n \n' % offset
+    out += b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n' % (len(objects) + 1, xref)
+    return bytes(out)
+
+class LocalBucket:
+    """Directory standing in for the Firebase bucket, with per-read latency"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def download(self, storage_path):
+        time.sleep(LATENCY)
+        with open(os.path.join(self.root, storage_path), 'rb') as f:
+            return f.read()
+
+def run_serial(bucket, paths):
+    return [extract_pdf_bytes(bucket.download(path))[0] for path in paths]
+
+def run_pipeline(pipeline, bucket, paths):
+    return [result.text for result in pipeline.run(paths, bucket.download)]
+
+def main():
+    counts = [int(arg) for arg in sys.argv[1:]] or [5, 10, 20]
+    print(f"{PAGES} pages per PDF, {LATENCY * 1000:.0f} ms per download, {os.cpu_count()} CPUs\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        bucket = LocalBucket(root)
+        paths = []
+        for i in range(max(counts)):
+            path = f'projects/1/documents/doc_{i}.pdf'
+            os.makedirs(os.path.dirname(os.path.join(root, path)), exist_ok=True)
+            with open(os.path.join(root, path), 'wb') as f:
+                f.write(build_pdf(i, PAGES))
+            paths.append(path)
+
+        configurations = [
+            ('threads only', PdfPipeline(download_workers=8, parse_workers=0)),
+            ('threads + 2 processes', PdfPipeline(download_workers=8, parse_workers=2)),
+            ('threads + 4 processes', PdfPipeline(download_workers=8, parse_workers=4)),
+        ]
+        # Start the worker processes outside the timed runs, as a web worker
+        # would after its first extraction
+        for _, pipeline in configurations:
+            pipeline.run(paths[:1], bucket.download)
+
+        print(f"{'PDFs':>5} {'mode':<24} {'seconds':>8} {'speedup':>8}")
+        for count in counts:
+            batch = paths[:count]
+            started = time.perf_counter()
+            expected = run_serial(bucket, batch)
+            serial = time.perf_counter() - started
+            print(f"{count:>5} {'serial':<24} {serial:>8.2f} {1:>7.1f}x")
+
+            for name, pipeline in configurations:
+                started = time.perf_counter()
+                texts = run_pipeline(pipeline, bucket, batch)
+                elapsed = time.perf_counter() - started
+                assert texts == expected, f"{name} returned different text"
+                print(f"{count:>5} {name:<24} {elapsed:>8.2f} {serial / elapsed:>7.1f}x")
+
+        for _, pipeline in configurations:
+            pipeline.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Project search benchmark: ILIKE '%term%' vs FTS5
+
+Builds an in-memory SQLite projects table with synthetic rows, indexes it the
+same way migration a6d090d9cb26 does, and compares the old triple-ILIKE scan
+with the FTS5 MATCH query used by utils/search.py.
+
+Usage:
+    python server/benchmarks/search_benchmark.py [row_count ...]
+
+Defaults to 10,000 and 100,000 projects.
+"""
+
+import random
+import sqlite3
+import sys
+import time
+
+DOMAIN_WORDS = [
+    'react', 'flask', 'django', 'marketplace', 'payments', 'mpesa', 'inventory',
+    'analytics', 'dashboard', 'mobile', 'android', 'machine', 'learning', 'farm',
+    'health', 'clinic', 'school', 'attendance', 'chat', 'realtime', 'maps',
+    'delivery', 'booking', 'hotel', 'events', 'tickets', 'blockchain', 'wallet',
+    'python', 'javascript', 'postgres', 'firebase', 'tailwind', 'nextjs', 'api',
+]
+# Filler vocabulary so that domain words are as rare as in real descriptions
+FILLER_WORDS = [f'word{i}' for i in range(20_000)]
+DOMAIN_WORD_RATE = 0.02
+
+SEARCHES = ['mpesa', 'react dashboard', 'machine learning', 'hotel booking', 'zzzz']
+REPEAT = 20
+
+ILIKE_QUERY = """
+    SELECT id FROM projects
+    WHERE title LIKE :pattern OR description LIKE :pattern OR tech_stack LIKE :pattern
+"""
+
+FTS_QUERY = """
+    SELECT projects.id FROM projects
+    JOIN (
+        SELECT rowid AS project_id, bm25(projects_fts, 10.0, 1.0, 5.0) AS rank
+        FROM projects_fts WHERE projects_fts MATCH :match
+    ) AS project_search ON project_search.project_id = projects.id
+    ORDER BY project_search.rank
+"""
+
+def build_database(row_count):
+    connection = sqlite3.connect(':memory:')
+    connection.execute(
+        'CREATE TABLE projects (id INTEGER PRIMARY KEY, title TEXT, description TEXT, tech_stack TEXT)'
+    )
+    rng = random.Random(row_count)
+
+    def words(count):
+        return ' '.join(
+            rng.choice(DOMAIN_WORDS) if rng.random() < DOMAIN_WORD_RATE else rng.choice(FILLER_WORDS)
+            for _ in range(count)
+        )
+
+    rows = ((i, words(4), words(120), words(3)) for i in range(1, row_count + 1))
+    connection.executemany('INSERT INTO projects VALUES (?, ?, ?, ?)', rows)
+    connection.execute(
+        "CREATE VIRTUAL TABLE projects_fts USING fts5("
+        "title, description, tech_stack, content='projects', content_rowid='id')"
+    )
+    connection.execute("INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')")
+    connection.commit()
+    return connection
+
+def time_query(connection, sql, params):
+    start = time.perf_counter()
+    for _ in range(REPEAT):
+        connection.execute(sql, params).fetchall()
+    return (time.perf_counter() - start) / REPEAT * 1000
+
+def run(row_count):
+    print(f"\n{row_count:,} projects")
+    print(f"{'search':<20}{'ILIKE ms':>12}{'FTS5 ms':>12}{'speedup':>10}")
+    connection = build_database(row_count)
+    for search in SEARCHES:
+        tokens = search.split()
+        ilike_ms = time_query(connection, ILIKE_QUERY, {'pattern': f'%{search}%'})
+        fts_ms = time_query(connection, FTS_QUERY, {'match': ' '.join(f'"{t}"*' for t in tokens)})
+        print(f"{search:<20}{ilike_ms:>12.2f}{fts_ms:>12.2f}{ilike_ms / fts_ms:>9.1f}x")
+    connection.close()
+
+if __name__ == '__main__':
+    counts = [int(arg) for arg in sys.argv[1:]] or [10_000, 100_000]
+    for count in counts:
+        run(count)
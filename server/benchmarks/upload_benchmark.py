@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Project media upload benchmark: serial loop vs utils/upload_executor.py
+
+Uploads a synthetic submission (3 videos, 5 PDFs, 2 ZIPs and a thumbnail by
+default) to a local directory standing in for Firebase/Cloudinary. Every
+upload pays a fixed request latency plus size / bandwidth, like a network
+transfer, and writes the bytes to disk. Compares the old one-file-at-a-time
+loop with UploadExecutor at several per-request limits.
+
+Usage:
+    python server/benchmarks/upload_benchmark.py [videos pdfs zips]
+
+Set BENCH_LATENCY (seconds per request, default 0.08) and BENCH_MBPS
+(bandwidth per upload in MB/s, default 40) to vary the network.
+"""
+
+import os
+import sys
+import tempfile
+import time
+import uuid
+from io import BytesIO
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+
+from utils.upload_executor import UploadExecutor  # noqa: E402
+
+LATENCY = float(os.getenv('BENCH_LATENCY', 0.08))
+MBPS = float(os.getenv('BENCH_MBPS', 40))
+SIZES = {'video': 12 * 1024 * 1024, 'pdf': 2 * 1024 * 1024, 'zip': 6 * 1024 * 1024, 'thumbnail': 300 * 1024}
+
+class LocalStorage:
+    """Directory standing in for the storage backend"""
+
+    def __init__(self, root):
+        self.root = root
+
+    def upload(self, name, stream):
+        data = stream.read()
+        time.sleep(LATENCY + len(data) / (MBPS * 1024 * 1024))
+        path = os.path.join(self.root, f"{uuid.uuid4()}_{name}")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return True, {'url': f"file://{path}", 'size': len(data)}
+
+def build_submission(videos, pdfs, zips):
+    files = [(f'video_{i}.mp4', SIZES['video']) for i in range(videos)]
+    files += [(f'doc_{i}.pdf', SIZES['pdf']) for i in range(pdfs)]
+    files += [(f'code_{i}.zip', SIZES['zip']) for i in range(zips)]
+    files.append(('thumbnail.png', SIZES['thumbnail']))
+    return [(name, os.urandom(size)) for name, size in files]
+
+def run_serial(storage, files):
+    return [storage.upload(name, BytesIO(data)) for name, data in files]
+
+def run_executor(executor, storage, files):
+    return executor.run([lambda name=name, data=data: storage.upload(name, BytesIO(data)) for name, data in files])
+
+def main():
+    videos, pdfs, zips = [int(arg) for arg in sys.argv[1:4]] if len(sys.argv) >= 4 else (3, 5, 2)
+    files = build_submission(videos, pdfs, zips)
+    total_mb = sum(len(data) for _, data in files) / (1024 * 1024)
+    print(f"{len(files)} files, {total_mb:.1f} MB, {LATENCY * 1000:.0f} ms latency, {MBPS:.0f} MB/s per upload\n")
+
+    with tempfile.TemporaryDirectory() as root:
+        storage = LocalStorage(root)
+
+        started = time.perf_counter()
+        expected = run_serial(storage, files)
+        serial = time.perf_counter() - started
+        print(f"{'mode':<28} {'seconds':>8} {'speedup':>8}")
+        print(f"{'serial':<28} {serial:>8.2f} {1:>7.1f}x")
+
+        for per_request in (2, 4, 8):
+            executor = UploadExecutor(max_workers=8, per_request=per_request)
+            started = time.perf_counter()
+            results = run_executor(executor, storage, files)
+            elapsed = time.perf_counter() - started
+            assert [r[1]['size'] for r in results] == [r[1]['size'] for r in expected], "results out of order"
+            print(f"{f'executor, {per_request} per request':<28} {elapsed:>8.2f} {serial / elapsed:>7.1f}x")
+
+if __name__ == '__main__':
+    main()
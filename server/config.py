@@ -40,6 +40,46 @@ class Config:
                 'pool_pre_ping': True
             }
 
+    # Largest page size list endpoints accept (?per_page= is clamped to this)
+    MAX_PER_PAGE = int(os.getenv('MAX_PER_PAGE', 100))
+    
+    # Project view/click/download counter buffering
+    COUNTER_FLUSH_INTERVAL = int(os.getenv('COUNTER_FLUSH_INTERVAL', 10))  # Seconds, 0 writes every increment immediately
+    COUNTER_BACKEND_URL = os.getenv('COUNTER_BACKEND_URL')  # Optional redis:// URL to share counters across workers
+
+    # Response cache for public project/category endpoints
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', 60))  # Seconds, 0 disables the cache
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', 1024))  # Per worker (in-process backend)
+    # redis:// URL to share the cache across workers; falls back to REDIS_URL. Without one each
+    # worker keeps its own cache and checks the cache_tag_versions table for other workers' writes
+    RESPONSE_CACHE_URL = os.getenv('RESPONSE_CACHE_URL') or os.getenv('REDIS_URL')
+
+    # Admin dashboard counts are memoized per worker for N seconds
+    STATS_CACHE_TTL = int(os.getenv('STATS_CACHE_TTL', 30))
+    
+    # Background jobs (AI summaries, CV processing)
+    # Worker threads per web process, 0 = use `flask jobs-worker`. Production
+    # (FLASK_ENV=production, as in the Dockerfile) runs a separate worker process
+    JOB_EMBEDDED_WORKERS = int(os.getenv('JOB_EMBEDDED_WORKERS', 0 if os.getenv('FLASK_ENV') == 'production' else 1))
+    JOB_MAX_ATTEMPTS = int(os.getenv('JOB_MAX_ATTEMPTS', 3))
+    JOB_RETRY_BASE_DELAY = int(os.getenv('JOB_RETRY_BASE_DELAY', 10))  # Seconds, doubled after every failed attempt
+    JOB_RETRY_MAX_DELAY = int(os.getenv('JOB_RETRY_MAX_DELAY', 600))
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 2))
+    JOB_LOCK_TIMEOUT = int(os.getenv('JOB_LOCK_TIMEOUT', 600))  # Running jobs older than this are retried
+    MEDIA_CLEANUP_MAX_ATTEMPTS = int(os.getenv('MEDIA_CLEANUP_MAX_ATTEMPTS', 10))  # Retries for deleted projects' media
+    PROJECT_SUMMARY_RETRY_INTERVAL = int(os.getenv('PROJECT_SUMMARY_RETRY_INTERVAL', 3600))  # Seconds before a summary job that produced none is queued again
+    
+    # Concurrent media uploads to Firebase/Cloudinary
+    UPLOAD_MAX_WORKERS = int(os.getenv('UPLOAD_MAX_WORKERS', 8))  # Upload threads per web process
+    UPLOAD_MAX_PER_REQUEST = int(os.getenv('UPLOAD_MAX_PER_REQUEST', 4))  # Uploads in flight for one request
+    DIRECT_UPLOAD_EXPIRES = int(os.getenv('DIRECT_UPLOAD_EXPIRES', 900))  # Seconds a signed direct upload URL is valid
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 100 * 1024 * 1024 + 64 * 1024))  # Largest request body: the 100MB video limit plus multipart overhead
+    
+    # Resumable chunked uploads (spooled to local disk until committed)
+    CHUNKED_UPLOAD_DIR = os.getenv('CHUNKED_UPLOAD_DIR')  # Defaults to <tmp>/chunked_uploads
+    CHUNKED_UPLOAD_PART_SIZE = int(os.getenv('CHUNKED_UPLOAD_PART_SIZE', 8 * 1024 * 1024))  # Rounded down to 256 KiB
+    CHUNKED_UPLOAD_TTL = int(os.getenv('CHUNKED_UPLOAD_TTL', 24 * 3600))  # Seconds before an unfinished upload is removed
+    
     # JWT Configuration
     JWT_SECRET_KEY = os.getenv('JWT_SECRET_KEY', 'dev-jwt-secret')
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=24)
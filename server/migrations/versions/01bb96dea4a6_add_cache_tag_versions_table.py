@@ -0,0 +1,28 @@
+"""Add cache_tag_versions table for cross-worker cache invalidation
+
+Revision ID: 01bb96dea4a6
+Revises: 5d82c3b7e649
+Create Date: 2026-10-18 16:02:11.418230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '01bb96dea4a6'
+down_revision = '5d82c3b7e649'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('cache_tag_versions',
+    sa.Column('tag', sa.String(length=255), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('tag')
+    )
+
+
+def downgrade():
+    op.drop_table('cache_tag_versions')
@@ -0,0 +1,34 @@
+"""Add project_text_indexes table for project Q&A retrieval
+
+Revision ID: 3e5b0f8d2a71
+Revises: 97a01cf84624
+Create Date: 2026-10-18 13:22:37.418905
+
+Indexes are built lazily on the first question about a project.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e5b0f8d2a71'
+down_revision = '97a01cf84624'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_text_indexes',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('corpus_hash', sa.String(length=64), nullable=False),
+    sa.Column('chunk_count', sa.Integer(), nullable=False),
+    sa.Column('data', sa.LargeBinary(), nullable=False),
+    sa.Column('built_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('project_id')
+    )
+
+
+def downgrade():
+    op.drop_table('project_text_indexes')
@@ -0,0 +1,42 @@
+"""Add document_texts table for compressed CV text
+
+Revision ID: 5d82c3b7e649
+Revises: c71f4a9e05d2
+Create Date: 2026-10-18 14:48:33.102846
+
+Text stored in ai_documents/<type>/<id>.json blobs before this revision is
+copied in by `flask backfill-document-text`.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5d82c3b7e649'
+down_revision = 'c71f4a9e05d2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('document_texts',
+    sa.Column('file_id', sa.String(length=100), nullable=False),
+    sa.Column('file_type', sa.String(length=20), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('compressed_text', sa.LargeBinary(), nullable=False),
+    sa.Column('text_length', sa.Integer(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='SET NULL'),
+    sa.PrimaryKeyConstraint('file_id')
+    )
+    with op.batch_alter_table('document_texts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_document_texts_user_id'), ['user_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('document_texts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_document_texts_user_id'))
+
+    op.drop_table('document_texts')
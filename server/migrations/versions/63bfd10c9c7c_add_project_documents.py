@@ -0,0 +1,49 @@
+"""Add project_documents table for pre-extracted PDF text
+
+Revision ID: 63bfd10c9c7c
+Revises: 82144713f787
+Create Date: 2026-10-18 12:04:51.220364
+
+PDFs uploaded before this revision have no rows; they are extracted and
+recorded the first time the AI agent reads them.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '63bfd10c9c7c'
+down_revision = '82144713f787'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('project_documents',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('storage_path', sa.String(length=500), nullable=False),
+    sa.Column('url', sa.Text(), nullable=True),
+    sa.Column('content_hash', sa.String(length=64), nullable=True),
+    sa.Column('extracted_text', sa.Text(), nullable=True),
+    sa.Column('page_count', sa.Integer(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('storage_path')
+    )
+    with op.batch_alter_table('project_documents', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_project_documents_project_id'), ['project_id'], unique=False)
+        batch_op.create_index(batch_op.f('ix_project_documents_content_hash'), ['content_hash'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('project_documents', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_project_documents_content_hash'))
+        batch_op.drop_index(batch_op.f('ix_project_documents_project_id'))
+
+    op.drop_table('project_documents')
@@ -0,0 +1,99 @@
+"""Add materialized dashboard stats tables
+
+Revision ID: 82144713f787
+Revises: d63232af19df
+Create Date: 2026-10-18 11:26:40.512907
+
+The tables are seeded from the current data; afterwards they are kept up to
+date by utils/materialized_stats.py and can be recomputed with
+`flask rebuild-stats`.
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '82144713f787'
+down_revision = 'd63232af19df'
+branch_labels = None
+depends_on = None
+
+
+SEED_PROJECT_STATS = """
+    INSERT INTO project_stats_daily
+        (day, total, pending, approved, rejected, featured, contributions, contribution_amount)
+    SELECT
+        :day,
+        (SELECT COUNT(*) FROM projects),
+        (SELECT COUNT(*) FROM projects WHERE status = 'pending'),
+        (SELECT COUNT(*) FROM projects WHERE status = 'approved'),
+        (SELECT COUNT(*) FROM projects WHERE status = 'rejected'),
+        (SELECT COUNT(*) FROM projects WHERE featured),
+        (SELECT COUNT(*) FROM contributions),
+        (SELECT COALESCE(SUM(amount), 0) FROM contributions)
+"""
+
+SEED_SALES_STATS = """
+    INSERT INTO sales_stats_daily
+        (day, total, pending, paid, completed, cancelled, refunded, revenue)
+    SELECT
+        :day,
+        (SELECT COUNT(*) FROM sales),
+        (SELECT COUNT(*) FROM sales WHERE status = 'pending'),
+        (SELECT COUNT(*) FROM sales WHERE status = 'paid'),
+        (SELECT COUNT(*) FROM sales WHERE status = 'completed'),
+        (SELECT COUNT(*) FROM sales WHERE status = 'cancelled'),
+        (SELECT COUNT(*) FROM sales WHERE status = 'refunded'),
+        (SELECT COALESCE(SUM(amount), 0) FROM sales WHERE status = 'completed')
+"""
+
+SEED_USER_COUNTS = """
+    INSERT INTO user_counts (role_id, count)
+    SELECT role_id, COUNT(*) FROM users GROUP BY role_id
+"""
+
+
+def upgrade():
+    op.create_table('project_stats_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.Column('approved', sa.Integer(), nullable=False),
+    sa.Column('rejected', sa.Integer(), nullable=False),
+    sa.Column('featured', sa.Integer(), nullable=False),
+    sa.Column('contributions', sa.Integer(), nullable=False),
+    sa.Column('contribution_amount', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('sales_stats_daily',
+    sa.Column('day', sa.Date(), nullable=False),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('pending', sa.Integer(), nullable=False),
+    sa.Column('paid', sa.Integer(), nullable=False),
+    sa.Column('completed', sa.Integer(), nullable=False),
+    sa.Column('cancelled', sa.Integer(), nullable=False),
+    sa.Column('refunded', sa.Integer(), nullable=False),
+    sa.Column('revenue', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('day')
+    )
+    op.create_table('user_counts',
+    sa.Column('role_id', sa.Integer(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('role_id')
+    )
+
+    # Dated in UTC like utils/materialized_stats._today(), not the database's
+    # CURRENT_DATE, so the first deltas land on the seeded row
+    today = datetime.utcnow().date()
+    op.execute(sa.text(SEED_PROJECT_STATS).bindparams(sa.bindparam('day', today, type_=sa.Date())))
+    op.execute(sa.text(SEED_SALES_STATS).bindparams(sa.bindparam('day', today, type_=sa.Date())))
+    op.execute(SEED_USER_COUNTS)
+
+
+def downgrade():
+    op.drop_table('user_counts')
+    op.drop_table('sales_stats_daily')
+    op.drop_table('project_stats_daily')
@@ -0,0 +1,86 @@
+"""Add project full-text search
+
+Revision ID: a6d090d9cb26
+Revises: d1aaf420bcb8
+Create Date: 2026-10-18 09:12:41.503218
+
+PostgreSQL gets a generated tsvector column with a GIN index, SQLite gets an
+FTS5 external-content table kept in sync with triggers. Neither object is
+mapped on the Project model; see utils/search.py.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d090d9cb26'
+down_revision = 'd1aaf420bcb8'
+branch_labels = None
+depends_on = None
+
+
+POSTGRES_SEARCH_VECTOR = """
+    ALTER TABLE projects ADD COLUMN search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(tech_stack, '')), 'B') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'C')
+    ) STORED
+"""
+
+SQLITE_FTS_STATEMENTS = [
+    """
+    CREATE VIRTUAL TABLE projects_fts USING fts5(
+        title, description, tech_stack,
+        content='projects', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER projects_fts_ai AFTER INSERT ON projects BEGIN
+        INSERT INTO projects_fts(rowid, title, description, tech_stack)
+        VALUES (new.id, new.title, new.description, new.tech_stack);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_fts_ad AFTER DELETE ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, tech_stack)
+        VALUES ('delete', old.id, old.title, old.description, old.tech_stack);
+    END
+    """,
+    """
+    CREATE TRIGGER projects_fts_au AFTER UPDATE OF title, description, tech_stack ON projects BEGIN
+        INSERT INTO projects_fts(projects_fts, rowid, title, description, tech_stack)
+        VALUES ('delete', old.id, old.title, old.description, old.tech_stack);
+        INSERT INTO projects_fts(rowid, title, description, tech_stack)
+        VALUES (new.id, new.title, new.description, new.tech_stack);
+    END
+    """,
+    # Index the rows that already exist
+    "INSERT INTO projects_fts(projects_fts) VALUES ('rebuild')",
+]
+
+
+def upgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.execute(POSTGRES_SEARCH_VECTOR)
+        op.create_index('ix_projects_search_vector', 'projects', ['search_vector'],
+                        postgresql_using='gin')
+    elif dialect == 'sqlite':
+        for statement in SQLITE_FTS_STATEMENTS:
+            op.execute(statement)
+
+
+def downgrade():
+    dialect = op.get_bind().dialect.name
+
+    if dialect == 'postgresql':
+        op.drop_index('ix_projects_search_vector', table_name='projects')
+        op.execute('ALTER TABLE projects DROP COLUMN search_vector')
+    elif dialect == 'sqlite':
+        op.execute('DROP TRIGGER IF EXISTS projects_fts_au')
+        op.execute('DROP TRIGGER IF EXISTS projects_fts_ad')
+        op.execute('DROP TRIGGER IF EXISTS projects_fts_ai')
+        op.execute('DROP TABLE IF EXISTS projects_fts')
@@ -0,0 +1,26 @@
+"""Add cv_content_hash to users
+
+Revision ID: c71f4a9e05d2
+Revises: 3e5b0f8d2a71
+Create Date: 2026-10-18 14:05:12.774210
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c71f4a9e05d2'
+down_revision = '3e5b0f8d2a71'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('cv_content_hash', sa.String(length=64), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('cv_content_hash')
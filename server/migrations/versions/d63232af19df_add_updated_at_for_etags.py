@@ -0,0 +1,45 @@
+"""Add updated_at to projects, categories and merchandise for ETags
+
+Revision ID: d63232af19df
+Revises: a6d090d9cb26
+Create Date: 2026-10-18 10:02:17.884310
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd63232af19df'
+down_revision = 'a6d090d9cb26'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    with op.batch_alter_table('merchandise', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    op.execute('UPDATE projects SET updated_at = created_at')
+    op.execute('UPDATE categories SET updated_at = CURRENT_TIMESTAMP')
+    op.execute('UPDATE merchandise SET updated_at = CURRENT_TIMESTAMP')
+
+
+def downgrade():
+    with op.batch_alter_table('merchandise', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('categories', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+
+    # On SQLite this recreates the projects table, which drops the
+    # projects_fts triggers; downgrade past a6d090d9cb26 and upgrade again
+    # to restore them
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
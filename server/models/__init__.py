@@ -4,6 +4,10 @@ db = SQLAlchemy()
 
 from .projects import Role, User, Category, Project, UserProject, Review, Contribution
 from .merchandise import Merchandise, Sales, SalesItem, Payment
+from .stats import ProjectStatsDaily, SalesStatsDaily, UserCount
+from .documents import ProjectDocument, ProjectTextIndex, DocumentText
+from .jobs import Job
+from .cache import CacheTagVersion
 __all__ = [
     'db',
     'Role',
@@ -16,5 +20,13 @@ __all__ = [
     'Merchandise',
     'Sales',
     'SalesItem',
-    'Payment'
+    'Payment',
+    'ProjectStatsDaily',
+    'SalesStatsDaily',
+    'UserCount',
+    'ProjectDocument',
+    'ProjectTextIndex',
+    'DocumentText',
+    'Job',
+    'CacheTagVersion'
 ]
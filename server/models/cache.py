@@ -0,0 +1,13 @@
+from . import db
+
+class CacheTagVersion(db.Model):
+    """
+    Invalidation generation of a response cache tag, shared by every worker
+
+    The row with tag '*' is the global generation. Invalidating tags bumps
+    it and stamps the new value on each tag (see utils/cache.TagVersions).
+    """
+    __tablename__ = 'cache_tag_versions'
+
+    tag = db.Column(db.String(255), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -0,0 +1,79 @@
+import zlib
+from datetime import datetime
+from sqlalchemy_serializer import SerializerMixin
+from . import db
+
+class ProjectDocument(db.Model, SerializerMixin):
+    """Text extracted from a project PDF when it is uploaded"""
+    __tablename__ = 'project_documents'
+
+    # Extraction status values
+    STATUS_EXTRACTED = 'extracted'
+    STATUS_EMPTY = 'empty'  # Parsed, but no text layer (e.g. scanned pages)
+    STATUS_FAILED = 'failed'
+
+    id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), nullable=False, index=True)
+    storage_path = db.Column(db.String(500), nullable=False, unique=True)
+    url = db.Column(db.Text)
+    content_hash = db.Column(db.String(64), index=True)  # SHA-256 of the PDF bytes
+    extracted_text = db.Column(db.Text)
+    page_count = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default=STATUS_EXTRACTED)
+    error = db.Column(db.Text)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    project = db.relationship('Project')
+
+    serialize_rules = ('-project',)
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'project_id': self.project_id,
+            'storage_path': self.storage_path,
+            'url': self.url,
+            'content_hash': self.content_hash,
+            'page_count': self.page_count,
+            'status': self.status,
+            'error': self.error,
+            'text_length': len(self.extracted_text) if self.extracted_text else 0,
+            'created_at': self.created_at.isoformat() if self.created_at else None
+        }
+
+class ProjectTextIndex(db.Model, SerializerMixin):
+    """BM25 index over a project's extracted PDF text, built by utils/retrieval.py"""
+    __tablename__ = 'project_text_indexes'
+
+    project_id = db.Column(db.Integer, db.ForeignKey('projects.id', ondelete='CASCADE'), primary_key=True)
+    # SHA-256 over the indexed documents' content hashes - a mismatch means the index is stale
+    corpus_hash = db.Column(db.String(64), nullable=False)
+    chunk_count = db.Column(db.Integer, nullable=False, default=0)
+    data = db.Column(db.LargeBinary, nullable=False)  # Serialized index (numpy .npz)
+    built_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    serialize_rules = ('-data',)
+
+class DocumentText(db.Model, SerializerMixin):
+    """zlib-compressed full text of an AI document (CVs), keyed by its file id"""
+    __tablename__ = 'document_texts'
+
+    file_id = db.Column(db.String(100), primary_key=True)
+    file_type = db.Column(db.String(20), nullable=False, default='cv')
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id', ondelete='SET NULL'), nullable=True, index=True)
+    compressed_text = db.Column(db.LargeBinary, nullable=False)
+    text_length = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    serialize_rules = ('-compressed_text',)
+
+    @property
+    def text(self):
+        return zlib.decompress(self.compressed_text).decode('utf-8')
+
+    @text.setter
+    def text(self, value):
+        self.compressed_text = zlib.compress(value.encode('utf-8'))
+        self.text_length = len(value)
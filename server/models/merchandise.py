@@ -13,6 +13,7 @@ class Merchandise(db.Model, SerializerMixin):
     image_url = db.Column(db.String(255))  # Keep for backward compatibility
     image_urls = db.Column(db.Text)  # JSON string of multiple image URLs
     thumbnail_url = db.Column(db.String(500))  # Main product image
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc), onupdate=lambda: datetime.now(timezone.utc))  # Used for ETags
 
     sales_items = db.relationship('SalesItem', back_populates='merchandise')
 
@@ -1,5 +1,7 @@
 from datetime import datetime
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event, or_, select, update
+from sqlalchemy.orm import Session, joinedload, selectinload, load_only, noload
 from sqlalchemy_serializer import SerializerMixin
 from . import db
 
@@ -35,6 +37,7 @@ class User(db.Model, SerializerMixin):
     cv_summary = db.Column(db.Text)
     cv_file_id = db.Column(db.String(100))
     cv_uploaded_at = db.Column(db.DateTime)
+    cv_content_hash = db.Column(db.String(64))  # SHA-256 of the current CV, to skip unchanged re-uploads
     
     # Relationships
     sales = db.relationship('Sales', back_populates='user', lazy=True)
@@ -69,6 +72,7 @@ class Category(db.Model, SerializerMixin):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(100), nullable=False)
     description = db.Column(db.Text)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)  # Used for ETags
     
     projects = db.relationship('Project', back_populates='category')
     
@@ -94,6 +98,8 @@ class Project(db.Model, SerializerMixin):
     downloads = db.Column(db.Integer, default=0)
     rejection_reason = db.Column(db.Text, nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    # Bumped on every change to the row or to anything embedded in to_dict() (used for ETags)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
     # AI-generated summary field
     project_summary = db.Column(db.Text)
@@ -114,6 +120,62 @@ class Project(db.Model, SerializerMixin):
     # Serialization rules
     serialize_rules = ('-category.projects', '-user_projects.project')
     
+    @classmethod
+    def serialization_options(cls):
+        """Loader options for every relationship walked by to_dict()
+        
+        Collections use selectinload (one extra SELECT per level, independent of
+        row count) and many-to-one links use joinedload, so serializing a page of
+        projects costs a fixed number of queries.
+        """
+        return (
+            joinedload(cls.category),
+            selectinload(cls.user_projects).joinedload(UserProject.user).joinedload(User.role),
+            selectinload(cls.user_projects).selectinload(UserProject.contributions),
+            selectinload(cls.reviews).joinedload(Review.user),
+        )
+    
+    @classmethod
+    def listing_query(cls):
+        """Project query with the full to_dict() graph eager-loaded"""
+        return cls.query.options(*cls.serialization_options())
+    
+    # Compact representation used by the project grid (?view=card)
+    CARD_FIELDS = ('id', 'title', 'thumbnail_url', 'category', 'status', 'featured',
+                   'views', 'clicks', 'downloads', 'created_at')
+    
+    @classmethod
+    def projectable_fields(cls):
+        """Field names clients may request through ?fields="""
+        return set(cls.__table__.columns.keys()) | {'category'}
+    
+    @classmethod
+    def projection_query(cls, fields):
+        """Project query that selects only the requested columns
+        
+        Relationships are not loaded, except for the id/name of the category
+        when 'category' is requested.
+        """
+        columns = [getattr(cls, name) for name in fields if name != 'category']
+        options = [load_only(cls.id, *columns), noload('*')]
+        if 'category' in fields:
+            options.append(joinedload(cls.category).load_only(Category.id, Category.name))
+        return cls.query.options(*options)
+    
+    def to_projection_dict(self, fields):
+        """Serialize only the requested fields (see projection_query)"""
+        result = {'id': self.id}
+        for name in fields:
+            if name == 'category':
+                result['category'] = {
+                    'id': self.category.id,
+                    'name': self.category.name
+                } if self.category else None
+            else:
+                value = getattr(self, name)
+                result[name] = value.isoformat() if isinstance(value, datetime) else value
+        return result
+    
     def to_dict(self):
         """Custom to_dict method that includes user_projects (collaborators) and external collaborators"""
         import json
@@ -255,3 +317,42 @@ class Contribution(db.Model, SerializerMixin):
             } if self.user_project else None
         }
         return result
+
+
+@event.listens_for(Session, 'before_flush')
+def touch_embedding_projects(session, flush_context, instances):
+    """Bump Project.updated_at when rows embedded in Project.to_dict() change
+    
+    Reviews, collaborators (UserProject + their User) and contributions are
+    serialized inside the project payload, so their changes must change the
+    project's ETag too.
+    """
+    project_ids = set()
+    user_ids = set()
+    
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if obj in session.dirty and not session.is_modified(obj):
+            continue
+        if isinstance(obj, (Review, UserProject)):
+            project_ids.add(obj.project_id)
+        elif isinstance(obj, Contribution):
+            if obj.user_project is not None:
+                project_ids.add(obj.user_project.project_id)
+        elif isinstance(obj, User) and obj not in session.new:
+            user_ids.add(obj.id)
+    
+    project_ids.discard(None)
+    if not project_ids and not user_ids:
+        return
+    
+    conditions = []
+    if project_ids:
+        conditions.append(Project.id.in_(project_ids))
+    if user_ids:
+        conditions.append(Project.id.in_(
+            select(UserProject.project_id).where(UserProject.user_id.in_(user_ids))
+        ))
+    
+    session.connection().execute(
+        update(Project.__table__).where(or_(*conditions)).values(updated_at=datetime.utcnow())
+    )
@@ -0,0 +1,63 @@
+from sqlalchemy_serializer import SerializerMixin
+from . import db
+
+# Materialized dashboard counters, maintained incrementally by
+# utils/materialized_stats.py and rebuilt with `flask rebuild-stats`.
+# Each *_daily row holds the running totals as of the end of that day, so
+# the latest row answers the dashboards and older rows give the trend.
+
+class ProjectStatsDaily(db.Model, SerializerMixin):
+    __tablename__ = 'project_stats_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    approved = db.Column(db.Integer, nullable=False, default=0)
+    rejected = db.Column(db.Integer, nullable=False, default=0)
+    featured = db.Column(db.Integer, nullable=False, default=0)
+    contributions = db.Column(db.Integer, nullable=False, default=0)
+    contribution_amount = db.Column(db.Float, nullable=False, default=0)
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'total': self.total,
+            'pending': self.pending,
+            'approved': self.approved,
+            'rejected': self.rejected,
+            'featured': self.featured,
+            'contributions': self.contributions,
+            'contribution_amount': self.contribution_amount
+        }
+
+class SalesStatsDaily(db.Model, SerializerMixin):
+    __tablename__ = 'sales_stats_daily'
+
+    day = db.Column(db.Date, primary_key=True)
+    total = db.Column(db.Integer, nullable=False, default=0)
+    pending = db.Column(db.Integer, nullable=False, default=0)
+    paid = db.Column(db.Integer, nullable=False, default=0)
+    completed = db.Column(db.Integer, nullable=False, default=0)
+    cancelled = db.Column(db.Integer, nullable=False, default=0)
+    refunded = db.Column(db.Integer, nullable=False, default=0)
+    revenue = db.Column(db.Integer, nullable=False, default=0)  # Amount of completed sales
+
+    def to_dict(self):
+        return {
+            'day': self.day.isoformat(),
+            'total': self.total,
+            'pending': self.pending,
+            'paid': self.paid,
+            'completed': self.completed,
+            'cancelled': self.cancelled,
+            'refunded': self.refunded,
+            'revenue': self.revenue
+        }
+
+class UserCount(db.Model, SerializerMixin):
+    __tablename__ = 'user_counts'
+
+    role_id = db.Column(db.Integer, db.ForeignKey('roles.id', ondelete='CASCADE'), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    role = db.relationship('Role')
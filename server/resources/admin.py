@@ -1,9 +1,12 @@
 from flask import request
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Project, User, Category, Sales, Role
+from models import db, Project, Category, Sales
 from resources.auth.decorators import role_required
 from sqlalchemy import func
+from utils.cache import response_cache
+from utils.pagination import get_per_page
+from utils.materialized_stats import project_counts, sales_counts, user_counts, project_stats_history, sales_stats_history
 
 
 class AdminCategories(Resource):
@@ -27,6 +30,7 @@ class AdminCategories(Resource):
             
             db.session.add(category)
             db.session.commit()
+            response_cache.invalidate('categories')
             
             return {
                 'message': 'Category created successfully',
@@ -56,6 +60,8 @@ class AdminCategoryDetail(Resource):
             category.description = data.get('description', category.description) # Use existing if not provided
             
             db.session.commit()
+            # Project payloads embed their category
+            response_cache.invalidate('categories', f'category:{id}', 'projects', 'featured')
             
             return {
                 'message': 'Category updated successfully',
@@ -74,6 +80,7 @@ class AdminCategoryDetail(Resource):
             
             db.session.delete(category)
             db.session.commit()
+            response_cache.invalidate('categories', f'category:{id}', 'projects', 'featured')
             
             return {'message': 'Category deleted successfully'}, 200
             
@@ -87,40 +94,33 @@ class AdminStats(Resource):
     @role_required('admin')
     def get(self):
         try:
-            # User stats
-            total_users = User.query.count()
-            total_students = User.query.join(Role).filter(Role.name == 'student').count()
-            
-            # Project stats
-            total_projects = Project.query.count()
-            approved_projects = Project.query.filter_by(status='approved').count()
-            pending_projects = Project.query.filter_by(status='pending').count()
-            featured_projects = Project.query.filter_by(featured=True).count()
-            
-            
-            # Sales stats
-            total_sales = Sales.query.count()
-            completed_sales = Sales.query.filter_by(status='completed').count()
+            # Materialized counters - a handful of rows whatever the table sizes
+            users = user_counts()
+            projects = project_counts()
+            sales = sales_counts()
             
             # Top viewed projects
-            top_projects = Project.query.filter_by(status='approved').order_by(Project.views.desc()).limit(5).all()
+            top_projects = Project.listing_query().filter_by(status='approved').order_by(Project.views.desc()).limit(5).all()
             
             return {
                 'user_stats': {
-                    'total': total_users,
-                    'students': total_students
+                    'total': users['total'],
+                    'students': users['by_role'].get('student', 0)
                 },
                 'project_stats': {
-                    'total': total_projects,
-                    'approved': approved_projects,
-                    'pending': pending_projects,
-                    'featured': featured_projects
+                    'total': projects['total'],
+                    'approved': projects['approved'],
+                    'pending': projects['pending'],
+                    'featured': projects['featured']
                 },
                 'sales_stats': {
-                    'total': total_sales,
-                    'completed': completed_sales
+                    'total': sales['total'],
+                    'completed': sales['completed']
                 },
-                'top_projects': [project.to_dict() for project in top_projects]
+                'top_projects': [project.to_dict() for project in top_projects],
+                # End-of-day totals for the last 30 days
+                'project_history': project_stats_history(),
+                'sales_history': sales_stats_history()
             }, 200
             
         except Exception as exc:
@@ -133,7 +133,7 @@ class AdminAllSales(Resource):
         try:
 
             page = request.args.get("page", 1, type=int)
-            per_page = request.args.get("per_page", 20, type=int)
+            per_page = get_per_page(20)
 
             sales = (
                 Sales.query.order_by(Sales.date.desc())
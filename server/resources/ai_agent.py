@@ -1,14 +1,22 @@
-from flask import request, jsonify
+from flask import request, jsonify, Response, stream_with_context, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required
-from models import db, User, Project
+from models import db, User, Project, ProjectDocument, Job
 from utils.firebase_auth import firebase_auth_required, get_firebase_user_from_request
-from utils.ai_agent import ai_agent
-from datetime import datetime
+from utils.ai_agent import ai_agent, ANSWER_ERROR_MESSAGE
+from utils.answer_cache import answer_cache, project_fingerprint
+from utils.ai_jobs import CV_PROCESS_JOB, PROJECT_SUMMARY_JOB
+from utils.jobs import enqueue_job, find_active_job, find_recent_job
+from utils.upload_buffer import UploadBuffer, UploadTooLarge
+from utils.upload_limits import limit_content_length
+from utils.retrieval import project_retriever, corpus_hash
 import json
 
+MAX_CV_SIZE = 10 * 1024 * 1024  # 10MB
+
 class CVUploadResource(Resource):
     @jwt_required()
+    @limit_content_length(MAX_CV_SIZE)
     def post(self):
         """Upload CV for a student"""
         from resources.auth.decorators import get_current_user
@@ -30,48 +38,61 @@ class CVUploadResource(Resource):
             return {'error': 'Only PDF files are allowed for CVs'}, 400
         
         try:
-            # Extract text from PDF
-            text = ai_agent.extract_text_from_pdf(file.stream)
-            if not text:
-                return {'error': 'Failed to extract text from CV'}, 500
-            
-            # Upload PDF to Firebase
-            file_info = ai_agent.upload_pdf_to_firebase(file.stream, file_type="cv")
-            
-            # Generate AI summary
-            summary = ai_agent.generate_cv_summary(text)
-            
-            # Save metadata to Firebase
-            metadata = {
-                "file_id": file_info['file_id'],
-                "user_id": user.id,
-                "user_email": user.email,
-                "summary": summary,
-                "url": file_info['url'],
-                "text": text,
-                "filename": file.filename
-            }
+            # Read the upload once; hashing, extraction and upload share the buffer
+            upload_buffer = UploadBuffer(file.stream, max_bytes=MAX_CV_SIZE)
+        except UploadTooLarge as e:
+            return {'error': str(e)}, 413
+        
+        try:
+            # Re-uploading the current CV changes nothing
+            if upload_buffer.content_hash == user.cv_content_hash and user.cv_summary:
+                return {
+                    'message': 'CV unchanged',
+                    'unchanged': True,
+                    'file_id': user.cv_file_id,
+                    'summary': user.cv_summary,
+                    'url': user.cv_url
+                }
             
-            ai_agent.save_document_metadata(file_info['file_id'], metadata, file_type="cv")
+            dedupe_key = f"{CV_PROCESS_JOB}:{user.id}:{upload_buffer.content_hash}"
+            job = find_active_job(dedupe_key)
+            if job is not None:
+                return {
+                    'message': 'CV already being processed',
+                    'job_id': job.id,
+                    'status_url': f"/api/jobs/{job.id}"
+                }, 202
             
-            # Update user record
-            user.cv_url = file_info['url']
-            user.cv_summary = summary
-            user.cv_file_id = file_info['file_id']
-            user.cv_uploaded_at = datetime.utcnow()
+            # Upload PDF to Firebase while extracting its text
+            file_info, text = ai_agent.upload_and_extract_cv(upload_buffer)
+            if not text:
+                return {'error': 'Failed to extract text from CV'}, 400
             
-            db.session.commit()
+            # The text is stored now, committed together with the job; the AI
+            # summary and metadata run in the background
+            ai_agent.save_document_text(file_info['file_id'], text, file_type="cv", user_id=user.id)
+            job = enqueue_job(CV_PROCESS_JOB, {
+                'user_id': user.id,
+                'file_id': file_info['file_id'],
+                'blob_path': file_info['blob_path'],
+                'url': file_info['url'],
+                'filename': file.filename,
+                'content_hash': upload_buffer.content_hash
+            }, user_id=user.id, dedupe_key=dedupe_key)
             
             return {
-                'message': 'CV uploaded successfully',
+                'message': 'CV uploaded, processing started',
+                'job_id': job.id,
+                'status_url': f"/api/jobs/{job.id}",
                 'file_id': file_info['file_id'],
-                'summary': summary,
                 'url': file_info['url']
-            }, 201
+            }, 202
             
         except Exception as e:
             print(f"CV upload error: {e}")
             return {'error': 'Failed to process CV upload'}, 500
+        finally:
+            upload_buffer.close()
 
 class CVQuestionResource(Resource):
     @jwt_required()
@@ -125,9 +146,25 @@ class CVQuestionResource(Resource):
             return {"error": "Failed to process question"}, 500
 
 
+def sse_event(event, data):
+    """Format one Server-Sent Event with a JSON payload"""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+def wants_event_stream():
+    """True if the client asked for a streamed (SSE) response"""
+    if request.args.get('stream', '').lower() in ('1', 'true', 'yes'):
+        return True
+    return request.accept_mimetypes.best == 'text/event-stream'
+
 class ProjectQuestionResource(Resource):
     def post(self, project_id):
-        """Ask questions about a project (public access)"""
+        """
+        Ask questions about a project (public access)
+        
+        With ?stream=true (or Accept: text/event-stream) the answer is sent as
+        Server-Sent Events: `answer` events carrying {"text": ...} pieces, then a
+        `done` event with {"cached": bool} or an `error` event.
+        """
         project = Project.query.get(project_id)
         if not project:
             return {'error': 'Project not found'}, 404
@@ -148,25 +185,74 @@ class ProjectQuestionResource(Resource):
                 'technical_mentor': project.technical_mentor
             }
             
-            # Get text from regular project PDFs
-            project_pdf_texts = ai_agent.get_project_pdf_texts(project)
+            # Repeated (or near-identical) questions reuse the answer while the
+            # project and its PDFs are unchanged. The lookup only reads the
+            # recorded documents; PDFs never extracted are handled on a miss
+            project_documents = ai_agent.get_project_documents(project, record_missing=False)
+            fingerprint = project_fingerprint(project_data, corpus_hash(project_documents))
+            stream = wants_event_stream()
+            answer = answer_cache.get(project.id, fingerprint, question)
+            if answer is not None:
+                if stream:
+                    return self._event_stream(iter([answer]), cached=True)
+                return {"answer": answer, "cached": True}
             
-            # Combine all PDF documentation
-            if project_pdf_texts:
-                combined_documentation = "\n\n=== DOCUMENT SEPARATOR ===\n\n".join(project_pdf_texts)
-                print(f"📚 Found {len(project_pdf_texts)} project PDFs with combined length: {len(combined_documentation)}")
+            # Extract any legacy PDFs now; the answer is stored under the
+            # fingerprint of the documents it was generated from
+            project_documents = ai_agent.get_project_documents(project)
+            fingerprint = project_fingerprint(project_data, corpus_hash(project_documents))
+            
+            # Only the parts of the project PDFs relevant to the question go in the prompt
+            documentation = project_retriever.select_context(project.id, project_documents, question)
+            if documentation:
+                print(f"📚 Selected {len(documentation)} characters of context from {len(project_documents)} project PDFs")
             else:
-                combined_documentation = None
                 print("📄 No project PDFs found for AI to analyze")
             
+            if stream:
+                pieces = ai_agent.stream_project_answer(
+                    question, project_data, documentation,
+                    max_documentation_chars=project_retriever.context_chars
+                )
+                return self._event_stream(
+                    pieces,
+                    cached=False,
+                    on_complete=lambda answer: answer_cache.set(project.id, fingerprint, question, answer)
+                )
+            
             # Generate answer
-            answer = ai_agent.answer_project_question(question, project_data, combined_documentation)
+            answer = ai_agent.answer_project_question(
+                question, project_data, documentation,
+                max_documentation_chars=project_retriever.context_chars
+            )
+            if answer != ANSWER_ERROR_MESSAGE:
+                answer_cache.set(project.id, fingerprint, question, answer)
             
-            return {"answer": answer}
+            return {"answer": answer, "cached": False}
             
         except Exception as e:
             print(f"Project question error: {e}")
             return {"error": "Failed to process question"}, 500
+    
+    def _event_stream(self, pieces, cached, on_complete=None):
+        """SSE response relaying answer pieces; on_complete gets the full answer if it succeeded"""
+        def generate():
+            sent = []
+            for piece in pieces:
+                if piece == ANSWER_ERROR_MESSAGE:
+                    yield sse_event('error', {'error': piece})
+                    return
+                sent.append(piece)
+                yield sse_event('answer', {'text': piece})
+            if on_complete is not None and sent:
+                on_complete("".join(sent).strip())
+            yield sse_event('done', {'cached': cached})
+        
+        return Response(
+            stream_with_context(generate()),
+            mimetype='text/event-stream',
+            headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+        )
 
 class CVDeleteResource(Resource):
     @jwt_required()
@@ -195,6 +281,7 @@ class CVDeleteResource(Resource):
             user.cv_summary = None
             user.cv_file_id = None
             user.cv_uploaded_at = None
+            user.cv_content_hash = None
             
             db.session.commit()
             
@@ -246,6 +333,46 @@ class AdminCVListResource(Resource):
             'cvs': cv_list
         }
 
+class AdminAICacheStatsResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Get PDF text and answer cache metrics for the worker serving the request (admin only)"""
+        from resources.auth.decorators import get_current_user
+        
+        current_user = get_current_user()
+        if not current_user:
+            return {'error': 'Authentication required'}, 401
+        
+        if current_user.role.name != 'admin':
+            return {'error': 'Admin access required'}, 403
+        
+        return {
+            'text_cache': ai_agent.text_cache.stats(),
+            'answer_cache': answer_cache.stats()
+        }
+
+class AdminAIBackendStatsResource(Resource):
+    @jwt_required()
+    def get(self):
+        """Get model call concurrency and circuit breaker metrics for the worker serving the request (admin only)"""
+        from resources.auth.decorators import get_current_user
+        
+        current_user = get_current_user()
+        if not current_user:
+            return {'error': 'Authentication required'}, 401
+        
+        if current_user.role.name != 'admin':
+            return {'error': 'Admin access required'}, 403
+        
+        return {'llm_gate': ai_agent.llm_gate.stats()}
+
+def has_pdf_urls(project):
+    """True if the project's media lists at least one PDF"""
+    try:
+        return bool(json.loads(project.pdf_urls)) if project.pdf_urls else False
+    except (ValueError, TypeError):
+        return False
+
 class ProjectSummaryResource(Resource):
     def get(self, project_id):
         """Get AI-generated summary for a project (using regular project PDFs)"""
@@ -253,44 +380,41 @@ class ProjectSummaryResource(Resource):
         if not project:
             return {'error': 'Project not found'}, 404
         
-        # Check if we have regular project PDFs
-        has_project_pdfs = bool(project.pdf_urls)
-        
-        # If we don't have a summary but we have PDFs, try to generate one
-        summary = project.project_summary
-        if not summary and has_project_pdfs:
-            try:
-                print(f"🔄 No existing summary found, generating from project PDFs for project {project_id}")
-                
-                # Get project data
-                project_data = {
-                    'title': project.title,
-                    'description': project.description,
-                    'tech_stack': project.tech_stack,
-                    'technical_mentor': project.technical_mentor
-                }
-                
-                # Get text from regular project PDFs
-                project_pdf_texts = ai_agent.get_project_pdf_texts(project)
-                if project_pdf_texts:
-                    combined_pdf_text = "\n\n=== DOCUMENT SEPARATOR ===\n\n".join(project_pdf_texts)
-                    summary = ai_agent.generate_project_summary(project_data, combined_pdf_text)
-                    
-                    # Save the generated summary back to the project
-                    project.project_summary = summary
-                    db.session.commit()
-                    print(f"✅ Generated and saved new summary for project {project_id}")
-                    
-            except Exception as e:
-                print(f"❌ Error generating summary from PDFs: {e}")
+        # A summary needs extracted PDF text. PDFs with no document rows at
+        # all were uploaded before text was recorded; the job extracts them
+        statuses = {
+            status for (status,) in db.session.query(ProjectDocument.status).filter_by(project_id=project.id).distinct()
+        }
+        has_documentation = ProjectDocument.STATUS_EXTRACTED in statuses
+        has_project_pdfs = bool(statuses) or has_pdf_urls(project)
         
-        return {
+        response = {
             'project_id': project.id,
             'title': project.title,
-            'summary': summary,
-            'has_documentation': has_project_pdfs,
+            'summary': project.project_summary,
+            'has_documentation': has_documentation,
             'has_project_pdfs': has_project_pdfs
         }
+        
+        # If we don't have a summary but we have PDF text, generate one in the background
+        if not project.project_summary and (has_documentation or (has_project_pdfs and not statuses)):
+            try:
+                # A job that finished recently without a summary (AI outage,
+                # no usable text) isn't queued again on every page view
+                dedupe_key = f"{PROJECT_SUMMARY_JOB}:{project.id}"
+                job = find_recent_job(dedupe_key, current_app.config.get('PROJECT_SUMMARY_RETRY_INTERVAL', 3600))
+                if job is None:
+                    print(f"🔄 No existing summary found, queueing generation from project PDFs for project {project_id}")
+                    job = enqueue_job(PROJECT_SUMMARY_JOB, {'project_id': project.id}, dedupe_key=dedupe_key)
+                response['job_id'] = job.id
+                response['status_url'] = f"/api/jobs/{job.id}"
+                if job.status in Job.ACTIVE_STATUSES:
+                    return response, 202
+            except Exception as e:
+                db.session.rollback()
+                print(f"❌ Error queueing summary generation: {e}")
+        
+        return response
 
 # Setup routes function
 def setup_ai_routes(api):
@@ -299,4 +423,6 @@ def setup_ai_routes(api):
     api.add_resource(CVQuestionResource, '/api/ai/cv/<int:user_id>/question')
     api.add_resource(ProjectQuestionResource, '/api/ai/project/<int:project_id>/question')
     api.add_resource(AdminCVListResource, '/api/ai/admin/cvs')
+    api.add_resource(AdminAICacheStatsResource, '/api/ai/admin/cache-stats')
+    api.add_resource(AdminAIBackendStatsResource, '/api/ai/admin/backend-stats')
     api.add_resource(ProjectSummaryResource, '/api/ai/project/<int:project_id>/summary')
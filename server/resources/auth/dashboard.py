@@ -1,7 +1,9 @@
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import User, Project, UserProject, Sales, Merchandise, Role, Contribution
+from models import Project, UserProject, Sales, Merchandise, Contribution
 from resources.auth.decorators import role_required, get_current_user
+from utils.stats import contribution_totals, sales_totals_for_user
+from utils.materialized_stats import project_counts, sales_counts, user_counts
 
 class StudentDashboard(Resource):
     @jwt_required()
@@ -49,33 +51,27 @@ class ClientDashboard(Resource):
         # Get client's expressed interests (UserProject entries where client is the user)
         expressed_interests = UserProject.query.filter_by(user_id=user.id).all()
         
-        # Get client's orders
-        orders = Sales.query.filter_by(user_id=user.id).order_by(Sales.date.desc()).all()
+        # Most recent orders and contributions only; the full lists are
+        # paginated at /api/orders and /api/contributions
+        orders = Sales.query.filter_by(user_id=user.id).order_by(Sales.date.desc()).limit(10).all()
         
-        # Get client's contributions
         client_contributions = Contribution.query.join(UserProject).filter(
             UserProject.user_id == user.id
-        ).order_by(Contribution.date.desc()).all()
+        ).order_by(Contribution.date.desc()).limit(10).all()
         
-        # Calculate statistics
-        total_orders = len(orders)
-        completed_orders = len([o for o in orders if o.status == 'completed'])
-        pending_orders = len([o for o in orders if o.status == 'pending'])
-        cancelled_orders = len([o for o in orders if o.status == 'cancelled'])
-        total_spent = sum(o.amount for o in orders if o.status == 'completed')
-        
-        # Contribution statistics
-        total_contributed = sum(c.amount for c in client_contributions if c.amount)
-        contribution_count = len(client_contributions)
+        # Calculate statistics in SQL
+        order_totals = sales_totals_for_user(user.id)
+        contributed = contribution_totals(user_id=user.id)
+        empty = {'amount': 0, 'count': 0}
         
         stats = {
-            'totalOrders': total_orders,
-            'completedOrders': completed_orders,
-            'pendingOrders': pending_orders,
-            'cancelledOrders': cancelled_orders,
-            'totalSpent': total_spent,
-            'totalContributed': total_contributed,
-            'contributionCount': contribution_count
+            'totalOrders': sum(totals['count'] for totals in order_totals.values()),
+            'completedOrders': order_totals.get('completed', empty)['count'],
+            'pendingOrders': order_totals.get('pending', empty)['count'],
+            'cancelledOrders': order_totals.get('cancelled', empty)['count'],
+            'totalSpent': order_totals.get('completed', empty)['amount'],
+            'totalContributed': contributed['total_amount'],
+            'contributionCount': contributed['count']
         }
         
         return {
@@ -90,18 +86,23 @@ class AdminDashboard(Resource):
     @jwt_required()
     @role_required('admin')
     def get(self):
+        # Materialized counters - a handful of rows whatever the table sizes
+        users = user_counts()
+        projects = project_counts()
+        sales = sales_counts()
+        
         stats = {
-            'total_users': User.query.count(),
-            'total_students': User.query.join(Role).filter(Role.name == 'student').count(),
-            'total_clients': User.query.join(Role).filter(Role.name == 'client').count(),
+            'total_users': users['total'],
+            'total_students': users['by_role'].get('student', 0),
+            'total_clients': users['by_role'].get('client', 0),
             'total_merchandise': Merchandise.query.count(),
-            'total_projects': Project.query.count(),
-            'approved_projects': Project.query.filter_by(status='approved').count(),
-            'pending_projects': Project.query.filter_by(status='pending').count(),
-            'total_orders': Sales.query.count(),
-            'completed_orders': Sales.query.filter_by(status='completed').count(),
-            'total_contributions': Contribution.query.count(),
-            'total_contribution_amount': sum(c.amount for c in Contribution.query.all() if c.amount)
+            'total_projects': projects['total'],
+            'approved_projects': projects['approved'],
+            'pending_projects': projects['pending'],
+            'total_orders': sales['total'],
+            'completed_orders': sales['completed'],
+            'total_contributions': projects['contributions'],
+            'total_contribution_amount': projects['contribution_amount']
         }
         
         # Recent projects for review
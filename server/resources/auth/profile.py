@@ -1,9 +1,10 @@
 from flask import request, jsonify
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, User
+from models import db, User, UserProject
 from utils.validation import validate_student_email, validate_email_format
 from resources.auth.decorators import get_current_user
+from utils.cache import invalidate_project
 
 class UserProfile(Resource):
     @jwt_required()
@@ -49,6 +50,11 @@ class UserProfile(Resource):
             # Password updates are handled by Firebase Auth, not through this endpoint
             
             db.session.commit()
+            
+            # User fields are embedded under user_projects in cached project payloads
+            for (project_id,) in db.session.query(UserProject.project_id).filter_by(user_id=user.id).distinct():
+                invalidate_project(project_id)
+            
             return {'message': 'Profile updated successfully', 'user': user.to_dict()}, 200
             
         except Exception as exc:
@@ -3,6 +3,9 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 from models import db, Contribution, UserProject, Project
 from resources.auth.decorators import role_required, admin_or_role_required, get_current_user
+from utils.cache import invalidate_project
+from utils.stats import contribution_totals, contribution_totals_by_day
+from utils.pagination import get_per_page, get_count_mode, use_cursor_pagination, keyset_paginate, KeysetKey, InvalidCursor
 from datetime import date
 
 class ContributionList(Resource):
@@ -75,6 +78,7 @@ class ContributionList(Resource):
             
             db.session.add(contribution)
             db.session.commit()
+            invalidate_project(user_project.project_id)
             
             return {
                 'message': 'Contribution created successfully',
@@ -94,7 +98,7 @@ class ContributionList(Resource):
                 return {'error': 'User not found'}, 404
             
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             
             query = Contribution.query.join(UserProject)
             
@@ -115,6 +119,20 @@ class ContributionList(Resource):
             else:
                 return {'error': 'Unauthorized'}, 403
             
+            if use_cursor_pagination():
+                keyset = [KeysetKey(Contribution.date, default=date.min), KeysetKey(Contribution.id)]
+                try:
+                    items, next_cursor, total = keyset_paginate(query, keyset, per_page, get_count_mode('none'))
+                except InvalidCursor as exc:
+                    return {'error': str(exc)}, 400
+                
+                return {
+                    'contributions': [contribution.to_dict() for contribution in items],
+                    'next_cursor': next_cursor,
+                    'total': total,
+                    'per_page': per_page
+                }, 200
+            
             contributions = query.order_by(Contribution.date.desc()).paginate(
                 page=page,
                 per_page=per_page,
@@ -178,6 +196,7 @@ class ContributionDetail(Resource):
                 contribution.amount = data.get('amount', 0.0)
         
             db.session.commit()
+            invalidate_project(contribution.user_project.project_id)
             
             return {
                 'message': 'Contribution updated successfully',
@@ -211,14 +230,16 @@ class ProjectContributions(Resource):
             elif current_user.role.name != 'admin':
                 return {'error': 'Unauthorized'}, 403
             
-            # Get all contributions for this project
-            contributions = Contribution.query.join(UserProject).filter(
-                UserProject.project_id == id
-            ).order_by(Contribution.date.desc()).all()
+            # One page of contributions, newest first (?cursor= for the next)
+            query = Contribution.query.join(UserProject).filter(UserProject.project_id == id)
+            keyset = [KeysetKey(Contribution.date, default=date.min), KeysetKey(Contribution.id)]
+            try:
+                contributions, next_cursor, _ = keyset_paginate(query, keyset, get_per_page(20))
+            except InvalidCursor as exc:
+                return {'error': str(exc)}, 400
             
-            # Calculate contribution statistics
-            total_amount = sum(c.amount for c in contributions if c.amount)
-            contribution_count = len(contributions)
+            # Calculate contribution statistics in SQL
+            totals = contribution_totals(project_id=id)
 
             return {
                 'project': {
@@ -226,10 +247,12 @@ class ProjectContributions(Resource):
                     'title': project.title
                 },
                 'contributions': [contribution.to_dict() for contribution in contributions],
+                'next_cursor': next_cursor,
                 'statistics': {
-                    'total_amount': total_amount,
-                    'contribution_count': contribution_count,
-                    'total_contributions': len(contributions)
+                    'total_amount': totals['total_amount'],
+                    'contribution_count': totals['count'],
+                    'total_contributions': totals['count'],
+                    'by_day': contribution_totals_by_day(project_id=id)
                 }
             }, 200
             
@@ -0,0 +1,30 @@
+from flask_restful import Resource
+from flask_jwt_extended import verify_jwt_in_request
+from models import Job
+from resources.auth.decorators import get_current_user
+
+class JobStatus(Resource):
+    def get(self, job_id):
+        """Get the status (and result once finished) of a background job
+        
+        Jobs started for a user are only visible to that user and admins;
+        other jobs are visible to anyone holding the job id.
+        """
+        job = Job.query.get(job_id)
+        if not job:
+            return {'error': 'Job not found'}, 404
+        
+        if job.user_id is not None:
+            try:
+                verify_jwt_in_request(optional=True)
+                current_user = get_current_user()
+            except Exception:
+                current_user = None
+            
+            if not current_user or (current_user.id != job.user_id and current_user.role.name != 'admin'):
+                return {'error': 'Job not found'}, 404
+        
+        return {'job': job.to_dict()}, 200
+
+def setup_routes(api):
+    api.add_resource(JobStatus, '/api/jobs/<string:job_id>')
@@ -3,17 +3,33 @@ from flask_restful import Resource
 from flask_jwt_extended import jwt_required
 from models import db, Merchandise
 from resources.auth.decorators import role_required
+from utils.http_cache import make_etag, conditional_response
+from utils.pagination import get_per_page
+from sqlalchemy import func
 from utils.cloudinary_storage import upload_file_to_cloudinary, upload_multiple_files, delete_file_from_cloudinary
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+def merchandise_list_etag():
+    """ETag for a merchandise listing, from one aggregate query over the table"""
+    count, max_id, last_updated = db.session.query(
+        func.count(Merchandise.id), func.max(Merchandise.id), func.max(Merchandise.updated_at)
+    ).one()
+    return make_etag('merchandise', request.query_string, count, max_id, last_updated)
+
+def merchandise_etag(id):
+    """ETag for a single merchandise item"""
+    last_updated = db.session.query(Merchandise.updated_at).filter(Merchandise.id == id).scalar()
+    return make_etag('merchandise', id, last_updated)
+
 class MerchandiseList(Resource):
+    @conditional_response(merchandise_list_etag)
     def get(self):
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             in_stock_filter = request.args.get('in_stock', '')  # Optional filter
             
             # Start with all merchandise
@@ -75,6 +91,7 @@ class MerchandiseList(Resource):
             return {'error': str(exc)}, 500
 
 class MerchandiseDetail(Resource):
+    @conditional_response(merchandise_etag)
     def get(self, id):
         try:
             merchandise = Merchandise.query.get_or_404(id)
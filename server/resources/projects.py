@@ -1,17 +1,71 @@
-from flask import request
+from flask import request, current_app
 from flask_restful import Resource
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models import db, Project, Category, UserProject
-from sqlalchemy import or_
+from werkzeug.exceptions import RequestEntityTooLarge
+from models import db, Project, Category, UserProject, ProjectDocument, ProjectTextIndex
 from resources.auth.decorators import role_required, admin_or_role_required, get_current_user
-from utils.cloudinary_storage import upload_file_to_cloudinary, upload_multiple_files, delete_file_from_cloudinary, delete_folder_from_cloudinary, sanitize_folder_name
-from utils.firebase_storage import upload_file_to_firebase, upload_multiple_files as upload_multiple_files_firebase, delete_file_from_firebase, delete_folder_from_firebase
+from utils.cloudinary_storage import upload_file_to_cloudinary, upload_multiple_files, delete_file_from_cloudinary, sanitize_folder_name, MAX_IMAGE_SIZE
+from utils.firebase_storage import upload_file_to_firebase, delete_file_from_firebase, MAX_VIDEO_SIZE, MAX_DOCUMENT_SIZE
+from utils.search import search_projects
+from utils.counters import counter_buffer
+from utils.cache import cached_response, project_tags, invalidate_project
+from utils.http_cache import make_etag, etag_headers, not_modified_response, conditional_response
+from utils.materialized_stats import project_counts
+from utils.ai_agent import ai_agent
+from utils.upload_executor import upload_executor
+from utils.direct_upload import create_upload_intent, read_upload_token, complete_upload, DirectUploadError
+from utils.chunked_upload import chunked_uploads, ChunkedUploadError
+from utils.ai_jobs import PROJECT_DOCUMENTS_JOB
+from utils.media_jobs import PROJECT_MEDIA_CLEANUP_JOB, CHUNKED_UPLOAD_COMMIT_JOB
+from utils.jobs import enqueue_job
+from utils.upload_limits import limit_content_length
+from utils.pagination import clamp_page_size, get_per_page, get_count_mode, use_cursor_pagination, keyset_paginate, KeysetKey, InvalidCursor
+from sqlalchemy import func
 from datetime import date
+import hashlib
 import json
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Largest body ProjectMediaUpload accepts: one file at the biggest per-type
+# limit. Bigger batches go through the direct or chunked upload endpoints
+MEDIA_UPLOAD_MAX_SIZE = max(MAX_VIDEO_SIZE, MAX_DOCUMENT_SIZE, MAX_IMAGE_SIZE)
+
+
+def get_listing_fields():
+    """Read the field projection for a project listing from the query string
+    
+    ?view=card selects Project.CARD_FIELDS, ?fields=title,views,... selects
+    arbitrary columns. Returns (fields, error); fields is None when the full
+    to_dict() representation was requested.
+    """
+    fields_arg = request.args.get('fields', '')
+    if not fields_arg:
+        if request.args.get('view') == 'card':
+            return list(Project.CARD_FIELDS), None
+        return None, None
+    
+    fields = [field.strip() for field in fields_arg.split(',') if field.strip()]
+    unknown = [field for field in fields if field not in Project.projectable_fields()]
+    if unknown:
+        return None, f"Unknown fields: {', '.join(unknown)}"
+    return fields, None
+
+
+def listing_query(fields):
+    """Base project query for a listing with the given projection"""
+    if fields:
+        return Project.projection_query(fields)
+    return Project.listing_query()
+
+
+def serialize_listing(projects, fields):
+    """Serialize listed projects with the given projection"""
+    if fields:
+        return [project.to_projection_dict(fields) for project in projects]
+    return [project.to_dict() for project in projects]
+
 # Public Projects - All projects (handles both public and admin access)
 class PublicProjects(Resource):
     def get(self):
@@ -22,11 +76,14 @@ class PublicProjects(Resource):
         """
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             search = request.args.get('search', '')
             category_id = request.args.get('category_id', type=int)
             featured_only = request.args.get('featured', False, type=bool)
             status_filter = request.args.get('status', '')  # Optional status filter
+            fields, fields_error = get_listing_fields()
+            if fields_error:
+                return {'error': fields_error}, 400
             
             # Check if user is authenticated as admin
             is_admin = False
@@ -40,7 +97,7 @@ class PublicProjects(Resource):
                 pass
             
             # Start with all projects
-            query = Project.query
+            query = listing_query(fields)
             
             # Apply status filtering based on user type
             if status_filter:
@@ -61,15 +118,9 @@ class PublicProjects(Resource):
             if featured_only:
                 query = query.filter(Project.featured == True)
             
-            # Search filter
+            # Search filter (full-text, ranked by relevance)
             if search:
-                query = query.filter(
-                    or_(
-                        Project.title.ilike(f'%{search}%'),
-                        Project.description.ilike(f'%{search}%'),
-                        Project.tech_stack.ilike(f'%{search}%')
-                    )
-                )
+                query = search_projects(query, search)
             
             # Category filter
             if category_id:
@@ -79,30 +130,49 @@ class PublicProjects(Resource):
             if is_admin:
                 # Admin sees newest first (management view)
                 query = query.order_by(Project.id.desc())
+                keyset = [KeysetKey(Project.id)]
             else:
                 # Public sees featured first, then newest
                 query = query.order_by(Project.featured.desc(), Project.id.desc())
-            
-            projects = query.paginate(
-                page=page, 
-                per_page=per_page, 
-                error_out=False
-            )
-            
-            response_data = {
-                'projects': [project.to_dict() for project in projects.items],
-                'total': projects.total,
-                'pages': projects.pages,
-                'current_page': page,
-                'per_page': per_page
-            }
+                keyset = [KeysetKey(Project.featured, default=False), KeysetKey(Project.id)]
+            
+            if use_cursor_pagination():
+                # Keyset pagination - cost doesn't grow with depth, total is opt-in
+                if search:
+                    return {'error': 'Cursor pagination is not supported with search, use page instead'}, 400
+                try:
+                    items, next_cursor, total = keyset_paginate(query, keyset, per_page, get_count_mode('none'))
+                except InvalidCursor as exc:
+                    return {'error': str(exc)}, 400
+                
+                response_data = {
+                    'projects': serialize_listing(items, fields),
+                    'next_cursor': next_cursor,
+                    'total': total,
+                    'per_page': per_page
+                }
+            else:
+                projects = query.paginate(
+                    page=page, 
+                    per_page=per_page, 
+                    error_out=False
+                )
+                
+                response_data = {
+                    'projects': serialize_listing(projects.items, fields),
+                    'total': projects.total,
+                    'pages': projects.pages,
+                    'current_page': page,
+                    'per_page': per_page
+                }
             
             # Add status counts for admin users
             if is_admin:
+                counts = project_counts()
                 response_data['status_counts'] = {
-                    'pending': Project.query.filter_by(status='pending').count(),
-                    'approved': Project.query.filter_by(status='approved').count(),
-                    'rejected': Project.query.filter_by(status='rejected').count()
+                    'pending': counts['pending'],
+                    'approved': counts['approved'],
+                    'rejected': counts['rejected']
                 }
             
             return response_data, 200
@@ -112,12 +182,13 @@ class PublicProjects(Resource):
 
 # Featured Projects - Quick endpoint for homepage
 class FeaturedProjects(Resource):
+    @cached_response(lambda body: ['featured', 'projects'] + project_tags(body))
     def get(self):
         """Get featured approved projects for homepage/highlights"""
         try:
-            limit = request.args.get('limit', 6, type=int)  # Default 6 for homepage
+            limit = clamp_page_size(request.args.get('limit', 6, type=int))  # Default 6 for homepage
             
-            projects = Project.query.filter(
+            projects = Project.listing_query().filter(
                 Project.status == 'approved',
                 Project.featured == True
             ).order_by(Project.id.desc()).limit(limit).all()
@@ -132,26 +203,24 @@ class FeaturedProjects(Resource):
 
 # Approved Projects - Public approved projects only
 class ApprovedProjects(Resource):
+    @cached_response(lambda body: ['projects'] + project_tags(body))
     def get(self):
         """Get approved projects for public consumption"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             search = request.args.get('search', '')
             category_id = request.args.get('category_id', type=int)
+            fields, fields_error = get_listing_fields()
+            if fields_error:
+                return {'error': fields_error}, 400
             
             # Start with approved projects only
-            query = Project.query.filter(Project.status == 'approved')
+            query = listing_query(fields).filter(Project.status == 'approved')
             
-            # Search filter
+            # Search filter (full-text, ranked by relevance)
             if search:
-                query = query.filter(
-                    or_(
-                        Project.title.ilike(f'%{search}%'),
-                        Project.description.ilike(f'%{search}%'),
-                        Project.tech_stack.ilike(f'%{search}%')
-                    )
-                )
+                query = search_projects(query, search)
             
             # Category filter
             if category_id:
@@ -167,7 +236,7 @@ class ApprovedProjects(Resource):
             )
             
             return {
-                'projects': [project.to_dict() for project in projects.items],
+                'projects': serialize_listing(projects.items, fields),
                 'total': projects.total,
                 'pages': projects.pages,
                 'current_page': page,
@@ -180,16 +249,20 @@ class ApprovedProjects(Resource):
 
 # Projects by Category - Simple category-based listing
 class ProjectsByCategory(Resource):
+    @cached_response(lambda body, category_id: [f'category:{category_id}', 'categories'] + project_tags(body))
     def get(self, category_id):
         """Get approved projects by category ID"""
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
+            fields, fields_error = get_listing_fields()
+            if fields_error:
+                return {'error': fields_error}, 400
             
             # Verify category exists
             category = Category.query.get_or_404(category_id)
             
-            projects = Project.query.filter(
+            projects = listing_query(fields).filter(
                 Project.category_id == category_id,
                 Project.status == 'approved'
             ).order_by(Project.featured.desc(), Project.id.desc()).paginate(
@@ -200,7 +273,7 @@ class ProjectsByCategory(Resource):
             
             return {
                 'category': category.to_dict(),
-                'projects': [project.to_dict() for project in projects.items],
+                'projects': serialize_listing(projects.items, fields),
                 'total': projects.total,
                 'pages': projects.pages,
                 'current_page': page,
@@ -225,7 +298,7 @@ class MyProjects(Resource):
             # projects = [up.project for up in user_projects]
             
             # Method 2: More efficient - Direct join query
-            projects = Project.query.join(UserProject).filter(
+            projects = Project.listing_query().join(UserProject).filter(
                 UserProject.user_id == user_id
             ).all()
             
@@ -344,6 +417,7 @@ class CreateProject(Resource):
                 project.external_collaborators = json.dumps(external_collaborators)
             
             db.session.commit()
+            invalidate_project(project.id, project.category_id)
             
             return {
                 'message': 'Project created successfully and submitted for review',
@@ -375,11 +449,21 @@ class ProjectDetail(Resource):
             if project.status != 'approved' and not is_admin and not is_owner:
                 return {'error': 'This project is not approved and you do not have permission to view it'}, 403
             
-            # Increment view count
-            project.views += 1
-            db.session.commit()
+            # Increment view count (buffered, written in batches)
+            counter_buffer.increment(project.id, 'views')
             
-            return {'project': project.to_dict()}, 200
+            # Conditional GET - updated_at also changes with embedded reviews/collaborators
+            is_public = project.status == 'approved'
+            etag = make_etag(
+                project.id,
+                project.updated_at,
+                project.category.updated_at if project.category else None
+            )
+            not_modified = not_modified_response(etag, public=is_public)
+            if not_modified is not None:
+                return not_modified
+            
+            return {'project': project.to_dict()}, 200, etag_headers(etag, public=is_public)
             
         except Exception as exc:
             return {'error': str(exc)}, 500
@@ -405,6 +489,7 @@ class ProjectDetail(Resource):
                 return {'error': 'Unauthorized'}, 403
             
             data = request.get_json()
+            previous_category_id = project.category_id
             
             # Update project fields available to both students and admins
             if 'title' in data: project.title = data['title']
@@ -436,6 +521,7 @@ class ProjectDetail(Resource):
                     project.featured = data['featured']
             
             db.session.commit()
+            invalidate_project(project.id, previous_category_id, project.category_id)
             
             return {
                 'message': 'Project updated successfully',
@@ -466,38 +552,10 @@ class ProjectDetail(Resource):
             elif role_name != 'admin':
                 return {'error': 'Unauthorized'}, 403
             
-            # Delete all associated media files from both Cloudinary and Firebase
+            # Media folder in both Cloudinary and Firebase
             sanitized_name = sanitize_folder_name(project.title)
             folder_path = f"projects/{sanitized_name}-{id}"
             
-            total_deleted_count = 0
-            
-            # Delete from Cloudinary (images and thumbnails)
-            try:
-                success, message, deleted_count = delete_folder_from_cloudinary(folder_path)
-                if success:
-                    logger.info(f"Deleted {deleted_count} media files from Cloudinary for project {id}")
-                    total_deleted_count += deleted_count
-                else:
-                    logger.warning(f"Failed to delete some media files from Cloudinary for project {id}: {message}")
-                    # Continue with deletion
-            except Exception as e:
-                logger.error(f"Error deleting Cloudinary media files for project {id}: {str(e)}")
-                # Continue with deletion
-            
-            # Delete from Firebase (videos)
-            try:
-                success, message, deleted_count = delete_folder_from_firebase(folder_path)
-                if success:
-                    logger.info(f"Deleted {deleted_count} video files from Firebase for project {id}")
-                    total_deleted_count += deleted_count
-                else:
-                    logger.warning(f"Failed to delete some video files from Firebase for project {id}: {message}")
-                    # Continue with deletion
-            except Exception as e:
-                logger.error(f"Error deleting Firebase video files for project {id}: {str(e)}")
-                # Continue with deletion
-            
             # Delete all related records first to avoid foreign key constraint issues
             # Delete all UserProject records associated with this project
             UserProject.query.filter_by(project_id=id).delete()
@@ -506,13 +564,29 @@ class ProjectDetail(Resource):
             from models import Review  # Import here to avoid circular imports
             Review.query.filter_by(project_id=id).delete()
             
-            # Now delete the project from database
+            # Delete extracted PDF text
+            ProjectDocument.query.filter_by(project_id=id).delete()
+            ProjectTextIndex.query.filter_by(project_id=id).delete()
+            
+            # Now delete the project from database. The media cleanup job is
+            # stored in the same transaction as the delete and runs (with
+            # retries) once it has committed
+            category_id = project.category_id
             db.session.delete(project)
+            job = enqueue_job(
+                PROJECT_MEDIA_CLEANUP_JOB,
+                {'project_id': id, 'folder_path': folder_path},
+                user_id=current_user.id,
+                dedupe_key=f"{PROJECT_MEDIA_CLEANUP_JOB}:{folder_path}",
+                max_attempts=current_app.config.get('MEDIA_CLEANUP_MAX_ATTEMPTS')
+            )
             db.session.commit()
+            invalidate_project(id, category_id)
             
             return {
-                'message': 'Project and associated media deleted successfully',
-                'media_deleted': total_deleted_count
+                'message': 'Project deleted successfully; media cleanup queued',
+                'media_cleanup_job_id': job.id,
+                'status_url': f"/api/jobs/{job.id}"
             }, 200
             
         except Exception as exc:
@@ -522,7 +596,16 @@ class ProjectDetail(Resource):
 
 
 
+def categories_etag():
+    """ETag for the category list, from one aggregate query"""
+    count, max_id, last_updated = db.session.query(
+        func.count(Category.id), func.max(Category.id), func.max(Category.updated_at)
+    ).one()
+    return make_etag('categories', count, max_id, last_updated)
+
 class ProjectCategories(Resource):
+    @conditional_response(categories_etag)
+    @cached_response(lambda body: ['categories'])
     def get(self):
         """Get all project categories"""
         try:
@@ -538,8 +621,7 @@ class ProjectClick(Resource):
     def post(self, id):
         try:
             project = Project.query.get_or_404(id)
-            project.clicks += 1
-            db.session.commit()
+            counter_buffer.increment(project.id, 'clicks')
             
             return {'message': 'Click recorded'}, 200
             
@@ -551,8 +633,7 @@ class ProjectDownload(Resource):
     def post(self, id):
         try:
             project = Project.query.get_or_404(id)
-            project.downloads += 1
-            db.session.commit()
+            counter_buffer.increment(project.id, 'downloads')
             
             return {'message': 'Download recorded'}, 200
             
@@ -560,26 +641,38 @@ class ProjectDownload(Resource):
             db.session.rollback()
             return {'error': str(exc)}, 500
 
+def get_media_project(project_id):
+    """
+    The project, if the current user may upload media to it
+
+    Returns:
+        tuple: (project, None) or (None, error response)
+    """
+    current_user = get_current_user()
+    role_name = current_user.role.name
+    project = Project.query.get_or_404(project_id)
+    
+    # Check if user is the project owner or admin
+    if role_name == 'student':
+        user_project = UserProject.query.filter_by(
+            user_id=current_user.id,
+            project_id=project_id
+        ).first()
+        if not user_project:
+            return None, ({'error': 'You can only upload media to your own projects'}, 403)
+    elif role_name != 'admin':
+        return None, ({'error': 'Unauthorized'}, 403)
+    return project, None
+
 class ProjectMediaUpload(Resource):
     @jwt_required()
     @admin_or_role_required(['student'])  # Students can upload to their own projects, admins can upload to any
+    @limit_content_length(MEDIA_UPLOAD_MAX_SIZE)
     def post(self, project_id):
         try:
-            current_user = get_current_user()
-            user_id = current_user.id
-            role_name = current_user.role.name
-            project = Project.query.get_or_404(project_id)
-            
-            # Check if user is the project owner or admin
-            if role_name == 'student':
-                user_project = UserProject.query.filter_by(
-                    user_id=user_id,
-                    project_id=project_id
-                ).first()
-                if not user_project:
-                    return {'error': 'You can only upload media to your own projects'}, 403
-            elif role_name != 'admin':
-                return {'error': 'Unauthorized'}, 403
+            project, error = get_media_project(project_id)
+            if error:
+                return error
             
             # Get uploaded files
             videos = request.files.getlist('videos')
@@ -597,39 +690,62 @@ class ProjectMediaUpload(Resource):
             sanitized_name = sanitize_folder_name(project.title)
             folder_path = f"projects/{sanitized_name}-{project_id}"
             
-            # Upload PDFs to Firebase
-            if pdfs and pdfs[0].filename:  # Check if files were actually provided
-                success_count, results, upload_errors = upload_multiple_files_firebase(
-                    pdfs, folder_path, "document"
-                )
-                uploaded_pdfs = results
-                errors.extend(upload_errors)
-            
-            # Upload ZIP files to Firebase
-            if zip_files and zip_files[0].filename:  # Check if files were actually provided
-                success_count, results, upload_errors = upload_multiple_files_firebase(
-                    zip_files, folder_path, "document"
-                )
-                uploaded_zip_files = results
-                errors.extend(upload_errors)
-            
-            # Upload videos to Firebase
-            if videos and videos[0].filename:  # Check if files were actually provided
-                success_count, results, upload_errors = upload_multiple_files_firebase(
-                    videos, folder_path, "video"
-                )
-                uploaded_videos = results
-                errors.extend(upload_errors)
-            
-            # Upload thumbnail
+            # Upload every file concurrently (bounded per request and per
+            # worker); results come back in submission order
+            groups = {
+                'pdfs': [pdf for pdf in pdfs if pdf.filename],
+                'zip_files': [zip_file for zip_file in zip_files if zip_file.filename],
+                'videos': [video for video in videos if video.filename]
+            }
+            tasks, task_files = [], []
+            for group, prefix in (('pdfs', 'document'), ('zip_files', 'document'), ('videos', 'video')):
+                for index, file in enumerate(groups[group]):
+                    tasks.append(lambda file=file, prefix=prefix: upload_file_to_firebase(file, folder_path, prefix))
+                    task_files.append((group, index, file))
             if thumbnail and thumbnail.filename:
-                success, result = upload_file_to_cloudinary(thumbnail, folder_path, "thumbnail")
-                if success:
+                tasks.append(lambda: upload_file_to_cloudinary(thumbnail, folder_path, "thumbnail"))
+                task_files.append(('thumbnail', 0, thumbnail))
+            
+            uploaded = {'pdfs': uploaded_pdfs, 'zip_files': uploaded_zip_files, 'videos': uploaded_videos}
+            for (group, index, file), outcome in zip(task_files, upload_executor.run(tasks)):
+                success, result = outcome if isinstance(outcome, tuple) else (False, f"Upload failed: {str(outcome)}")
+                if not success:
+                    errors.append({'filename': file.filename, 'error': result})
+                elif group == 'thumbnail':
                     uploaded_thumbnail = result
                 else:
-                    errors.append({'filename': thumbnail.filename, 'error': result})
+                    result['index'] = index
+                    uploaded[group].append(result)
+            
+            if uploaded_pdfs:
+                pdf_files = groups['pdfs']
+                
+                # Extract text now so AI requests read it from the database;
+                # the pipeline parses the PDFs in parallel
+                def read_upload(pdf):
+                    pdf_file = pdf_files[pdf['index']]
+                    pdf_file.stream.seek(0)
+                    return pdf_file.stream.read()
+                
+                extractions = ai_agent.pdf_pipeline.run(uploaded_pdfs, read_upload)
+                for pdf, extraction in zip(uploaded_pdfs, extractions):
+                    try:
+                        if extraction.error:
+                            raise Exception(extraction.error)
+                        document = ai_agent.build_project_document(
+                            project.id, pdf['path'], pdf['url'], extraction.content,
+                            extraction=(extraction.text, extraction.page_count)
+                        )
+                        pdf['text_status'] = document.status
+                    except Exception as e:
+                        logger.error(f"Error extracting PDF text for project {project_id}: {str(e)}")
+                        pdf['text_status'] = 'pending'
+            
+            # Every upload has finished - append all URLs in one locked
+            # read-modify-write so concurrent uploads can't drop each other's
+            if uploaded_pdfs or uploaded_zip_files or uploaded_videos:
+                db.session.refresh(project, with_for_update=True)
             
-            # Update project with new media URLs
             if uploaded_pdfs:
                 existing_pdfs = json.loads(project.pdf_urls) if project.pdf_urls else []
                 existing_pdfs.extend([pdf['url'] for pdf in uploaded_pdfs])
@@ -649,6 +765,7 @@ class ProjectMediaUpload(Resource):
                 project.thumbnail_url = uploaded_thumbnail['url']
             
             db.session.commit()
+            invalidate_project(project.id, project.category_id)
             
             return {
                 'message': 'Media uploaded successfully',
@@ -661,11 +778,270 @@ class ProjectMediaUpload(Resource):
                 'errors': errors
             }, 200
             
+        except RequestEntityTooLarge:
+            # Body without a Content-Length that ran past MAX_CONTENT_LENGTH
+            db.session.rollback()
+            return {'error': 'Upload too large. Use the chunked upload endpoints for large files'}, 413
         except Exception as exc:
             db.session.rollback()
             logger.error(f"Error uploading project media: {str(exc)}")
             return {'error': str(exc)}, 500
 
+class ProjectMediaUploadIntent(Resource):
+    """
+    First step of a direct upload: the client uploads each file straight to
+    Firebase (signed PUT URL) or Cloudinary (signed form fields), so large
+    files never pass through a web worker
+    """
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def post(self, project_id):
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            
+            data = request.get_json() or {}
+            files = data.get('files')
+            if not files or not isinstance(files, list):
+                return {'error': 'files must be a non-empty list of {filename, kind, size}'}, 400
+            if len([f for f in files if isinstance(f, dict) and f.get('kind') == 'thumbnail']) > 1:
+                return {'error': 'Only one thumbnail can be uploaded'}, 400
+            
+            sanitized_name = sanitize_folder_name(project.title)
+            folder_path = f"projects/{sanitized_name}-{project_id}"
+            
+            uploads = []
+            errors = []
+            for file in files:
+                if not isinstance(file, dict):
+                    errors.append({'filename': None, 'error': 'Each file must be an object'})
+                    continue
+                try:
+                    uploads.append(create_upload_intent(
+                        project_id, folder_path, file.get('kind'), file.get('filename'), file.get('size')
+                    ))
+                except DirectUploadError as e:
+                    errors.append({'filename': file.get('filename'), 'error': str(e)})
+            
+            return {'uploads': uploads, 'errors': errors}, 200
+            
+        except Exception as exc:
+            logger.error(f"Error creating media upload intent: {str(exc)}")
+            return {'error': str(exc)}, 500
+
+class ProjectMediaUploadComplete(Resource):
+    """Second step of a direct upload: verify the stored objects and attach them to the project"""
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def post(self, project_id):
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            
+            data = request.get_json() or {}
+            tokens = [upload.get('upload_token') for upload in data.get('uploads') or [] if isinstance(upload, dict)]
+            if not tokens:
+                return {'error': 'uploads must be a non-empty list of {upload_token}'}, 400
+            
+            uploaded = {'pdfs': [], 'zip_files': [], 'videos': [], 'thumbnail': None}
+            errors = []
+            
+            claims_list = []
+            for token in tokens:
+                try:
+                    claims_list.append(read_upload_token(token, project_id))
+                except DirectUploadError as e:
+                    errors.append({'upload_token': token, 'error': str(e)})
+            
+            # Each check is a metadata request to the storage backend
+            outcomes = upload_executor.map(complete_upload, claims_list)
+            for claims, outcome in zip(claims_list, outcomes):
+                success, result = outcome if isinstance(outcome, tuple) else (False, f"Upload verification failed: {str(outcome)}")
+                if not success:
+                    errors.append({'filename': claims.get('filename'), 'error': result})
+                elif claims['kind'] == 'thumbnail':
+                    uploaded['thumbnail'] = result
+                else:
+                    uploaded[claims['kind']].append(result)
+            
+            # Append in one locked read-modify-write; completing the same
+            # upload twice doesn't add its URL twice
+            if uploaded['pdfs'] or uploaded['zip_files'] or uploaded['videos']:
+                db.session.refresh(project, with_for_update=True)
+            
+            for kind, column in (('pdfs', 'pdf_urls'), ('zip_files', 'zip_urls'), ('videos', 'video_urls')):
+                if uploaded[kind]:
+                    existing = json.loads(getattr(project, column)) if getattr(project, column) else []
+                    existing.extend(item['url'] for item in uploaded[kind] if item['url'] not in existing)
+                    setattr(project, column, json.dumps(existing))
+            
+            if uploaded['thumbnail']:
+                project.thumbnail_url = uploaded['thumbnail']['url']
+            
+            db.session.commit()
+            invalidate_project(project.id, project.category_id)
+            
+            response = {
+                'message': 'Media uploaded successfully',
+                'uploaded': uploaded,
+                'errors': errors
+            }
+            
+            if uploaded['pdfs']:
+                # The PDFs never passed through this server - extract their
+                # text in the background for the AI features
+                try:
+                    # Keyed by the completed paths: a job already running for
+                    # an earlier batch may have read the PDF list before these
+                    storage_paths = sorted(pdf['path'] for pdf in uploaded['pdfs'])
+                    paths_hash = hashlib.sha256('\n'.join(storage_paths).encode('utf-8')).hexdigest()[:16]
+                    job = enqueue_job(
+                        PROJECT_DOCUMENTS_JOB,
+                        {'project_id': project.id, 'storage_paths': storage_paths},
+                        dedupe_key=f"{PROJECT_DOCUMENTS_JOB}:{project.id}:{paths_hash}"
+                    )
+                    response['job_id'] = job.id
+                    response['status_url'] = f"/api/jobs/{job.id}"
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Error queueing PDF extraction for project {project_id}: {str(e)}")
+            
+            return response, 200
+            
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f"Error completing media upload: {str(exc)}")
+            return {'error': str(exc)}, 500
+
+class ProjectChunkedUploads(Resource):
+    """
+    Resumable uploads for large ZIPs and videos
+
+    POST here to start a session, PUT each part (raw body with an
+    X-Part-SHA256 header) to .../parts/<n>, GET the session to see which
+    parts are still missing after an interruption, then POST .../commit.
+    The commit stores the file in a background job; poll its status_url.
+    """
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def post(self, project_id):
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            
+            data = request.get_json() or {}
+            session = chunked_uploads.create(
+                project.id,
+                get_current_user().id,
+                data.get('kind'),
+                data.get('filename'),
+                data.get('size'),
+                sha256=data.get('sha256')
+            )
+            return session.status(), 201
+            
+        except ChunkedUploadError as e:
+            return {'error': str(e)}, e.status
+        except Exception as exc:
+            logger.error(f"Error starting chunked upload: {str(exc)}")
+            return {'error': str(exc)}, 500
+
+class ProjectChunkedUploadDetail(Resource):
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def get(self, project_id, upload_id):
+        """Resume query: which parts have been received"""
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            return chunked_uploads.get(upload_id, project.id).status(), 200
+        except ChunkedUploadError as e:
+            return {'error': str(e)}, e.status
+    
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def delete(self, project_id, upload_id):
+        """Abort the upload and free its spool space"""
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            chunked_uploads.discard(chunked_uploads.get(upload_id, project.id))
+            return {'message': 'Upload aborted'}, 200
+        except ChunkedUploadError as e:
+            return {'error': str(e)}, e.status
+
+class ProjectChunkedUploadPart(Resource):
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def put(self, project_id, upload_id, part_number):
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            
+            session = chunked_uploads.get(upload_id, project.id)
+            expected = session.part_length(part_number)
+            if request.content_length is not None and request.content_length != expected:
+                return {'error': f"Part {part_number} should be {expected} bytes"}, 400
+            
+            # request.stream is read as it arrives - the part is never held in memory
+            size = session.write_part(part_number, request.stream, request.headers.get('X-Part-SHA256'))
+            return {
+                'part_number': part_number,
+                'size': size,
+                'missing_parts': session.missing_parts()
+            }, 200
+            
+        except ChunkedUploadError as e:
+            return {'error': str(e)}, e.status
+        except Exception as exc:
+            logger.error(f"Error storing upload part: {str(exc)}")
+            return {'error': str(exc)}, 500
+
+class ProjectChunkedUploadCommit(Resource):
+    @jwt_required()
+    @admin_or_role_required(['student'])
+    def post(self, project_id, upload_id):
+        try:
+            project, error = get_media_project(project_id)
+            if error:
+                return error
+            
+            session = chunked_uploads.get(upload_id, project.id)
+            missing = session.missing_parts()
+            if missing:
+                return {'error': f"Missing parts: {missing[:20]}", 'missing_parts': missing}, 409
+            
+            # Verifying and sending the file to Firebase runs in the
+            # background; the job result holds the uploaded file
+            sanitized_name = sanitize_folder_name(project.title)
+            folder_path = f"projects/{sanitized_name}-{project_id}"
+            job = enqueue_job(
+                CHUNKED_UPLOAD_COMMIT_JOB,
+                {'project_id': project.id, 'upload_id': session.upload_id, 'folder_path': folder_path},
+                user_id=get_current_user().id,
+                dedupe_key=f"{CHUNKED_UPLOAD_COMMIT_JOB}:{session.upload_id}"
+            )
+            
+            return {
+                'message': 'Upload complete, storing file',
+                'upload_id': session.upload_id,
+                'job_id': job.id,
+                'status_url': f"/api/jobs/{job.id}"
+            }, 202
+            
+        except ChunkedUploadError as e:
+            return {'error': str(e)}, e.status
+        except Exception as exc:
+            db.session.rollback()
+            logger.error(f"Error committing chunked upload: {str(exc)}")
+            return {'error': str(exc)}, 500
+
 class ProjectMediaDelete(Resource):
     @jwt_required()
     @admin_or_role_required(['student'])
@@ -752,6 +1128,7 @@ class ProjectMediaDelete(Resource):
                     project.thumbnail_url = None
                 
                 db.session.commit()
+                invalidate_project(project.id, project.category_id)
                 return {'message': 'Media deleted successfully'}, 200
             else:
                 return {'error': f'Failed to delete media: {message}'}, 500
@@ -783,4 +1160,10 @@ def setup_routes(api):
     
     # Media endpoints
     api.add_resource(ProjectMediaUpload, '/api/projects/<int:project_id>/media/upload')
+    api.add_resource(ProjectMediaUploadIntent, '/api/projects/<int:project_id>/media/upload-intent')  # Signed direct uploads
+    api.add_resource(ProjectMediaUploadComplete, '/api/projects/<int:project_id>/media/complete')
+    api.add_resource(ProjectChunkedUploads, '/api/projects/<int:project_id>/media/uploads')  # Resumable chunked uploads
+    api.add_resource(ProjectChunkedUploadDetail, '/api/projects/<int:project_id>/media/uploads/<string:upload_id>')
+    api.add_resource(ProjectChunkedUploadPart, '/api/projects/<int:project_id>/media/uploads/<string:upload_id>/parts/<int:part_number>')
+    api.add_resource(ProjectChunkedUploadCommit, '/api/projects/<int:project_id>/media/uploads/<string:upload_id>/commit')
     api.add_resource(ProjectMediaDelete, '/api/projects/<int:project_id>/media/delete')
@@ -5,6 +5,7 @@ from models import db, Sales, SalesItem, Merchandise
 from utils.mpesa import MpesaClient, validate_mpesa_config
 from utils.email_service import send_order_confirmation_email
 from resources.auth.decorators import role_required, get_current_user
+from utils.pagination import get_per_page, get_count_mode, use_cursor_pagination, keyset_paginate, KeysetKey, InvalidCursor
 import uuid
 
 class BuyEndpoint(Resource):
@@ -127,12 +128,27 @@ class AdminSalesList(Resource):
     def get(self):
         try:
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             status = request.args.get('status')  # Filter by status if provided
             
             query = Sales.query
             if status:
                 query = query.filter_by(status=status)
+            
+            if use_cursor_pagination():
+                try:
+                    items, next_cursor, total = keyset_paginate(
+                        query, [KeysetKey(Sales.date), KeysetKey(Sales.id)], per_page, get_count_mode('none')
+                    )
+                except InvalidCursor as exc:
+                    return {'error': str(exc)}, 400
+                
+                return {
+                    'sales': [sale.to_dict() for sale in items],
+                    'next_cursor': next_cursor,
+                    'total': total,
+                    'per_page': per_page
+                }, 200
                 
             sales = query.order_by(Sales.date.desc()).paginate(
                 page=page,
@@ -241,13 +257,30 @@ class UserOrdersList(Resource):
                 return {'error': 'User not found'}, 404
             
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             
             # Get user's orders (sales where user_id matches)
-            orders = Sales.query.filter_by(
+            query = Sales.query.filter_by(
                 user_id=current_user.id,
                 hidden_from_user=False
-            ).order_by(Sales.date.desc()).paginate(
+            )
+            
+            if use_cursor_pagination():
+                try:
+                    items, next_cursor, total = keyset_paginate(
+                        query, [KeysetKey(Sales.date), KeysetKey(Sales.id)], per_page, get_count_mode('none')
+                    )
+                except InvalidCursor as exc:
+                    return {'error': str(exc)}, 400
+                
+                return {
+                    'orders': [order.to_dict() for order in items],
+                    'next_cursor': next_cursor,
+                    'total': total,
+                    'per_page': per_page
+                }, 200
+            
+            orders = query.order_by(Sales.date.desc()).paginate(
                 page=page,
                 per_page=per_page,
                 error_out=False
@@ -4,6 +4,8 @@ from flask_jwt_extended import jwt_required
 from models import db, UserProject, Project, Review, User
 from resources.auth.decorators import admin_or_role_required, get_current_user, flexible_auth_required
 from utils.firebase_auth import get_firebase_user_from_request, create_or_get_user_from_firebase
+from utils.cache import invalidate_project
+from utils.pagination import get_per_page
 from datetime import date
 
 class UserProjectList(Resource):
@@ -60,6 +62,8 @@ class UserProjectList(Resource):
             
             db.session.add(user_project)
             db.session.commit()
+            # Collaborators are embedded in project payloads
+            invalidate_project(user_project.project_id)
             
             return {
                 'message': 'User-project interaction created successfully',
@@ -80,7 +84,7 @@ class UserProjectList(Resource):
             user_id = current_user.id
             role_name = current_user.role.name
             page = request.args.get('page', 1, type=int)
-            per_page = request.args.get('per_page', 10, type=int)
+            per_page = get_per_page()
             
             query = UserProject.query
             
@@ -184,6 +188,7 @@ class CreateProjectReview(Resource):
             
             db.session.add(review)
             db.session.commit()
+            invalidate_project(project_id)
             
             return {
                 'message': 'Review created successfully',
@@ -253,6 +258,7 @@ class HireTeam(Resource):
             
             db.session.add(hire_request)
             db.session.commit()
+            invalidate_project(project_id)
             
             return {
                 'message': 'Hire request sent successfully! The team will be notified.',
@@ -0,0 +1,112 @@
+import fnmatch
+import time
+import pytest
+from flask import Flask
+from sqlalchemy import event
+from models import db
+
+
+@pytest.fixture
+def app():
+    """Minimal app on an in-memory SQLite database with every table created"""
+    app = Flask(__name__)
+    app.config.update(
+        TESTING=True,
+        SQLALCHEMY_DATABASE_URI='sqlite://',
+        SQLALCHEMY_TRACK_MODIFICATIONS=False,
+    )
+    db.init_app(app)
+    with app.app_context():
+        db.create_all()
+        yield app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Context manager factory counting the SELECTs run inside the block"""
+    class QueryCounter:
+        def __init__(self):
+            self.count = 0
+
+        def _before_cursor_execute(self, conn, cursor, statement, *args):
+            if statement.lstrip().upper().startswith('SELECT'):
+                self.count += 1
+
+        def __enter__(self):
+            event.listen(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+            return self
+
+        def __exit__(self, *exc_info):
+            event.remove(db.engine, 'before_cursor_execute', self._before_cursor_execute)
+
+    return QueryCounter
+
+
+class FakeRedis:
+    """In-memory stand-in for the redis client calls the shared backends make"""
+
+    def __init__(self):
+        self._values = {}  # key -> (expires_at or None, value)
+
+    def _live(self, key):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key):
+        entry = self._live(key)
+        return entry[1] if entry is not None else None
+
+    def setex(self, key, ttl, value):
+        self._values[key] = (time.monotonic() + ttl, value.encode() if isinstance(value, str) else value)
+
+    def sadd(self, key, *members):
+        entry = self._live(key)
+        expires_at, current = entry if entry is not None else (None, set())
+        current.update(member.encode() for member in members)
+        self._values[key] = (expires_at, current)
+
+    def smembers(self, key):
+        entry = self._live(key)
+        return set(entry[1]) if entry is not None else set()
+
+    def expire(self, key, ttl):
+        entry = self._live(key)
+        if entry is not None:
+            self._values[key] = (time.monotonic() + ttl, entry[1])
+
+    def delete(self, *keys):
+        for key in keys:
+            self._values.pop(key.decode() if isinstance(key, bytes) else key, None)
+
+    def scan_iter(self, match='*'):
+        return [key.encode() for key in list(self._values) if fnmatch.fnmatch(key, match)]
+
+    def pipeline(self):
+        return FakeRedisPipeline(self)
+
+
+class FakeRedisPipeline:
+    """Queues calls and runs them on execute(), like a redis pipeline"""
+
+    def __init__(self, client):
+        self._client = client
+        self._calls = []
+
+    def __getattr__(self, name):
+        method = getattr(self._client, name)
+        return lambda *args: self._calls.append((method, args))
+
+    def execute(self):
+        results = [method(*args) for method, args in self._calls]
+        self._calls = []
+        return results
+
+
+@pytest.fixture
+def fake_redis():
+    return FakeRedis()
@@ -0,0 +1,122 @@
+import json
+from types import SimpleNamespace
+import pytest
+from resources.ai_agent import ProjectQuestionResource
+from utils.ai_agent import AIAgent, ModelPool, ANSWER_ERROR_MESSAGE
+
+
+class FakeModel:
+    """Stands in for genai.GenerativeModel, streaming canned chunks"""
+
+    def __init__(self, model_name, chunks=(), error=None):
+        self.model_name = model_name
+        self.chunks = chunks
+        self.error = error
+        self.calls = []
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.calls.append({'prompt': prompt, 'stream': stream, 'request_options': request_options})
+        for text in self.chunks:
+            yield SimpleNamespace(text=text)
+        if self.error:
+            raise self.error
+
+
+class FakeModelFactory:
+    def __init__(self, **model_kwargs):
+        self.model_kwargs = model_kwargs
+        self.created = []
+
+    def __call__(self, model_name):
+        model = FakeModel(model_name, **self.model_kwargs)
+        self.created.append(model)
+        return model
+
+
+def make_agent(**model_kwargs):
+    factory = FakeModelFactory(**model_kwargs)
+    return AIAgent(model_factory=factory), factory
+
+
+def ask(agent):
+    project_data = {'title': 'Solar Tracker', 'description': 'Tracks the sun', 'tech_stack': 'Python'}
+    return list(agent.stream_project_answer('What does it do?', project_data))
+
+
+def parse_events(body):
+    """Split an SSE body into (event, data) pairs, checking the framing"""
+    assert body.endswith('\n\n')
+    events = []
+    for block in body[:-2].split('\n\n'):
+        event_line, data_line = block.split('\n')
+        assert event_line.startswith('event: ')
+        assert data_line.startswith('data: ')
+        events.append((event_line[len('event: '):], json.loads(data_line[len('data: '):])))
+    return events
+
+
+@pytest.fixture
+def event_stream(app):
+    def run(pieces, cached=False, on_complete=None):
+        with app.test_request_context():
+            response = ProjectQuestionResource()._event_stream(iter(pieces), cached, on_complete)
+            assert response.mimetype == 'text/event-stream'
+            assert response.headers['Cache-Control'] == 'no-cache'
+            return parse_events(response.get_data(as_text=True))
+    return run
+
+
+def test_model_pool_creates_one_client_per_model_name():
+    factory = FakeModelFactory()
+    pool = ModelPool('default-model', factory=factory)
+
+    assert pool.get() is pool.get()
+    assert pool.get('default-model') is pool.get()
+    assert pool.get('other-model') is not pool.get()
+    assert [model.model_name for model in factory.created] == ['default-model', 'other-model']
+
+
+def test_stream_project_answer_yields_chunks_and_reuses_client():
+    agent, factory = make_agent(chunks=['The project ', '', 'tracks the sun.'])
+
+    assert ask(agent) == ['The project ', 'tracks the sun.']
+    assert ask(agent) == ['The project ', 'tracks the sun.']
+
+    assert len(factory.created) == 1
+    calls = factory.created[0].calls
+    assert len(calls) == 2
+    assert calls[0]['stream'] is True
+    assert calls[0]['request_options'] == {'timeout': agent.llm_gate.call_timeout}
+    assert 'What does it do?' in calls[0]['prompt']
+
+
+def test_stream_project_answer_falls_back_on_model_error():
+    agent, _ = make_agent(chunks=['Partial '], error=RuntimeError('quota exceeded'))
+
+    assert ask(agent) == ['Partial ', ANSWER_ERROR_MESSAGE]
+
+
+def test_event_stream_frames_answer_pieces(event_stream):
+    completed = []
+
+    events = event_stream(['The project ', 'tracks the sun. '], cached=False, on_complete=completed.append)
+
+    assert events == [
+        ('answer', {'text': 'The project '}),
+        ('answer', {'text': 'tracks the sun. '}),
+        ('done', {'cached': False}),
+    ]
+    assert completed == ['The project tracks the sun.']
+
+
+def test_event_stream_reports_model_error(event_stream):
+    agent, _ = make_agent(chunks=['Partial '], error=RuntimeError('quota exceeded'))
+    completed = []
+
+    events = event_stream(ask(agent), on_complete=completed.append)
+
+    assert events == [
+        ('answer', {'text': 'Partial '}),
+        ('error', {'error': ANSWER_ERROR_MESSAGE}),
+    ]
+    assert completed == []
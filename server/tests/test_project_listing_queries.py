@@ -0,0 +1,63 @@
+from datetime import date
+import pytest
+from models import db, Role, User, Category, Project, UserProject, Review, Contribution
+
+
+def create_projects(project_count, collaborators, reviews):
+    """Projects that each have `collaborators` linked users (with a contribution) and `reviews` reviews"""
+    role = Role(name='student')
+    category = Category(name='Web')
+    db.session.add_all([role, category])
+    db.session.flush()
+
+    users = [
+        User(email=f"user{i}@example.com", firebase_uid=f"uid-{i}", role_id=role.id)
+        for i in range(max(collaborators, reviews, 1))
+    ]
+    db.session.add_all(users)
+    db.session.flush()
+
+    for p in range(project_count):
+        project = Project(title=f"Project {p}", category_id=category.id, status='approved')
+        db.session.add(project)
+        db.session.flush()
+        for user in users[:collaborators]:
+            user_project = UserProject(user_id=user.id, project_id=project.id, interested_in='contributor', date=date.today())
+            db.session.add(user_project)
+            db.session.flush()
+            db.session.add(Contribution(users_projects_id=user_project.id, amount=5.0, date=date.today()))
+        for user in users[:reviews]:
+            db.session.add(Review(project_id=project.id, user_id=user.id, rating=4, date=date.today()))
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def serialize_page(per_page=10):
+    projects = Project.listing_query().order_by(Project.id).limit(per_page).all()
+    return [project.to_dict() for project in projects]
+
+
+def queries_for_page(count_queries, collaborators, reviews):
+    create_projects(project_count=10, collaborators=collaborators, reviews=reviews)
+    with count_queries() as counter:
+        page = serialize_page()
+    assert len(page) == 10
+    assert all(len(project['user_projects']) == collaborators for project in page)
+    assert all(len(project['reviews']) == reviews for project in page)
+    return counter.count
+
+
+@pytest.mark.parametrize('collaborators, reviews', [(1, 1), (6, 8)])
+def test_listing_page_query_count_is_fixed(app, count_queries, collaborators, reviews):
+    # One SELECT for the page plus one per eager-loaded collection level:
+    # user_projects, their contributions, and reviews
+    assert queries_for_page(count_queries, collaborators, reviews) == 4
+
+
+def test_listing_query_count_does_not_grow_with_related_rows(app, count_queries):
+    few = queries_for_page(count_queries, collaborators=1, reviews=1)
+    db.session.remove()
+    db.drop_all()
+    db.create_all()
+    many = queries_for_page(count_queries, collaborators=12, reviews=15)
+    assert few == many
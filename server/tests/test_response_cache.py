@@ -0,0 +1,84 @@
+import pytest
+from utils.cache import ResponseCache, RedisCacheBackend
+
+
+@pytest.fixture
+def workers(app):
+    """Two in-process response caches on one database, like two gunicorn workers"""
+    caches = []
+    for _ in range(2):
+        cache = ResponseCache()
+        cache.init_app(app)
+        caches.append(cache)
+    return caches
+
+
+@pytest.fixture
+def redis_workers(app, fake_redis):
+    """Two response caches sharing one (fake) Redis server"""
+    caches = []
+    for _ in range(2):
+        cache = ResponseCache()
+        cache.init_app(app)
+        cache.backend = RedisCacheBackend(client=fake_redis)
+        cache.tag_versions = None
+        caches.append(cache)
+    return caches
+
+
+def cache_response(cache, key, body, tags):
+    generation = cache.generation()
+    cache.set(key, body, tags, generation=generation)
+
+
+def test_in_process_cache_serves_its_own_entries(workers):
+    reader, _ = workers
+
+    cache_response(reader, 'featured', {'projects': [{'id': 1}]}, ['featured', 'project:1'])
+
+    assert reader.get('featured') == {'projects': [{'id': 1}]}
+
+
+def test_invalidation_in_one_worker_reaches_another(workers):
+    reader, writer = workers
+    cache_response(reader, 'featured', {'projects': [{'id': 1}]}, ['featured', 'project:1'])
+    cache_response(reader, 'categories', {'categories': []}, ['categories'])
+
+    writer.invalidate('project:1')
+
+    assert reader.get('featured') is None
+    assert reader.get('categories') == {'categories': []}
+
+
+def test_entries_cached_after_an_invalidation_are_served(workers):
+    reader, writer = workers
+    writer.invalidate('project:1')
+
+    cache_response(reader, 'featured', {'projects': [{'id': 1}]}, ['featured', 'project:1'])
+
+    assert reader.get('featured') == {'projects': [{'id': 1}]}
+
+
+def test_response_built_during_a_write_is_not_served(workers):
+    reader, writer = workers
+
+    # The reader starts building the response, then a write commits and
+    # invalidates before the (possibly stale) response is stored
+    generation = reader.generation()
+    writer.invalidate('project:1')
+    reader.set('featured', {'projects': [{'id': 1}]}, ['featured', 'project:1'], generation=generation)
+
+    assert reader.get('featured') is None
+
+
+def test_redis_backend_invalidation_reaches_every_worker(redis_workers):
+    reader, writer = redis_workers
+    cache_response(reader, 'featured', {'projects': [{'id': 1}]}, ['featured', 'project:1'])
+    cache_response(reader, 'categories', {'categories': []}, ['categories'])
+
+    assert writer.get('featured') == {'projects': [{'id': 1}]}
+
+    writer.invalidate('project:1')
+
+    assert reader.get('featured') is None
+    assert reader.get('categories') == {'categories': []}
@@ -1,16 +1,54 @@
 import os
 import uuid
 import json
+import hashlib
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from flask import current_app
-from PyPDF2 import PdfReader
 import google.generativeai as genai
 import firebase_admin
 from firebase_admin import storage
 from io import BytesIO
+from utils.text_cache import create_text_cache
+from utils.pdf_pipeline import create_pdf_pipeline, extract_pdf
+from utils.llm_gate import create_llm_gate
+import click
+from models import db, ProjectDocument, DocumentText
+
+# Fallback text returned when a model call fails or is rejected
+ANSWER_ERROR_MESSAGE = "I'm sorry, I couldn't process your question due to an AI service error. Please try again later."
+CV_SUMMARY_ERROR_MESSAGE = "CV summary could not be generated due to AI service error."
+PROJECT_SUMMARY_ERROR_MESSAGE = "Project summary could not be generated due to AI service error."
+
+class ModelPool:
+    """
+    GenerativeModel clients shared by every request in a worker
+
+    A client is created the first time a model name is used and reused
+    afterwards. `factory` builds a client from a model name; it defaults to
+    genai.GenerativeModel and can be replaced with a local fake.
+    """
+
+    def __init__(self, default_model, factory=None):
+        self.default_model = default_model
+        self.factory = factory or genai.GenerativeModel
+        self._lock = threading.Lock()
+        self._models = {}
+
+    def get(self, model_name=None):
+        model_name = model_name or self.default_model
+        model = self._models.get(model_name)
+        if model is None:
+            with self._lock:
+                model = self._models.get(model_name)
+                if model is None:
+                    model = self.factory(model_name)
+                    self._models[model_name] = model
+        return model
 
 class AIAgent:
-    def __init__(self):
+    def __init__(self, model_factory=None):
         # Configure Google Generative AI
         self.google_api_key = os.getenv("GOOGLE_API_KEY")
         if self.google_api_key:
@@ -18,6 +56,12 @@ class AIAgent:
         else:
             print("⚠️ GOOGLE_API_KEY not found. AI functionality will not be available.")
         
+        # Model clients, created once per worker
+        self.models = ModelPool(os.getenv("AI_MODEL_NAME", "gemini-2.0-flash-exp"), factory=model_factory)
+        
+        # Concurrency limit, timeout and circuit breaker for model calls
+        self.llm_gate = create_llm_gate()
+        
         # Firebase storage bucket
         try:
             self.bucket = storage.bucket()
@@ -25,18 +69,75 @@ class AIAgent:
             print(f"⚠️ Firebase storage initialization failed: {e}")
             self.bucket = None
         
-        # In-memory text store for quick access
-        self.pdf_text_store = {}
+        # Extracted PDF text (bounded LRU with TTL, optional shared tier)
+        self.text_cache = create_text_cache()
+        
+        # Concurrent download/parse for projects with several PDFs
+        self.pdf_pipeline = create_pdf_pipeline()
+        
+        # Runs CV uploads alongside their text extraction
+        self.upload_executor = ThreadPoolExecutor(
+            max_workers=int(os.getenv("CV_UPLOAD_WORKERS", 4)), thread_name_prefix='cv-upload'
+        )
+
+    def extract_pdf(self, file_stream):
+        """
+        Extract text and page count from PDF file stream
+        
+        Returns:
+            tuple: (text, page_count) - text is None if the PDF can't be parsed
+        """
+        return extract_pdf(file_stream)
 
     def extract_text_from_pdf(self, file_stream):
         """Extract text from PDF file stream"""
-        try:
-            reader = PdfReader(file_stream)
-            text = "\n".join([page.extract_text() or "" for page in reader.pages])
-            return text
-        except Exception as e:
-            print(f"PDF parse error: {e}")
-            return None
+        text, _ = self.extract_pdf(file_stream)
+        return text
+
+    def build_project_document(self, project_id, storage_path, url, pdf_content: bytes, extraction=None):
+        """
+        Extract a project PDF into a ProjectDocument (added to the session, not committed)
+        
+        Args:
+            project_id: Owning project
+            storage_path: Firebase storage path of the PDF
+            url: Public download URL
+            pdf_content: Raw PDF bytes
+            extraction: (text, page_count) if already parsed by the PDF pipeline
+        """
+        text, page_count = extraction if extraction is not None else self.extract_pdf(BytesIO(pdf_content))
+        if text is None:
+            status = ProjectDocument.STATUS_FAILED
+        elif text.strip():
+            status = ProjectDocument.STATUS_EXTRACTED
+        else:
+            status = ProjectDocument.STATUS_EMPTY
+        
+        document = ProjectDocument(
+            project_id=project_id,
+            storage_path=storage_path,
+            url=url,
+            content_hash=hashlib.sha256(pdf_content).hexdigest(),
+            extracted_text=text if status == ProjectDocument.STATUS_EXTRACTED else None,
+            page_count=page_count,
+            status=status,
+            error='PDF could not be parsed' if status == ProjectDocument.STATUS_FAILED else None
+        )
+        db.session.add(document)
+        return document
+
+    def _generate(self, prompt):
+        """
+        Run one model call through the LLM gate
+        
+        Raises:
+            LLMUnavailable: The call was rejected (breaker open or no free slot)
+        """
+        with self.llm_gate.slot():
+            response = self.models.get().generate_content(
+                prompt, request_options={'timeout': self.llm_gate.call_timeout}
+            )
+            return response.text.strip()
 
     def generate_cv_summary(self, text: str) -> str:
         """Generate AI summary for CV content"""
@@ -44,7 +145,6 @@ class AIAgent:
             return "The CV file appears to be empty or unreadable."
         
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
             prompt = f"""
             Analyze this CV/Resume and provide a comprehensive professional summary including:
             
@@ -61,17 +161,14 @@ class AIAgent:
             {text[:8000]}
             """
             
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate(prompt)
         except Exception as e:
             print(f"Gemini CV summary error: {e}")
-            return "CV summary could not be generated due to AI service error."
+            return CV_SUMMARY_ERROR_MESSAGE
 
     def generate_project_summary(self, project_data: dict, documentation_text: str = None) -> str:
         """Generate AI summary for project"""
         try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
             # Combine project data and documentation
             project_info = f"""
             Project Title: {project_data.get('title', 'N/A')}
@@ -99,30 +196,25 @@ class AIAgent:
             {project_info}
             """
             
-            response = model.generate_content(prompt)
-            return response.text.strip()
+            return self._generate(prompt)
         except Exception as e:
             print(f"Gemini project summary error: {e}")
-            return "Project summary could not be generated due to AI service error."
+            return PROJECT_SUMMARY_ERROR_MESSAGE
 
-    def answer_project_question(self, question: str, project_data: dict, documentation_text: str = None) -> str:
-        """Answer questions about a specific project"""
-        try:
-            model = genai.GenerativeModel('gemini-2.0-flash-exp')
-            
-            # Combine project data and documentation
-            context = f"""
+    def _project_question_prompt(self, question, project_data, documentation_text, max_documentation_chars):
+        # Combine project data and documentation
+        context = f"""
             Project: {project_data.get('title', 'N/A')}
             Description: {project_data.get('description', 'N/A')}
             Tech Stack: {project_data.get('tech_stack', 'N/A')}
             GitHub: {project_data.get('github_link', 'N/A')}
             Demo: {project_data.get('demo_link', 'N/A')}
             """
-            
-            if documentation_text:
-                context += f"\n\nDocumentation:\n{documentation_text[:6000]}"
-            
-            prompt = f"""
+        
+        if documentation_text:
+            context += f"\n\nDocumentation:\n{documentation_text[:max_documentation_chars]}"
+        
+        return f"""
             You are an AI assistant helping users understand this Innovation Marketplace project. 
             Answer the following question based on the project information and documentation provided.
             
@@ -136,12 +228,40 @@ class AIAgent:
             
             Answer:
             """
-            
-            response = model.generate_content(prompt)
-            return response.text.strip()
+
+    def answer_project_question(self, question: str, project_data: dict, documentation_text: str = None,
+                                max_documentation_chars: int = 6000) -> str:
+        """Answer questions about a specific project"""
+        try:
+            prompt = self._project_question_prompt(question, project_data, documentation_text, max_documentation_chars)
+            return self._generate(prompt)
         except Exception as e:
             print(f"Gemini question answering error: {e}")
-            return "I'm sorry, I couldn't process your question due to an AI service error. Please try again later."
+            return ANSWER_ERROR_MESSAGE
+
+    def stream_project_answer(self, question: str, project_data: dict, documentation_text: str = None,
+                              max_documentation_chars: int = 6000):
+        """
+        Answer a project question as it is generated
+        
+        Yields:
+            str: Pieces of the answer text. If the model fails, ANSWER_ERROR_MESSAGE
+                 is yielded instead (after any pieces already sent) and the
+                 generator ends.
+        """
+        try:
+            prompt = self._project_question_prompt(question, project_data, documentation_text, max_documentation_chars)
+            # The slot is held until the last piece has been relayed
+            with self.llm_gate.slot():
+                response = self.models.get().generate_content(
+                    prompt, stream=True, request_options={'timeout': self.llm_gate.call_timeout}
+                )
+                for chunk in response:
+                    if chunk.text:
+                        yield chunk.text
+        except Exception as e:
+            print(f"Gemini streaming answer error: {e}")
+            yield ANSWER_ERROR_MESSAGE
 
     # AI documentation methods kept for CV functionality only
     def upload_pdf_to_firebase(self, file_stream, file_type="cv"):
@@ -168,6 +288,24 @@ class AIAgent:
             print(f"Firebase upload error: {e}")
             raise Exception('Failed to upload to Firebase')
 
+    def upload_and_extract_cv(self, upload_buffer):
+        """
+        Upload a buffered CV to Firebase while extracting its text
+        
+        Both read their own view of the same UploadBuffer. If no text can be
+        extracted the uploaded file is deleted again.
+        
+        Returns:
+            tuple: (file_info, text) - text is None if extraction failed
+        """
+        upload = self.upload_executor.submit(self.upload_pdf_to_firebase, upload_buffer.reader(), "cv")
+        text = self.extract_text_from_pdf(upload_buffer.reader())
+        file_info = upload.result()
+        
+        if not text:
+            self.delete_document(file_info['file_id'], file_type="cv")
+        return file_info, text
+
     def save_document_metadata(self, file_id: str, metadata: dict, file_type="cv"):
         """Save document metadata to Firebase (CVs only)"""
         if not self.bucket:
@@ -188,29 +326,121 @@ class AIAgent:
             print(f"Failed to save metadata: {e}")
             raise Exception('Could not save metadata')
 
+    def save_document_text(self, file_id: str, text: str, file_type="cv", user_id=None):
+        """Store a document's full text in the database (added to the session, not committed)"""
+        document_text = db.session.get(DocumentText, file_id) or DocumentText(file_id=file_id)
+        document_text.file_type = file_type
+        document_text.user_id = user_id
+        document_text.text = text
+        db.session.add(document_text)
+        self.text_cache.set(f"{file_type}_{file_id}", text)
+        return document_text
+
     def get_document_text(self, file_id: str, file_type="cv"):
-        """Retrieve document text from cache or Firebase (CVs only)"""
-        # Try from memory first
+        """Retrieve document text from cache or the database (CVs only)"""
+        # Try the text cache first
         cache_key = f"{file_type}_{file_id}"
-        text = self.pdf_text_store.get(cache_key)
+        text = self.text_cache.get(cache_key)
+        if text:
+            return text
         
-        if not text and self.bucket:
-            # Load from Firebase metadata
-            metadata_blob = self.bucket.blob(f"ai_documents/{file_type}/{file_id}.json")
-            if metadata_blob.exists():
+        document_text = db.session.get(DocumentText, file_id)
+        if document_text is not None:
+            text = document_text.text
+        else:
+            # Not backfilled yet - read the legacy metadata blob and record it
+            text = self._load_legacy_document_text(file_id, file_type)
+        
+        if text:
+            self.text_cache.set(cache_key, text)  # Cache for future use
+        return text
+    
+    def _load_legacy_document_text(self, file_id, file_type):
+        """Text from an ai_documents/<type>/<id>.json blob, copied into document_texts"""
+        if not self.bucket:
+            return None
+        
+        metadata_blob = self.bucket.blob(f"ai_documents/{file_type}/{file_id}.json")
+        try:
+            metadata = json.loads(metadata_blob.download_as_text())
+        except Exception as e:
+            print(f"Error loading document text: {e}")
+            return None
+        
+        text = metadata.get("text")
+        if text:
+            try:
+                self.save_document_text(file_id, text, file_type, metadata.get("user_id"))
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                print(f"⚠️ Could not record document text for {file_id}: {e}")
+        return text
+    
+    def backfill_document_texts(self, file_type="cv", strip_blobs=False):
+        """
+        Copy text from every ai_documents/<type>/*.json blob into document_texts
+        
+        Args:
+            file_type: Document folder to scan
+            strip_blobs: Rewrite each migrated blob without its "text" field
+        
+        Returns:
+            tuple: (migrated, skipped) counts
+        """
+        if not self.bucket:
+            raise Exception("Firebase storage not initialized")
+        
+        existing = {file_id for (file_id,) in db.session.query(DocumentText.file_id)}
+        migrated = skipped = 0
+        
+        for blob in self.bucket.list_blobs(prefix=f"ai_documents/{file_type}/"):
+            if not blob.name.endswith('.json'):
+                continue
+            file_id = blob.name.rsplit('/', 1)[-1][:-len('.json')]
+            
+            try:
+                metadata = json.loads(blob.download_as_text())
+            except Exception as e:
+                print(f"⚠️ Skipping unreadable metadata {blob.name}: {e}")
+                skipped += 1
+                continue
+            
+            text = metadata.get("text")
+            if file_id not in existing:
+                if not text:
+                    skipped += 1
+                    continue
                 try:
-                    metadata_str = metadata_blob.download_as_text()
-                    metadata = json.loads(metadata_str)
-                    text = metadata.get("text")
-                    if text:
-                        self.pdf_text_store[cache_key] = text  # Cache for future use
+                    self.save_document_text(file_id, text, file_type, metadata.get("user_id"))
+                    db.session.commit()
                 except Exception as e:
-                    print(f"Error loading document text: {e}")
+                    db.session.rollback()
+                    print(f"⚠️ Could not migrate {blob.name}: {e}")
+                    skipped += 1
+                    continue
+                migrated += 1
+            
+            if strip_blobs and "text" in metadata:
+                metadata.pop("text")
+                blob.upload_from_string(data=json.dumps(metadata), content_type="application/json")
         
-        return text
+        return migrated, skipped
     
     def get_project_pdf_texts(self, project):
         """Extract text from all PDFs in a regular project's media"""
+        return [document.extracted_text for document in self.get_project_documents(project)]
+    
+    def get_project_documents(self, project, record_missing=True):
+        """
+        ProjectDocuments with extracted text for a project's PDFs, in media order
+        
+        Args:
+            project: Project whose pdf_urls are read
+            record_missing: Download and extract PDFs that have no row yet
+                            (uploaded before documents were recorded). With
+                            False only the one ProjectDocument query runs.
+        """
         if not project:
             print("❌ No project provided")
             return []
@@ -230,59 +460,93 @@ class AIAgent:
             print(f"❌ Failed to parse project PDF URLs for '{project.title}': {e}")
             return []
         
-        # Check if Firebase bucket is available
-        if not self.bucket:
-            print("❌ Firebase bucket not initialized - cannot read PDFs")
-            return []
-        
-        pdf_texts = []
+        # Text extracted at upload time - one query for every document
+        documents = {
+            document.storage_path: document
+            for document in ProjectDocument.query.filter_by(project_id=project.id).all()
+        }
         
+        # Resolve storage paths first so missing documents can be fetched together
+        entries = []
         for i, pdf_url in enumerate(pdf_urls):
+            storage_path = self._extract_storage_path_from_url(pdf_url)
+            if not storage_path:
+                print(f"❌ Could not extract storage path from URL: {pdf_url}")
+                continue
+            entries.append((i, pdf_url, storage_path))
+        
+        missing = []
+        for entry in entries:
+            if entry[2] not in documents and entry[2] not in {m[2] for m in missing}:
+                missing.append(entry)
+        recorded = 0
+        if missing and record_missing:
+            # Uploaded before documents were recorded - extract them once now
+            recorded_documents = self._record_legacy_project_pdfs(project.id, missing)
+            documents.update(recorded_documents)
+            recorded = len(recorded_documents)
+        
+        extracted = []
+        for i, pdf_url, storage_path in entries:
+            document = documents.get(storage_path)
+            if document is None:
+                continue
+            if document.status == ProjectDocument.STATUS_EXTRACTED:
+                extracted.append(document)
+            else:
+                print(f"⚠️ No text available for PDF {i+1} (status: {document.status})")
+        
+        if recorded:
             try:
-                # Extract storage path from Firebase URL
-                storage_path = self._extract_storage_path_from_url(pdf_url)
-                if not storage_path:
-                    print(f"❌ Could not extract storage path from URL: {pdf_url}")
-                    continue
-                
-                # Create cache key for this PDF
-                cache_key = f"project_pdf_{storage_path}"
-                
-                # Check cache first
-                cached_text = self.pdf_text_store.get(cache_key)
-                if cached_text:
-                    print(f"✅ Found cached text for PDF {i+1} (length: {len(cached_text)})")
-                    pdf_texts.append(cached_text)
-                    continue
-                
-                # Download and extract text from PDF
-                print(f"📥 Downloading PDF {i+1} from Firebase: {storage_path}")
-                blob = self.bucket.blob(storage_path)
-                
-                if not blob.exists():
-                    print(f"❌ PDF not found in Firebase: {storage_path}")
-                    continue
-                
-                # Download PDF content
-                pdf_content = blob.download_as_bytes()
-                pdf_stream = BytesIO(pdf_content)
-                
-                # Extract text
-                text = self.extract_text_from_pdf(pdf_stream)
-                if text and text.strip():
-                    print(f"✅ Extracted text from PDF {i+1} (length: {len(text)})")
-                    # Cache the text
-                    self.pdf_text_store[cache_key] = text
-                    pdf_texts.append(text)
-                else:
-                    print(f"⚠️ No text extracted from PDF {i+1}")
-                    
+                db.session.commit()
+                print(f"✅ Recorded {recorded} previously unextracted project PDFs")
             except Exception as e:
-                print(f"❌ Error processing PDF {i+1}: {e}")
-                continue
+                db.session.rollback()
+                print(f"⚠️ Could not record extracted PDFs: {e}")
         
-        print(f"📄 Successfully extracted text from {len(pdf_texts)} PDFs")
-        return pdf_texts
+        print(f"📄 Successfully extracted text from {len(extracted)} PDFs")
+        return extracted
+    
+    def _record_legacy_project_pdfs(self, project_id, entries):
+        """
+        Download and extract PDFs that have no ProjectDocument row yet
+        
+        Downloads and parsing run concurrently through the PDF pipeline.
+        Documents that are missing, fail to download or time out get no row,
+        so they are tried again on the next request.
+        
+        Args:
+            project_id: Owning project
+            entries: List of (index, url, storage_path)
+        
+        Returns:
+            dict: storage_path -> ProjectDocument added to the session
+        """
+        if not self.bucket:
+            print("❌ Firebase bucket not initialized - cannot read PDFs")
+            return {}
+        
+        def fetch(storage_path):
+            blob = self.bucket.blob(storage_path)
+            if not blob.exists():
+                return None
+            return blob.download_as_bytes()
+        
+        print(f"📥 Downloading {len(entries)} PDFs from Firebase")
+        results = self.pdf_pipeline.run([storage_path for _, _, storage_path in entries], fetch)
+        
+        recorded = {}
+        for (i, pdf_url, storage_path), result in zip(entries, results):
+            if result.error:
+                print(f"❌ Could not extract PDF {i+1} ({storage_path}): {result.error}")
+                continue
+            document = self.build_project_document(
+                project_id, storage_path, pdf_url, result.content,
+                extraction=(result.text, result.page_count)
+            )
+            print(f"✅ Extracted PDF {i+1} (status: {document.status}, pages: {document.page_count})")
+            recorded[storage_path] = document
+        return recorded
     
     def _extract_storage_path_from_url(self, url):
         """Extract Firebase storage path from download URL"""
@@ -307,13 +571,14 @@ class AIAgent:
             return None
 
     def delete_document(self, file_id: str, file_type="general"):
-        """Delete document and metadata from Firebase"""
+        """Delete document text and the Firebase file and metadata (the caller commits)"""
+        cache_key = f"{file_type}_{file_id}"
+        self.text_cache.pop(cache_key)
+        DocumentText.query.filter_by(file_id=file_id).delete()
+        
         if not self.bucket:
             return
         
-        cache_key = f"{file_type}_{file_id}"
-        self.pdf_text_store.pop(cache_key, None)
-        
         try:
             # Delete PDF file
             pdf_blob = self.bucket.blob(f"ai_documents/{file_type}/{file_id}")
@@ -328,3 +593,14 @@ class AIAgent:
             print(f"Delete error: {e}")
 
 ai_agent = AIAgent()
+
+def init_ai_agent(app):
+    """Register the `flask backfill-document-text` command"""
+
+    @app.cli.command('backfill-document-text')
+    @click.option('--file-type', default='cv', show_default=True, help='ai_documents folder to migrate')
+    @click.option('--strip-blobs', is_flag=True, help='Remove the text from migrated metadata blobs')
+    def backfill_document_text_command(file_type, strip_blobs):
+        """Copy document text from Firebase metadata blobs into the database"""
+        migrated, skipped = ai_agent.backfill_document_texts(file_type, strip_blobs)
+        click.echo(f"✅ Migrated {migrated} documents ({skipped} skipped)")
@@ -0,0 +1,126 @@
+from datetime import datetime
+from io import BytesIO
+from models import db, User, Project, ProjectDocument
+from utils.ai_agent import ai_agent, CV_SUMMARY_ERROR_MESSAGE, PROJECT_SUMMARY_ERROR_MESSAGE
+from utils.cache import invalidate_project
+from utils.jobs import job_handler, is_final_attempt, PermanentJobError
+
+# Job types
+CV_PROCESS_JOB = 'cv_process'
+PROJECT_SUMMARY_JOB = 'project_summary'
+PROJECT_DOCUMENTS_JOB = 'project_documents'
+
+@job_handler(CV_PROCESS_JOB)
+def process_cv(payload):
+    """Extract, summarize and record a CV already uploaded to Firebase"""
+    user = User.query.get(payload['user_id'])
+    if not user:
+        raise PermanentJobError('User not found')
+
+    if not ai_agent.bucket:
+        raise Exception("Firebase storage not initialized")
+
+    file_id = payload['file_id']
+
+    # Text stored by the upload request; older jobs only have the blob
+    text = ai_agent.get_document_text(file_id, file_type="cv")
+    if not text:
+        pdf_content = ai_agent.bucket.blob(payload['blob_path']).download_as_bytes()
+        text = ai_agent.extract_text_from_pdf(BytesIO(pdf_content))
+        if text:
+            ai_agent.save_document_text(file_id, text, file_type="cv", user_id=user.id)
+    if not text:
+        ai_agent.delete_document(file_id, file_type="cv")
+        raise PermanentJobError('Failed to extract text from CV')
+
+    # Generate AI summary
+    summary = ai_agent.generate_cv_summary(text)
+    if summary == CV_SUMMARY_ERROR_MESSAGE and ai_agent.google_api_key and not is_final_attempt():
+        # AI service failing or shedding load - retry later with backoff.
+        # Without a model, or on the last attempt, the CV is still saved
+        # with the fallback summary rather than left orphaned in storage.
+        raise Exception("AI service unavailable for CV summary")
+
+    # Save metadata to Firebase
+    metadata = {
+        "file_id": file_id,
+        "user_id": user.id,
+        "user_email": user.email,
+        "summary": summary,
+        "url": payload['url'],
+        "filename": payload.get('filename')
+    }
+    ai_agent.save_document_metadata(file_id, metadata, file_type="cv")
+
+    # Update user record
+    user.cv_url = payload['url']
+    user.cv_summary = summary
+    user.cv_file_id = file_id
+    user.cv_uploaded_at = datetime.utcnow()
+    user.cv_content_hash = payload.get('content_hash')
+    db.session.commit()
+
+    return {
+        'file_id': file_id,
+        'summary': summary,
+        'url': payload['url']
+    }
+
+@job_handler(PROJECT_SUMMARY_JOB)
+def generate_project_summary(payload):
+    """Generate and save the AI summary of a project from its PDFs"""
+    project = Project.query.get(payload['project_id'])
+    if not project:
+        raise PermanentJobError('Project not found')
+
+    if project.project_summary:
+        return {'project_id': project.id, 'summary': project.project_summary}
+
+    project_data = {
+        'title': project.title,
+        'description': project.description,
+        'tech_stack': project.tech_stack,
+        'technical_mentor': project.technical_mentor
+    }
+
+    summary = None
+    project_pdf_texts = ai_agent.get_project_pdf_texts(project)
+    if project_pdf_texts:
+        combined_pdf_text = "\n\n=== DOCUMENT SEPARATOR ===\n\n".join(project_pdf_texts)
+        summary = ai_agent.generate_project_summary(project_data, combined_pdf_text)
+        if summary == PROJECT_SUMMARY_ERROR_MESSAGE:
+            # Don't save the fallback text as the project's summary
+            raise Exception("AI service unavailable for project summary")
+
+        # Save the generated summary back to the project
+        project.project_summary = summary
+        db.session.commit()
+        invalidate_project(project.id, project.category_id)
+        print(f"✅ Generated and saved new summary for project {project.id}")
+
+    return {'project_id': project.id, 'summary': summary}
+
+@job_handler(PROJECT_DOCUMENTS_JOB)
+def extract_project_documents(payload):
+    """Extract and record the text of project PDFs uploaded directly to storage"""
+    project = Project.query.get(payload['project_id'])
+    if not project:
+        raise PermanentJobError('Project not found')
+
+    # Records a ProjectDocument for every PDF that doesn't have one yet
+    documents = ai_agent.get_project_documents(project)
+
+    # The paths this job was queued for must now be recorded (a concurrent
+    # job may have won the insert); retry if any are still missing
+    storage_paths = payload.get('storage_paths') or []
+    if storage_paths:
+        recorded = {
+            storage_path for (storage_path,) in db.session.query(ProjectDocument.storage_path).filter(
+                ProjectDocument.storage_path.in_(storage_paths)
+            )
+        }
+        missing = [storage_path for storage_path in storage_paths if storage_path not in recorded]
+        if missing:
+            raise Exception(f"PDF text not recorded yet for: {', '.join(missing[:5])}")
+
+    return {'project_id': project.id, 'documents': len(documents)}
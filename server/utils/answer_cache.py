@@ -0,0 +1,142 @@
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Words that don't change what a question asks for near-duplicate matching
+FILLER_WORDS = frozenset([
+    'a', 'an', 'the', 'is', 'are', 'does', 'do', 'this', 'please', 'tell', 'me', 'can', 'you', 'of', 'it'
+])
+
+def normalize_question(question):
+    """Lowercase, punctuation-free, single-spaced form of a question"""
+    return ' '.join(re.sub(r"[^a-z0-9+#]+", ' ', question.lower()).split())
+
+def question_tokens(normalized):
+    return frozenset(word for word in normalized.split() if word not in FILLER_WORDS)
+
+def project_fingerprint(project_data, corpus_hash):
+    """
+    Identity of everything an answer about a project depends on
+
+    Covers the project fields placed in the prompt and the content hashes of
+    its documents, so editing the project or its PDFs changes the key and
+    every worker misses on its stale answers.
+    """
+    digest = hashlib.sha256()
+    digest.update(json.dumps(project_data, sort_keys=True, default=str).encode('utf-8'))
+    digest.update(corpus_hash.encode('utf-8'))
+    return digest.hexdigest()
+
+class AnswerCache:
+    """
+    LRU cache with TTL for AI answers to project questions
+
+    Entries are keyed by project id, project fingerprint and normalized
+    question. With similarity > 0, a question with no exact entry reuses the
+    answer of a cached question on the same project whose word sets have at
+    least that Jaccard similarity ("What tech stack does this use?" and
+    "what tech stack does it use"). Each worker has its own copy.
+    """
+
+    def __init__(self, max_entries=2048, ttl=86400, similarity=0.85):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.similarity = similarity
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # (project_id, fingerprint, question) -> (expires_at, tokens, answer)
+        self._by_project = {}  # project_id -> set of keys
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+
+    def get(self, project_id, fingerprint, question):
+        """Return a cached answer or None"""
+        normalized = normalize_question(question)
+        key = (project_id, fingerprint, normalized)
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] >= now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[2]
+
+            if self.similarity > 0:
+                tokens = question_tokens(normalized)
+                best_key, best_score = None, self.similarity
+                for candidate in self._by_project.get(project_id, ()):
+                    expires_at, candidate_tokens, _ = self._entries[candidate]
+                    if candidate[1] != fingerprint or expires_at < now or not candidate_tokens:
+                        continue
+                    score = len(tokens & candidate_tokens) / len(tokens | candidate_tokens)
+                    if score >= best_score:
+                        best_key, best_score = candidate, score
+                if best_key is not None:
+                    self._entries.move_to_end(best_key)
+                    self.near_hits += 1
+                    return self._entries[best_key][2]
+
+            self.misses += 1
+            return None
+
+    def set(self, project_id, fingerprint, question, answer):
+        normalized = normalize_question(question)
+        key = (project_id, fingerprint, normalized)
+        with self._lock:
+            # Answers for an older fingerprint can never be hit again
+            for stale in [k for k in self._by_project.get(project_id, ()) if k[1] != fingerprint]:
+                self._remove(stale)
+
+            self._entries[key] = (time.monotonic() + self.ttl, question_tokens(normalized), answer)
+            self._entries.move_to_end(key)
+            self._by_project.setdefault(project_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate_project(self, project_id):
+        with self._lock:
+            for key in list(self._by_project.get(project_id, ())):
+                self._remove(key)
+
+    def _remove(self, key):
+        self._entries.pop(key, None)
+        keys = self._by_project.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._by_project[key[0]]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.near_hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'ttl': self.ttl,
+                'similarity': self.similarity,
+                'hits': self.hits,
+                'near_hits': self.near_hits,
+                'misses': self.misses,
+                'hit_rate': round((self.hits + self.near_hits) / lookups, 3) if lookups else None
+            }
+
+def create_answer_cache():
+    """
+    Build the answer cache from environment variables
+
+    AI_ANSWER_CACHE_MAX_ENTRIES: answers kept per worker, 0 = disabled (default 2048)
+    AI_ANSWER_CACHE_TTL: seconds an answer is reused (default 86400)
+    AI_ANSWER_CACHE_SIMILARITY: Jaccard threshold for near-duplicate questions, 0 = exact only (default 0.85)
+    """
+    return AnswerCache(
+        max_entries=int(os.getenv('AI_ANSWER_CACHE_MAX_ENTRIES', 2048)),
+        ttl=int(os.getenv('AI_ANSWER_CACHE_TTL', 24 * 3600)),
+        similarity=float(os.getenv('AI_ANSWER_CACHE_SIMILARITY', 0.85))
+    )
+
+answer_cache = create_answer_cache()
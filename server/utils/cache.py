@@ -0,0 +1,308 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from urllib.parse import urlencode
+from flask import request
+from sqlalchemy import func, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from models import db, CacheTagVersion
+from utils.answer_cache import answer_cache
+
+logger = logging.getLogger(__name__)
+
+class MemoryCacheBackend:
+    """
+    In-process LRU cache with per-entry TTL and tag index
+
+    Each gunicorn worker has its own copy, so its tag index only sees the
+    worker's own invalidations. ResponseCache checks entries against
+    TagVersions as well, so writes made through other workers are seen too.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value, tags)
+        self._tags = {}  # tag -> set of keys
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value, _ = entry
+            if expires_at < time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl, tags=()):
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+
+    def invalidate_tags(self, tags):
+        with self._lock:
+            for tag in tags:
+                for key in list(self._tags.pop(tag, ())):
+                    self._remove(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+
+    def _remove(self, key):
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+
+class RedisCacheBackend:
+    """
+    Cache shared by all workers through Redis
+
+    Entries expire through Redis TTLs; configure the server with
+    maxmemory-policy allkeys-lru for LRU eviction. Tags are Redis sets of
+    cache keys.
+    """
+
+    def __init__(self, url=None, prefix='response_cache:', client=None):
+        if client is None:
+            import redis  # Optional dependency, only needed for the shared backend
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl, tags=()):
+        pipeline = self.client.pipeline()
+        pipeline.setex(self.prefix + key, ttl, json.dumps(value))
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            pipeline.sadd(tag_key, key)
+            pipeline.expire(tag_key, ttl)
+        pipeline.execute()
+
+    def invalidate_tags(self, tags):
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self.client.smembers(tag_key)
+            pipeline = self.client.pipeline()
+            for key in keys:
+                pipeline.delete(self.prefix + key.decode())
+            pipeline.delete(tag_key)
+            pipeline.execute()
+
+    def clear(self):
+        keys = list(self.client.scan_iter(match=f"{self.prefix}*"))
+        if keys:
+            self.client.delete(*keys)
+
+def _upsert_tag_version(connection, tag, version, on_conflict):
+    """Insert a tag with `version`, or set an existing one to `on_conflict`"""
+    table = CacheTagVersion.__table__
+    dialect = {'postgresql': postgresql, 'sqlite': sqlite}.get(connection.dialect.name)
+    if dialect is not None:
+        connection.execute(
+            dialect.insert(table).values(tag=tag, version=version).on_conflict_do_update(
+                index_elements=[table.c.tag], set_={'version': on_conflict}
+            )
+        )
+        return
+    result = connection.execute(update(table).where(table.c.tag == tag).values(version=on_conflict))
+    if result.rowcount == 0:
+        connection.execute(table.insert().values(tag=tag, version=version))
+
+class TagVersions:
+    """
+    Invalidation generations shared by every worker through cache_tag_versions
+
+    Invalidating tags bumps the global generation and stamps it on each
+    tag. A response remembers the generation read before it was computed
+    and is served only while none of its tags has a newer one, so a write
+    committed while the response was being built invalidates it as well.
+    """
+
+    GLOBAL_TAG = '*'
+
+    def generation(self):
+        """Current global generation; read it before computing a response"""
+        table = CacheTagVersion.__table__
+        version = db.session.execute(
+            select(table.c.version).where(table.c.tag == self.GLOBAL_TAG)
+        ).scalar()
+        return version or 0
+
+    def is_current(self, tags, generation):
+        """Whether no tag was invalidated after `generation`"""
+        if not tags:
+            return True
+        table = CacheTagVersion.__table__
+        newest = db.session.execute(
+            select(func.max(table.c.version)).where(table.c.tag.in_(tags))
+        ).scalar()
+        return (newest or 0) <= generation
+
+    def bump(self, tags):
+        """Invalidate tags for every worker (committed in its own transaction)"""
+        table = CacheTagVersion.__table__
+        with db.engine.begin() as connection:
+            _upsert_tag_version(connection, self.GLOBAL_TAG, 1, table.c.version + 1)
+            generation = connection.execute(
+                select(table.c.version).where(table.c.tag == self.GLOBAL_TAG)
+            ).scalar()
+            for tag in set(tags):
+                _upsert_tag_version(connection, tag, generation, generation)
+
+class ResponseCache:
+    """
+    Response cache for public, read-mostly endpoints with tag-based invalidation
+
+    The in-process backend validates entries against TagVersions, so an
+    invalidation in any worker reaches all of them. The Redis backend is
+    shared, so its own tag sets already do.
+    """
+
+    def __init__(self):
+        self.backend = MemoryCacheBackend()
+        self.tag_versions = None
+        self.default_ttl = 60
+        self.enabled = True
+
+    def init_app(self, app):
+        self.default_ttl = app.config.get('RESPONSE_CACHE_TTL', 60)
+        self.enabled = self.default_ttl > 0
+
+        self.backend = MemoryCacheBackend(app.config.get('RESPONSE_CACHE_MAX_ENTRIES', 1024))
+        self.tag_versions = TagVersions()
+
+        backend_url = app.config.get('RESPONSE_CACHE_URL')
+        if backend_url:
+            try:
+                self.backend = RedisCacheBackend(backend_url)
+                self.tag_versions = None
+                print("✅ Shared response cache enabled")
+            except Exception as e:
+                print(f"⚠️ Shared response cache unavailable, using in-process cache: {e}")
+
+    def make_key(self):
+        """Cache key for the current request: endpoint, path and sorted query args"""
+        args = sorted(request.args.items(multi=True))
+        return f"{request.endpoint}:{request.path}?{urlencode(args)}"
+
+    def generation(self):
+        """
+        Generation to pass to set() for a response about to be computed
+
+        Returns None when the response must not be cached because the shared
+        invalidation state can't be read.
+        """
+        if not self.enabled or self.tag_versions is None:
+            return 0
+        try:
+            return self.tag_versions.generation()
+        except Exception as e:
+            logger.warning(f"Response cache generation read failed: {str(e)}")
+            return None
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+            if value is None or self.tag_versions is None:
+                return value
+            if not self.tag_versions.is_current(value['tags'], value['generation']):
+                return None
+            return value['body']
+        except Exception as e:
+            logger.warning(f"Response cache read failed: {str(e)}")
+            return None
+
+    def set(self, key, value, tags=(), ttl=None, generation=0):
+        if not self.enabled or generation is None:
+            return
+        if self.tag_versions is not None:
+            value = {'body': value, 'tags': list(tags), 'generation': generation}
+        try:
+            self.backend.set(key, value, ttl or self.default_ttl, tags)
+        except Exception as e:
+            logger.warning(f"Response cache write failed: {str(e)}")
+
+    def invalidate(self, *tags):
+        """Drop every cached response carrying any of the given tags, in every worker"""
+        try:
+            self.backend.invalidate_tags(tags)
+        except Exception as e:
+            logger.error(f"Response cache invalidation failed for {tags}: {str(e)}")
+        if self.tag_versions is not None:
+            try:
+                self.tag_versions.bump(tags)
+            except Exception as e:
+                logger.error(f"Response cache invalidation failed for {tags}: {str(e)}")
+
+    def clear(self):
+        self.backend.clear()
+
+response_cache = ResponseCache()
+
+def init_response_cache(app):
+    """Initialize the response cache with the Flask app"""
+    response_cache.init_app(app)
+
+def cached_response(tags, ttl=None):
+    """
+    Cache successful responses of a Resource method
+
+    Args:
+        tags: Callable (body, **view_args) -> list of tags for the response
+        ttl: Optional TTL in seconds (defaults to RESPONSE_CACHE_TTL)
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            key = response_cache.make_key()
+            body = response_cache.get(key)
+            if body is not None:
+                return body, 200
+
+            # Read before the response is built, so a write committed
+            # meanwhile invalidates it
+            generation = response_cache.generation()
+            result = fn(*args, **kwargs)
+            body, status = result if isinstance(result, tuple) else (result, 200)
+            if status == 200:
+                response_cache.set(key, body, tags(body, **kwargs), ttl, generation=generation)
+            return result
+        return decorator
+    return wrapper
+
+def project_tags(body):
+    """project:<id> tags for every project in a listing response"""
+    return [f"project:{project['id']}" for project in body.get('projects', [])]
+
+def invalidate_project(project_id, *category_ids):
+    """Invalidate every cached response the project can appear in"""
+    tags = [f"project:{project_id}", 'projects', 'featured']
+    tags.extend(f"category:{category_id}" for category_id in category_ids if category_id)
+    response_cache.invalidate(*tags)
+    # Answers are also keyed by a project fingerprint, so this only frees
+    # memory early in the worker that made the change
+    answer_cache.invalidate_project(project_id)
@@ -0,0 +1,349 @@
+import fcntl
+import hashlib
+import json
+import logging
+import os
+import re
+import shutil
+import tempfile
+import time
+import uuid
+import click
+from utils import firebase_storage
+
+logger = logging.getLogger(__name__)
+
+# Media kinds that can be uploaded in parts -> (filename prefix, Firebase file type)
+CHUNKED_KINDS = {
+    'zip_files': ('document', 'document'),
+    'videos': ('video', 'video')
+}
+
+# Google Cloud Storage resumable uploads need chunks in multiples of 256 KiB
+RESUMABLE_CHUNK_ALIGNMENT = 256 * 1024
+
+_UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+class ChunkedUploadError(Exception):
+    """Raised for a part or commit the upload session won't accept"""
+
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+class ChunkedUploadSession:
+    """
+    One chunked upload spooled under <directory>/<upload_id>
+
+    session.json holds the upload's metadata, `data` is a sparse file of
+    the final size that verified parts are copied into at their offsets,
+    and parts/<n> records the checksum of every part that arrived intact.
+    A part is spooled to its own temporary file first, so a bad re-send
+    never touches data that was already accepted.
+    Nothing is kept in memory, so any web worker on the host can serve
+    any part and a part can be re-sent as often as needed.
+    """
+
+    def __init__(self, directory, meta):
+        self.directory = directory
+        self.meta = meta
+
+    @property
+    def upload_id(self):
+        return self.meta['upload_id']
+
+    @property
+    def data_path(self):
+        return os.path.join(self.directory, 'data')
+
+    @property
+    def parts_path(self):
+        return os.path.join(self.directory, 'parts')
+
+    def part_length(self, part_number):
+        """Expected length of a part; every part but the last is part_size bytes"""
+        if part_number < 0 or part_number >= self.meta['part_count']:
+            raise ChunkedUploadError(f"Part number must be between 0 and {self.meta['part_count'] - 1}")
+        offset = part_number * self.meta['part_size']
+        return min(self.meta['part_size'], self.meta['size'] - offset)
+
+    def received_parts(self):
+        return sorted(int(name) for name in os.listdir(self.parts_path) if name.isdigit())
+
+    def missing_parts(self):
+        received = set(self.received_parts())
+        return [part for part in range(self.meta['part_count']) if part not in received]
+
+    def part_checksum(self, part_number):
+        """Stored SHA-256 of a received part, or None"""
+        try:
+            with open(os.path.join(self.parts_path, str(part_number))) as f:
+                return f.read().strip() or None
+        except OSError:
+            return None
+
+    def write_part(self, part_number, stream, checksum, chunk_size=64 * 1024):
+        """
+        Stream a part from the request body into the spool file
+
+        The body goes to a temporary file and is only copied into `data`
+        and recorded as received once its length and SHA-256 match, so a
+        truncated or corrupted part is simply sent again. Re-sending a
+        part marks it missing until the new copy has been verified.
+
+        Args:
+            part_number: Zero-based part index
+            stream: Request body stream
+            checksum: Expected hex SHA-256 of the part
+        """
+        expected = self.part_length(part_number)
+        if not checksum:
+            raise ChunkedUploadError('X-Part-SHA256 header is required')
+
+        marker = os.path.join(self.parts_path, str(part_number))
+        try:
+            os.unlink(marker)
+        except FileNotFoundError:
+            pass
+
+        digest = hashlib.sha256()
+        written = 0
+        with tempfile.TemporaryFile(dir=self.directory) as spool:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                written += len(chunk)
+                if written > expected:
+                    raise ChunkedUploadError(f"Part {part_number} is larger than {expected} bytes", 413)
+                digest.update(chunk)
+                spool.write(chunk)
+
+            if written != expected:
+                raise ChunkedUploadError(f"Part {part_number} should be {expected} bytes, got {written}")
+            if digest.hexdigest() != checksum.lower():
+                raise ChunkedUploadError(f"Checksum mismatch for part {part_number}", 422)
+
+            # Verified - copy it into place
+            spool.seek(0)
+            offset = part_number * self.meta['part_size']
+            fd = os.open(self.data_path, os.O_WRONLY)
+            try:
+                for chunk in iter(lambda: spool.read(chunk_size), b''):
+                    os.pwrite(fd, chunk, offset)
+                    offset += len(chunk)
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+        temporary = f"{marker}.{uuid.uuid4().hex}.tmp"
+        with open(temporary, 'w') as f:
+            f.write(checksum.lower())
+        os.replace(temporary, marker)
+        return written
+
+    def status(self):
+        received = self.received_parts()
+        return {
+            'upload_id': self.upload_id,
+            'kind': self.meta['kind'],
+            'filename': self.meta['filename'],
+            'size': self.meta['size'],
+            'part_size': self.meta['part_size'],
+            'part_count': self.meta['part_count'],
+            'received_parts': received,
+            'missing_parts': self.missing_parts(),
+            'expires_at': self.meta['expires_at']
+        }
+
+class ChunkedUploadStore:
+    """Creates, finds and expires chunked upload sessions in a spool directory"""
+
+    def __init__(self):
+        self.directory = os.path.join(tempfile.gettempdir(), 'chunked_uploads')
+        self.part_size = 8 * 1024 * 1024
+        self.ttl = 24 * 3600
+
+    def init_app(self, app):
+        self.directory = app.config.get('CHUNKED_UPLOAD_DIR') or self.directory
+        # Whole resumable-upload chunks, so a part maps onto a GCS request
+        part_size = app.config.get('CHUNKED_UPLOAD_PART_SIZE', self.part_size)
+        self.part_size = max(1, part_size // RESUMABLE_CHUNK_ALIGNMENT) * RESUMABLE_CHUNK_ALIGNMENT
+        self.ttl = app.config.get('CHUNKED_UPLOAD_TTL', self.ttl)
+        os.makedirs(self.directory, exist_ok=True)
+        self._register_cli(app)
+
+    def _session_dir(self, upload_id):
+        if not upload_id or not _UPLOAD_ID_PATTERN.match(upload_id):
+            raise ChunkedUploadError('Upload not found', 404)
+        return os.path.join(self.directory, upload_id)
+
+    def create(self, project_id, user_id, kind, filename, size, sha256=None):
+        """
+        Start a chunked upload session
+
+        Raises:
+            ChunkedUploadError: Unknown kind, disallowed type or invalid size
+        """
+        if kind not in CHUNKED_KINDS:
+            raise ChunkedUploadError(f"Chunked uploads support: {', '.join(CHUNKED_KINDS)}")
+        _, file_type = CHUNKED_KINDS[kind]
+        if not firebase_storage.allowed_file(filename, file_type):
+            raise ChunkedUploadError(f"File type not allowed for {kind}: {filename}")
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise ChunkedUploadError('size must be a number of bytes')
+        max_size = firebase_storage.get_max_size(file_type)
+        if size <= 0 or size > max_size:
+            raise ChunkedUploadError(f"File size must be between 1 byte and {max_size // (1024 * 1024)}MB", 413 if size > 0 else 400)
+
+        self.expire_stale()
+
+        upload_id = uuid.uuid4().hex
+        directory = os.path.join(self.directory, upload_id)
+        os.makedirs(os.path.join(directory, 'parts'))
+        with open(os.path.join(directory, 'data'), 'wb') as f:
+            f.truncate(size)
+
+        meta = {
+            'upload_id': upload_id,
+            'project_id': project_id,
+            'user_id': user_id,
+            'kind': kind,
+            'filename': filename,
+            'size': size,
+            'sha256': sha256.lower() if sha256 else None,
+            'part_size': self.part_size,
+            'part_count': -(-size // self.part_size),
+            'created_at': time.time(),
+            'expires_at': time.time() + self.ttl
+        }
+        with open(os.path.join(directory, 'session.json'), 'w') as f:
+            json.dump(meta, f)
+        return ChunkedUploadSession(directory, meta)
+
+    def get(self, upload_id, project_id):
+        """
+        The live session with this id, which must belong to the project
+
+        Raises:
+            ChunkedUploadError: 404 if unknown, expired or for another project
+        """
+        directory = self._session_dir(upload_id)
+        try:
+            with open(os.path.join(directory, 'session.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            raise ChunkedUploadError('Upload not found', 404)
+        if meta['project_id'] != project_id or meta['expires_at'] < time.time():
+            raise ChunkedUploadError('Upload not found', 404)
+        return ChunkedUploadSession(directory, meta)
+
+    def discard(self, session):
+        shutil.rmtree(session.directory, ignore_errors=True)
+
+    def commit(self, session, folder_path):
+        """
+        Verify every part and stream the assembled file to Firebase
+
+        The file is read from disk in resumable-upload chunks, so memory
+        use doesn't depend on the file size. The spool is kept so a failed
+        attempt can be retried; discard the session once the object has
+        been recorded.
+
+        Returns:
+            tuple: (success: bool, result: str|dict) like upload_file_to_firebase
+        """
+        # Only one worker may commit a session at a time
+        lock_fd = os.open(os.path.join(session.directory, 'commit.lock'), os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(lock_fd)
+            raise ChunkedUploadError('Upload is already being committed', 423)
+        try:
+            return self._commit(session, folder_path)
+        finally:
+            os.close(lock_fd)
+
+    def _commit(self, session, folder_path):
+        if not os.path.exists(session.data_path):
+            raise ChunkedUploadError('Upload not found', 404)
+        missing = session.missing_parts()
+        if missing:
+            raise ChunkedUploadError(f"Missing parts: {missing[:20]}", 409)
+
+        # Check every part against its stored checksum (and the whole file
+        # against the optional sha256) in one pass over the spool file
+        expected_hash = session.meta.get('sha256')
+        file_digest = hashlib.sha256()
+        bad_parts = []
+        with open(session.data_path, 'rb') as f:
+            for part_number in range(session.meta['part_count']):
+                part_digest = hashlib.sha256()
+                remaining = session.part_length(part_number)
+                while remaining > 0:
+                    chunk = f.read(min(remaining, 1024 * 1024))
+                    if not chunk:
+                        break
+                    part_digest.update(chunk)
+                    file_digest.update(chunk)
+                    remaining -= len(chunk)
+                if part_digest.hexdigest() != session.part_checksum(part_number):
+                    bad_parts.append(part_number)
+        if bad_parts:
+            # Mark them missing so the client re-sends them
+            for part_number in bad_parts:
+                try:
+                    os.unlink(os.path.join(session.parts_path, str(part_number)))
+                except FileNotFoundError:
+                    pass
+            raise ChunkedUploadError(f"Parts failed verification, re-send them: {bad_parts[:20]}", 409)
+        if expected_hash and file_digest.hexdigest() != expected_hash:
+            raise ChunkedUploadError('Checksum mismatch for the assembled file', 422)
+
+        prefix, file_type = CHUNKED_KINDS[session.meta['kind']]
+        storage_path = firebase_storage.make_storage_path(folder_path, session.meta['filename'], prefix)
+        success, result = firebase_storage.upload_local_file_to_firebase(
+            session.data_path, storage_path, file_type, chunk_size=session.meta['part_size']
+        )
+        if success:
+            result['original_filename'] = session.meta['filename']
+        return success, result
+
+    def expire_stale(self):
+        """Remove sessions past their expiry; returns how many were removed"""
+        removed = 0
+        now = time.time()
+        try:
+            names = os.listdir(self.directory)
+        except OSError:
+            return 0
+        for name in names:
+            if not _UPLOAD_ID_PATTERN.match(name):
+                continue
+            directory = os.path.join(self.directory, name)
+            try:
+                with open(os.path.join(directory, 'session.json')) as f:
+                    expires_at = json.load(f)['expires_at']
+            except (OSError, ValueError, KeyError):
+                # Half-created session - use the directory age instead
+                expires_at = os.path.getmtime(directory) + self.ttl
+            if expires_at < now:
+                shutil.rmtree(directory, ignore_errors=True)
+                removed += 1
+        return removed
+
+    def _register_cli(self, app):
+        @app.cli.command('cleanup-chunked-uploads')
+        def cleanup_chunked_uploads_command():
+            """Delete expired chunked upload sessions from the spool directory"""
+            removed = self.expire_stale()
+            click.echo(f"✅ Removed {removed} expired chunked upload session(s)")
+
+chunked_uploads = ChunkedUploadStore()
+
+def init_chunked_uploads(app):
+    """Initialize the chunked upload spool with the Flask app"""
+    chunked_uploads.init_app(app)
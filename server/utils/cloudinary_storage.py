@@ -3,9 +3,13 @@ import uuid
 import cloudinary
 import cloudinary.uploader
 import cloudinary.api
+import cloudinary.utils
+import time
 from werkzeug.utils import secure_filename
 from flask import current_app
 import logging
+from utils.upload_executor import upload_executor
+from utils.upload_limits import CountingStream, UploadLimitExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -33,12 +37,13 @@ def allowed_file(filename, file_type='image'):
     return extension in ALLOWED_IMAGE_EXTENSIONS
 
 def validate_file_size(file, file_type='image'):
-    """Validate file size (Cloudinary is for images only)"""
-    file.seek(0, 2)  # Move to end of file
-    size = file.tell()
-    file.seek(0)  # Reset file pointer
+    """
+    Check the size the client declared for the image, without reading it
     
-    return size <= MAX_IMAGE_SIZE
+    Files without a declared size pass; the upload itself is read through
+    a CountingStream that stops at the limit.
+    """
+    return not file.content_length or file.content_length <= MAX_IMAGE_SIZE
 
 def get_file_type(filename):
     """Determine if file is an image (Cloudinary only handles images)"""
@@ -52,6 +57,62 @@ def get_file_type(filename):
     else:
         return None
 
+def generate_signed_upload_params(folder_path, public_id):
+    """
+    Signed parameters for uploading an image straight from the browser to Cloudinary
+    
+    The client POSTs the file with these fields to upload_url.
+    
+    Returns:
+        dict: {'upload_url', 'method', 'fields', 'public_id'}
+    """
+    config = cloudinary.config()
+    base_folder = current_app.config.get('CLOUDINARY_FOLDER', 'Innovation-Marketplace')
+    params = {
+        'folder': f"{base_folder}/{folder_path}",
+        'public_id': public_id,
+        'timestamp': int(time.time())
+    }
+    params['signature'] = cloudinary.utils.api_sign_request(params, config.api_secret)
+    params['api_key'] = config.api_key
+    return {
+        'upload_url': f"https://api.cloudinary.com/v1_1/{config.cloud_name}/image/upload",
+        'method': 'POST',
+        'fields': params,
+        'public_id': f"{params['folder']}/{public_id}"
+    }
+
+def finalize_direct_upload(public_id):
+    """
+    Verify an image uploaded directly to Cloudinary
+    
+    Returns:
+        tuple: (success: bool, result: str|dict) like upload_file_to_cloudinary;
+        oversized images are deleted
+    """
+    try:
+        resource = cloudinary.api.resource(public_id, resource_type='image')
+    except cloudinary.exceptions.NotFound:
+        return False, "File was not uploaded"
+    except Exception as e:
+        logger.error(f"Error verifying Cloudinary upload {public_id}: {str(e)}")
+        return False, f"Upload verification failed: {str(e)}"
+    
+    if resource.get('bytes', 0) > MAX_IMAGE_SIZE:
+        delete_file_from_cloudinary(public_id)
+        return False, f"File too large. Maximum size for images: {MAX_IMAGE_SIZE // (1024 * 1024)}MB"
+    
+    return True, {
+        'url': resource['secure_url'],
+        'public_id': resource['public_id'],
+        'resource_type': resource['resource_type'],
+        'filename': public_id.rsplit('/', 1)[-1],
+        'file_type': 'image',
+        'width': resource.get('width'),
+        'height': resource.get('height'),
+        'bytes': resource.get('bytes', 0)
+    }
+
 def upload_file_to_cloudinary(file, folder_path, filename_prefix=''):
     """
     Upload image file to Cloudinary (images only, videos/documents go to Firebase)
@@ -118,8 +179,16 @@ def upload_file_to_cloudinary(file, folder_path, filename_prefix=''):
         # Reset file pointer
         file.seek(0)
         
-        # Upload file
-        result = cloudinary.uploader.upload(file, **upload_options)
+        # The SDK reads the file before sending it, so an oversized image
+        # is stopped at the limit and nothing reaches Cloudinary
+        try:
+            result = cloudinary.uploader.upload(
+                CountingStream(file.stream, MAX_IMAGE_SIZE, name=original_filename),
+                **upload_options
+            )
+        except UploadLimitExceeded:
+            max_size_mb = MAX_IMAGE_SIZE // (1024 * 1024)
+            return False, f"File too large. Maximum size for images: {max_size_mb}MB"
         
         logger.info(f"File uploaded successfully to Cloudinary: {result['public_id']}")
         
@@ -163,47 +232,46 @@ def delete_file_from_cloudinary(public_id, resource_type='image'):
         logger.error(f"Error deleting file from Cloudinary: {str(e)}")
         return False, f"Delete failed: {str(e)}"
 
-def delete_folder_from_cloudinary(folder_path):
+# Resource types a project folder can hold
+FOLDER_RESOURCE_TYPES = ('image', 'video', 'raw')
+
+def delete_folder_from_cloudinary(folder_path, max_rounds=100):
     """
     Delete all files in a folder from Cloudinary
     
+    Uses the bulk delete-by-prefix API, which removes up to 1000 files per
+    call and reports `partial` while more remain, so folders of any size
+    are emptied in a few requests instead of one destroy call per file.
+    
     Args:
         folder_path: Path to folder in Cloudinary (e.g., 'projects/my-project-name')
+        max_rounds: Safety cap on bulk calls per resource type
     
     Returns:
         tuple: (success: bool, message: str, deleted_count: int)
     """
     try:
         base_folder = current_app.config.get('CLOUDINARY_FOLDER', 'Innovation-Marketplace')
-        full_folder = f"{base_folder}/{folder_path}"
-        
-        # Get all resources in the folder
-        resources = cloudinary.api.resources(
-            type='upload',
-            prefix=full_folder,
-            max_results=500
-        )
+        # Trailing slash so 'project-1' doesn't also match 'project-10'
+        prefix = f"{base_folder}/{folder_path}/"
         
         deleted_count = 0
-        failed_deletions = []
-        
-        for resource in resources.get('resources', []):
-            try:
-                result = cloudinary.uploader.destroy(
-                    resource['public_id'],
-                    resource_type=resource['resource_type']
-                )
-                if result.get('result') == 'ok':
-                    deleted_count += 1
-                    logger.info(f"Deleted file: {resource['public_id']}")
-                else:
-                    failed_deletions.append(resource['public_id'])
-            except Exception as e:
-                failed_deletions.append(resource['public_id'])
-                logger.error(f"Failed to delete file {resource['public_id']}: {str(e)}")
+        for resource_type in FOLDER_RESOURCE_TYPES:
+            for _ in range(max_rounds):
+                result = cloudinary.api.delete_resources_by_prefix(prefix, resource_type=resource_type, type='upload')
+                deleted_count += sum(1 for status in result.get('deleted', {}).values() if status == 'deleted')
+                if not result.get('partial'):
+                    break
+            else:
+                return False, f"Stopped after {max_rounds} bulk deletes of {resource_type} files", deleted_count
         
-        if failed_deletions:
-            return False, f"Failed to delete {len(failed_deletions)} files: {', '.join(failed_deletions[:5])}", deleted_count
+        try:
+            cloudinary.api.delete_folder(prefix.rstrip('/'))
+        except cloudinary.exceptions.NotFound:
+            pass
+        except Exception as e:
+            # Empty folders cost nothing; the files are what matter
+            logger.warning(f"Could not remove Cloudinary folder {prefix}: {str(e)}")
         
         if deleted_count > 0:
             logger.info(f"Successfully deleted {deleted_count} files from folder: {folder_path}")
@@ -250,13 +318,16 @@ def upload_multiple_files(files, folder_path, filename_prefix=''):
     
     Returns:
         tuple: (success_count: int, results: list, errors: list)
+    
+    Files are uploaded concurrently through the shared upload executor.
     """
     results = []
     errors = []
     success_count = 0
     
-    for file in files:
-        success, result = upload_file_to_cloudinary(file, folder_path, filename_prefix)
+    outcomes = upload_executor.map(lambda file: upload_file_to_cloudinary(file, folder_path, filename_prefix), files)
+    for file, outcome in zip(files, outcomes):
+        success, result = outcome if isinstance(outcome, tuple) else (False, f"Upload failed: {str(outcome)}")
         
         if success:
             results.append(result)
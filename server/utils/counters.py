@@ -0,0 +1,173 @@
+import atexit
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from sqlalchemy import func, update
+from models import db, Project
+
+logger = logging.getLogger(__name__)
+
+# Project columns that can be incremented through the buffer
+COUNTER_FIELDS = ('views', 'clicks', 'downloads')
+
+class LocalCounterBackend:
+    """In-process accumulator (one per gunicorn worker)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: defaultdict(int))
+
+    def increment(self, project_id, field, amount=1):
+        with self._lock:
+            self._counts[project_id][field] += amount
+
+    def drain(self):
+        """Return and clear all pending counts as {project_id: {field: n}}"""
+        with self._lock:
+            counts, self._counts = self._counts, defaultdict(lambda: defaultdict(int))
+        return {project_id: dict(fields) for project_id, fields in counts.items()}
+
+    def restore(self, counts):
+        """Put counts back after a failed flush"""
+        for project_id, fields in counts.items():
+            for field, amount in fields.items():
+                self.increment(project_id, field, amount)
+
+class RedisCounterBackend:
+    """Accumulator shared by all workers through a Redis hash
+
+    Whichever worker flushes first takes the whole batch by renaming the hash,
+    so every increment is written to the database exactly once.
+    """
+
+    def __init__(self, url, key='counters:projects'):
+        import redis  # Optional dependency, only needed for the shared backend
+        self.client = redis.Redis.from_url(url)
+        self.key = key
+        self._response_error = redis.ResponseError
+
+    def increment(self, project_id, field, amount=1):
+        self.client.hincrby(self.key, f"{project_id}:{field}", amount)
+
+    def drain(self):
+        flushing_key = f"{self.key}:flushing:{uuid.uuid4().hex}"
+        try:
+            self.client.rename(self.key, flushing_key)
+        except self._response_error:
+            # Nothing has been counted since the last flush
+            return {}
+
+        pipeline = self.client.pipeline()
+        pipeline.hgetall(flushing_key)
+        pipeline.delete(flushing_key)
+        raw_counts, _ = pipeline.execute()
+
+        counts = defaultdict(dict)
+        for member, amount in raw_counts.items():
+            project_id, field = member.decode().split(':', 1)
+            counts[int(project_id)][field] = int(amount)
+        return dict(counts)
+
+    def restore(self, counts):
+        pipeline = self.client.pipeline()
+        for project_id, fields in counts.items():
+            for field, amount in fields.items():
+                pipeline.hincrby(self.key, f"{project_id}:{field}", amount)
+        pipeline.execute()
+
+class CounterBuffer:
+    """
+    Buffers project view/click/download increments and writes them in batches
+
+    Every flush issues one atomic UPDATE per project
+    (SET views = views + :n, ...), so concurrent increments are never lost
+    and read endpoints no longer open a write transaction. Counts shown to
+    clients lag by up to COUNTER_FLUSH_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self.backend = LocalCounterBackend()
+        self.flush_interval = 0
+        self._app = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def init_app(self, app):
+        self._app = app
+        self.flush_interval = app.config.get('COUNTER_FLUSH_INTERVAL', 10)
+
+        backend_url = app.config.get('COUNTER_BACKEND_URL')
+        if backend_url:
+            try:
+                self.backend = RedisCounterBackend(backend_url)
+                print("✅ Shared counter backend enabled")
+            except Exception as e:
+                print(f"⚠️ Shared counter backend unavailable, using in-process counters: {e}")
+
+        if self.flush_interval > 0 and self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+            atexit.register(self.shutdown)
+
+    def increment(self, project_id, field, amount=1):
+        """Record a counter increment for a project"""
+        if field not in COUNTER_FIELDS:
+            raise ValueError(f"Unknown counter field: {field}")
+
+        if self.flush_interval > 0:
+            self.backend.increment(project_id, field, amount)
+        else:
+            # Buffering disabled - write through
+            self._apply({project_id: {field: amount}})
+
+    def flush(self):
+        """Write all pending increments to the database (needs an app context)"""
+        counts = self.backend.drain()
+        if not counts:
+            return 0
+
+        try:
+            self._apply(counts)
+        except Exception as e:
+            db.session.rollback()
+            self.backend.restore(counts)
+            logger.error(f"Counter flush failed, will retry: {str(e)}")
+            return 0
+
+        return len(counts)
+
+    def shutdown(self):
+        """Stop the flush thread and write whatever is still pending"""
+        self._stop.set()
+        if self._app is not None:
+            with self._app.app_context():
+                self.flush()
+
+    def _apply(self, counts):
+        for project_id, fields in counts.items():
+            values = {
+                field: func.coalesce(getattr(Project, field), 0) + amount
+                for field, amount in fields.items()
+            }
+            db.session.execute(
+                update(Project).where(Project.id == project_id).values(**values),
+                execution_options={'synchronize_session': False}
+            )
+        db.session.commit()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval):
+            with self._app.app_context():
+                try:
+                    self.flush()
+                except Exception as e:
+                    logger.error(f"Counter flush error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+counter_buffer = CounterBuffer()
+
+def init_counters(app):
+    """Initialize the counter buffer with the Flask app"""
+    counter_buffer.init_app(app)
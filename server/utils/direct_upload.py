@@ -0,0 +1,130 @@
+import uuid
+from flask import current_app
+from itsdangerous import URLSafeTimedSerializer, BadSignature, SignatureExpired
+from werkzeug.utils import secure_filename
+from utils import firebase_storage, cloudinary_storage
+
+# Media kind -> (storage backend, filename prefix, Firebase file type)
+MEDIA_KINDS = {
+    'pdfs': ('firebase', 'document', 'document'),
+    'zip_files': ('firebase', 'document', 'document'),
+    'videos': ('firebase', 'video', 'video'),
+    'thumbnail': ('cloudinary', 'thumbnail', 'image')
+}
+
+class DirectUploadError(Exception):
+    """Raised for an upload intent or completion the server won't accept"""
+    pass
+
+def _serializer():
+    return URLSafeTimedSerializer(current_app.config['SECRET_KEY'], salt='direct-media-upload')
+
+def _expires_in():
+    return current_app.config.get('DIRECT_UPLOAD_EXPIRES', 900)
+
+def _validate_file(kind, filename, size):
+    if kind not in MEDIA_KINDS:
+        raise DirectUploadError(f"Unknown media kind '{kind}'. Use one of: {', '.join(MEDIA_KINDS)}")
+    if not filename or '.' not in filename:
+        raise DirectUploadError('filename with an extension is required')
+
+    backend, _, file_type = MEDIA_KINDS[kind]
+    if backend == 'cloudinary':
+        allowed = cloudinary_storage.allowed_file(filename)
+        max_size = cloudinary_storage.MAX_IMAGE_SIZE
+    else:
+        extension = filename.rsplit('.', 1)[1].lower()
+        allowed = extension == 'pdf' if kind == 'pdfs' else firebase_storage.allowed_file(filename, file_type)
+        max_size = firebase_storage.get_max_size(file_type)
+    if not allowed:
+        raise DirectUploadError(f"File type not allowed for {kind}: {filename}")
+
+    if size is not None:
+        try:
+            size = int(size)
+        except (TypeError, ValueError):
+            raise DirectUploadError('size must be a number of bytes')
+        if size > max_size:
+            raise DirectUploadError(f"File too large. Maximum size for {kind}: {max_size // (1024 * 1024)}MB")
+    return backend, max_size
+
+def create_upload_intent(project_id, folder_path, kind, filename, size=None):
+    """
+    Reserve a storage location and sign a direct upload to it
+
+    Args:
+        project_id: Project the file will be attached to
+        folder_path: Storage folder of the project
+        kind: 'pdfs', 'zip_files', 'videos' or 'thumbnail'
+        filename: Original filename (for the extension)
+        size: Declared size in bytes, checked against the kind's limit
+
+    Returns:
+        dict: Upload instructions for the client plus an upload_token to
+        send to the completion endpoint once the upload has finished
+
+    Raises:
+        DirectUploadError: Unknown kind, disallowed type or oversized file
+    """
+    backend, max_size = _validate_file(kind, filename, size)
+    _, prefix, _ = MEDIA_KINDS[kind]
+    expires_in = _expires_in()
+
+    if backend == 'firebase':
+        storage_path = firebase_storage.make_storage_path(folder_path, filename, prefix)
+        content_type = firebase_storage.get_content_type(storage_path.rsplit('.', 1)[1])
+        upload = firebase_storage.generate_signed_upload_url(storage_path, content_type, max_size, expires_in)
+        target = storage_path
+    else:
+        upload = cloudinary_storage.generate_signed_upload_params(folder_path, f"{prefix}_{uuid.uuid4()}")
+        upload['expires_in'] = expires_in
+        target = upload['public_id']
+
+    token = _serializer().dumps({
+        'project_id': project_id,
+        'kind': kind,
+        'target': target,
+        'filename': secure_filename(filename)
+    })
+    return {
+        'kind': kind,
+        'filename': filename,
+        'upload_token': token,
+        **upload
+    }
+
+def read_upload_token(token, project_id):
+    """
+    Decode an upload token issued for this project
+
+    Tokens stay valid for twice the upload URL lifetime, so an upload that
+    started just before the URL expired can still be completed.
+
+    Raises:
+        DirectUploadError: The token is invalid, expired or for another project
+    """
+    try:
+        claims = _serializer().loads(token, max_age=_expires_in() * 2)
+    except SignatureExpired:
+        raise DirectUploadError('Upload token expired')
+    except BadSignature:
+        raise DirectUploadError('Invalid upload token')
+    if claims.get('project_id') != project_id or claims.get('kind') not in MEDIA_KINDS:
+        raise DirectUploadError('Upload token does not belong to this project')
+    return claims
+
+def complete_upload(claims):
+    """
+    Verify that a directly uploaded object exists and is within limits
+
+    Returns:
+        tuple: (success: bool, result: str|dict) like the upload helpers
+    """
+    backend, _, file_type = MEDIA_KINDS[claims['kind']]
+    if backend == 'firebase':
+        success, result = firebase_storage.finalize_direct_upload(claims['target'], file_type)
+    else:
+        success, result = cloudinary_storage.finalize_direct_upload(claims['target'])
+    if success:
+        result['original_filename'] = claims.get('filename')
+    return success, result
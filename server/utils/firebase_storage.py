@@ -1,9 +1,12 @@
 import os
 import uuid
+from datetime import timedelta
 from firebase_admin import storage
 from werkzeug.utils import secure_filename
 from flask import current_app
 import logging
+from utils.upload_executor import upload_executor
+from utils.upload_limits import CountingStream, UploadLimitExceeded
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,10 @@ ALL_ALLOWED_EXTENSIONS = ALLOWED_VIDEO_EXTENSIONS | ALLOWED_DOCUMENT_EXTENSIONS
 MAX_VIDEO_SIZE = 100 * 1024 * 1024  # 100MB
 MAX_DOCUMENT_SIZE = 50 * 1024 * 1024  # 50MB
 
+# Streamed uploads are sent as resumable uploads in chunks of this size
+# (a multiple of 256 KiB), so only one chunk is held in memory
+STREAM_CHUNK_SIZE = 8 * 1024 * 1024
+
 def allowed_file(filename, file_type='all'):
     """Check if file has allowed extension (Firebase is for videos and documents only)"""
     if not filename or '.' not in filename:
@@ -31,17 +38,13 @@ def allowed_file(filename, file_type='all'):
         return extension in ALL_ALLOWED_EXTENSIONS
 
 def validate_file_size(file, file_type='all'):
-    """Validate file size based on type (Firebase is for videos and documents only)"""
-    file.seek(0, 2)  # Move to end of file
-    size = file.tell()
-    file.seek(0)  # Reset file pointer
+    """
+    Check the size the client declared for the file, without reading it
     
-    if file_type == 'video':
-        return size <= MAX_VIDEO_SIZE
-    elif file_type == 'document':
-        return size <= MAX_DOCUMENT_SIZE
-    else:
-        return size <= MAX_DOCUMENT_SIZE  # Use document limit as default max
+    Files without a declared size pass; the upload itself is read through
+    a CountingStream that stops at the limit.
+    """
+    return not file.content_length or file.content_length <= get_max_size(file_type)
 
 def get_file_type(filename):
     """Determine if file is video or document (Firebase doesn't handle images)"""
@@ -57,6 +60,138 @@ def get_file_type(filename):
     else:
         return None
 
+def get_max_size(file_type):
+    """Size limit in bytes for a Firebase file type"""
+    return MAX_VIDEO_SIZE if file_type == 'video' else MAX_DOCUMENT_SIZE
+
+def make_storage_path(folder_path, filename, filename_prefix=''):
+    """Unique storage path for an upload, keeping the original extension"""
+    file_extension = secure_filename(filename).rsplit('.', 1)[1].lower()
+    unique_id = str(uuid.uuid4())
+    new_filename = f"{filename_prefix}_{unique_id}.{file_extension}" if filename_prefix else f"{unique_id}.{file_extension}"
+    return f"{folder_path}/{new_filename}"
+
+def get_public_download_url(bucket, blob):
+    """Public download URL for a blob in the right format for the bucket's domain"""
+    bucket_name = bucket.name
+    if bucket_name.endswith('.firebasestorage.app'):
+        # Use Firebase Storage REST API URL format for .firebasestorage.app domains
+        from urllib.parse import quote
+        encoded_path = quote(blob.name, safe='')
+        return f"https://firebasestorage.googleapis.com/v0/b/{bucket_name}/o/{encoded_path}?alt=media"
+    # Use regular public URL for .appspot.com domains
+    return blob.public_url
+
+def generate_signed_upload_url(storage_path, content_type, max_size, expires_in=900):
+    """
+    Signed URL the client can PUT a file to directly (bypassing the API server)
+    
+    The client must send the returned headers with the upload; the
+    x-goog-content-length-range header makes Cloud Storage reject bodies
+    larger than max_size. The bucket's CORS config must allow PUT from the
+    frontend origin.
+    
+    Returns:
+        dict: {'upload_url', 'method', 'headers', 'expires_in'}
+    """
+    bucket = storage.bucket()
+    blob = bucket.blob(storage_path)
+    headers = {'x-goog-content-length-range': f"0,{max_size}"}
+    upload_url = blob.generate_signed_url(
+        version='v4',
+        expiration=timedelta(seconds=expires_in),
+        method='PUT',
+        content_type=content_type,
+        headers=headers
+    )
+    return {
+        'upload_url': upload_url,
+        'method': 'PUT',
+        'headers': {'Content-Type': content_type, **headers},
+        'expires_in': expires_in
+    }
+
+def finalize_direct_upload(storage_path, file_type):
+    """
+    Verify a directly uploaded file and make it public
+    
+    Returns:
+        tuple: (success: bool, result: str|dict) like upload_file_to_firebase;
+        oversized objects are deleted
+    """
+    try:
+        bucket = storage.bucket()
+        blob = bucket.get_blob(storage_path)
+        if blob is None:
+            return False, "File was not uploaded"
+        
+        max_size = get_max_size(file_type)
+        if blob.size is None or blob.size > max_size:
+            blob.delete()
+            return False, f"File too large. Maximum size for {file_type}s: {max_size // (1024 * 1024)}MB"
+        
+        blob.make_public()
+        filename = storage_path.rsplit('/', 1)[-1]
+        return True, {
+            'url': get_public_download_url(bucket, blob),
+            'path': storage_path,
+            'filename': filename,
+            'file_type': file_type,
+            'size': blob.size
+        }
+    except Exception as e:
+        logger.error(f"Error finalizing direct upload {storage_path}: {str(e)}")
+        return False, f"Upload verification failed: {str(e)}"
+
+def upload_local_file_to_firebase(local_path, storage_path, file_type, chunk_size=8 * 1024 * 1024):
+    """
+    Upload a file from local disk with a resumable upload
+    
+    The file is sent in chunk_size pieces (a multiple of 256 KiB), each
+    checksummed by the client library, so memory use stays constant and a
+    failed chunk is retried on its own instead of restarting the upload.
+    
+    Returns:
+        tuple: (success: bool, result: str|dict) like upload_file_to_firebase
+    """
+    try:
+        bucket = storage.bucket()
+        blob = bucket.blob(storage_path, chunk_size=chunk_size)
+        size = os.path.getsize(local_path)
+        
+        content_type = get_content_type(storage_path.rsplit('.', 1)[1])
+        with open(local_path, 'rb') as f:
+            blob.upload_from_file(f, size=size, content_type=content_type)
+        
+        blob.make_public()
+        
+        logger.info(f"File uploaded successfully: {storage_path}")
+        
+        return True, {
+            'url': get_public_download_url(bucket, blob),
+            'path': storage_path,
+            'filename': storage_path.rsplit('/', 1)[-1],
+            'file_type': file_type,
+            'size': size
+        }
+        
+    except Exception as e:
+        logger.error(f"Error uploading {local_path} to Firebase: {str(e)}")
+        return False, f"Upload failed: {str(e)}"
+
+def delete_partial_blob(blob):
+    """
+    Clean up after an aborted upload
+    
+    An interrupted resumable upload never creates the object, but delete
+    anything that did get written under the path.
+    """
+    try:
+        if blob.exists():
+            blob.delete()
+    except Exception as e:
+        logger.warning(f"Could not clean up partial upload {blob.name}: {str(e)}")
+
 def upload_file_to_firebase(file, folder_path, filename_prefix=''):
     """
     Upload file to Firebase Storage (videos and documents only, images go to Cloudinary)
@@ -83,16 +218,11 @@ def upload_file_to_firebase(file, folder_path, filename_prefix=''):
         if not allowed_file(file.filename):
             return False, f"File type not allowed. Allowed types: {', '.join(ALL_ALLOWED_EXTENSIONS)}"
         
-        # Determine file type and validate size
+        # Determine file type and check the declared size
         file_type = get_file_type(file.filename)
+        max_size = get_max_size(file_type)
+        max_size_mb = max_size // (1024 * 1024)
         if not validate_file_size(file, file_type):
-            if file_type == 'video':
-                max_size = MAX_VIDEO_SIZE
-            elif file_type == 'document':
-                max_size = MAX_DOCUMENT_SIZE
-            else:
-                max_size = MAX_DOCUMENT_SIZE
-            max_size_mb = max_size // (1024 * 1024)
             return False, f"File too large. Maximum size for {file_type}s: {max_size_mb}MB"
         
         # Create unique filename
@@ -109,31 +239,28 @@ def upload_file_to_firebase(file, folder_path, filename_prefix=''):
         storage_path = f"{folder_path}/{new_filename}"
         
         # Upload file to Firebase Storage
-        blob = bucket.blob(storage_path)
+        blob = bucket.blob(storage_path, chunk_size=STREAM_CHUNK_SIZE)
         
         # Reset file stream position to beginning
         file.stream.seek(0)
         
-        # Set content type based on file extension
+        # Stream in chunks, counting bytes; an oversized file stops the
+        # upload at the limit instead of being measured first
+        counted = CountingStream(file.stream, max_size)
         content_type = get_content_type(file_extension)
-        blob.upload_from_file(
-            file.stream,
-            content_type=content_type
-        )
+        try:
+            blob.upload_from_file(
+                counted,
+                content_type=content_type
+            )
+        except UploadLimitExceeded:
+            delete_partial_blob(blob)
+            return False, f"File too large. Maximum size for {file_type}s: {max_size_mb}MB"
         
         # Make the file publicly accessible
         blob.make_public()
         
-        # Generate the correct Firebase Storage URL for .firebasestorage.app domains
-        bucket_name = bucket.name
-        if bucket_name.endswith('.firebasestorage.app'):
-            # Use Firebase Storage REST API URL format for .firebasestorage.app domains
-            from urllib.parse import quote
-            encoded_path = quote(storage_path, safe='')
-            download_url = f"https://firebasestorage.googleapis.com/v0/b/{bucket_name}/o/{encoded_path}?alt=media"
-        else:
-            # Use regular public URL for .appspot.com domains
-            download_url = blob.public_url
+        download_url = get_public_download_url(bucket, blob)
         
         logger.info(f"File uploaded successfully: {storage_path}")
         
@@ -143,7 +270,7 @@ def upload_file_to_firebase(file, folder_path, filename_prefix=''):
             'filename': new_filename,
             'original_filename': original_filename,
             'file_type': file_type,
-            'size': file.content_length or 0
+            'size': counted.bytes_read
         }
         
     except Exception as e:
@@ -178,10 +305,23 @@ def delete_file_from_firebase(storage_path):
         logger.error(f"Error deleting file from Firebase: {str(e)}")
         return False, f"Delete failed: {str(e)}"
 
+# Deletes sent in one batch request (the JSON API limit is 100)
+DELETE_BATCH_SIZE = 100
+
+def _delete_blob_batch(bucket, names):
+    """Delete blobs in one batch request; missing blobs are ignored"""
+    with bucket.client.batch(raise_exception=False):
+        for name in names:
+            bucket.blob(name).delete()
+
 def delete_folder_from_firebase(folder_path):
     """
     Delete all files in a folder from Firebase Storage
     
+    Blobs are deleted in batch requests of DELETE_BATCH_SIZE, with the
+    batches sent concurrently. The folder is listed again afterwards to
+    find anything that failed.
+    
     Args:
         folder_path: Path to folder in Firebase Storage (e.g., 'projects/my-project-name')
     
@@ -190,31 +330,28 @@ def delete_folder_from_firebase(folder_path):
     """
     try:
         bucket = storage.bucket()
+        prefix = folder_path + '/'
         
         # List all files in the folder
-        blobs = bucket.list_blobs(prefix=folder_path + '/')
-        
-        deleted_count = 0
-        failed_deletions = []
-        
-        for blob in blobs:
-            try:
-                blob.delete()
-                deleted_count += 1
-                logger.info(f"Deleted file: {blob.name}")
-            except Exception as e:
-                failed_deletions.append(blob.name)
-                logger.error(f"Failed to delete file {blob.name}: {str(e)}")
-        
-        if failed_deletions:
-            return False, f"Failed to delete {len(failed_deletions)} files: {', '.join(failed_deletions)}", deleted_count
-        
-        if deleted_count > 0:
-            logger.info(f"Successfully deleted {deleted_count} files from folder: {folder_path}")
-            return True, f"Successfully deleted {deleted_count} files", deleted_count
-        else:
+        names = [blob.name for blob in bucket.list_blobs(prefix=prefix)]
+        if not names:
             return True, "No files found in folder", 0
         
+        batches = [names[i:i + DELETE_BATCH_SIZE] for i in range(0, len(names), DELETE_BATCH_SIZE)]
+        for outcome in upload_executor.map(lambda batch: _delete_blob_batch(bucket, batch), batches):
+            if isinstance(outcome, Exception):
+                logger.error(f"Batch delete failed in {folder_path}: {str(outcome)}")
+        
+        listed = set(names)
+        remaining = [blob.name for blob in bucket.list_blobs(prefix=prefix)]
+        deleted_count = len(names) - len([name for name in remaining if name in listed])
+        
+        if remaining:
+            return False, f"Failed to delete {len(remaining)} files: {', '.join(remaining[:5])}", deleted_count
+        
+        logger.info(f"Successfully deleted {deleted_count} files from folder: {folder_path}")
+        return True, f"Successfully deleted {deleted_count} files", deleted_count
+        
     except Exception as e:
         logger.error(f"Error deleting folder from Firebase: {str(e)}")
         return False, f"Folder delete failed: {str(e)}", 0
@@ -285,16 +422,7 @@ def get_file_download_url(storage_path):
         if not blob.exists():
             return False, "File not found"
         
-        # Generate the correct Firebase Storage URL for .firebasestorage.app domains
-        bucket_name = bucket.name
-        if bucket_name.endswith('.firebasestorage.app'):
-            # Use Firebase Storage REST API URL format for .firebasestorage.app domains
-            from urllib.parse import quote
-            encoded_path = quote(storage_path, safe='')
-            download_url = f"https://firebasestorage.googleapis.com/v0/b/{bucket_name}/o/{encoded_path}?alt=media"
-        else:
-            # Use regular public URL for .appspot.com domains
-            download_url = blob.public_url
+        download_url = get_public_download_url(bucket, blob)
         
         logger.info(f"Generated download URL for: {storage_path}")
         
@@ -318,15 +446,20 @@ def upload_multiple_files(files, folder_path, filename_prefix=''):
     
     Returns:
         tuple: (success_count: int, results: list, errors: list)
+        - Each result carries 'index', the position of its file in `files`
+    
+    Files are uploaded concurrently through the shared upload executor.
     """
     results = []
     errors = []
     success_count = 0
     
-    for file in files:
-        success, result = upload_file_to_firebase(file, folder_path, filename_prefix)
+    outcomes = upload_executor.map(lambda file: upload_file_to_firebase(file, folder_path, filename_prefix), files)
+    for index, (file, outcome) in enumerate(zip(files, outcomes)):
+        success, result = outcome if isinstance(outcome, tuple) else (False, f"Upload failed: {str(outcome)}")
         
         if success:
+            result['index'] = index
             results.append(result)
             success_count += 1
         else:
@@ -0,0 +1,70 @@
+import hashlib
+from functools import wraps
+from flask import request, Response
+
+# Cache-Control for content that is the same for every visitor. Clients and
+# shared caches may store it but must revalidate with If-None-Match.
+PUBLIC_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+# Cache-Control for content only visible to its owner or an admin
+PRIVATE_CACHE_CONTROL = 'private, no-cache'
+
+def make_etag(*parts):
+    """
+    Build a strong ETag from the values that determine a response
+
+    Args:
+        *parts: Values such as ids, updated_at timestamps, counts and the
+                request's query string
+
+    Returns:
+        str: Quoted ETag value
+    """
+    digest = hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+    return f'"{digest}"'
+
+def etag_headers(etag, public=True):
+    """Response headers carrying an ETag and the matching Cache-Control"""
+    return {
+        'ETag': etag,
+        'Cache-Control': PUBLIC_CACHE_CONTROL if public else PRIVATE_CACHE_CONTROL
+    }
+
+def not_modified_response(etag, public=True):
+    """
+    Return a 304 response if the request's If-None-Match matches the ETag
+
+    Returns:
+        Response or None: 304 response to return as-is, or None when the
+        client's copy is stale and the full body must be built
+    """
+    if request.if_none_match.contains(etag.strip('"')):
+        return Response(status=304, headers=etag_headers(etag, public))
+    return None
+
+def conditional_response(etag_for, public=True):
+    """
+    Answer GETs with 304 when the client's ETag is current
+
+    The ETag is computed before the wrapped method runs, so a matching
+    If-None-Match never queries or serializes the full response.
+
+    Args:
+        etag_for: Callable (**view_args) -> ETag for the current request
+        public: Whether the response is the same for every visitor
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            etag = etag_for(**kwargs)
+            not_modified = not_modified_response(etag, public)
+            if not_modified is not None:
+                return not_modified
+
+            result = fn(*args, **kwargs)
+            body, status = result if isinstance(result, tuple) else (result, 200)
+            if status == 200:
+                return body, status, etag_headers(etag, public)
+            return result
+        return decorator
+    return wrapper
@@ -0,0 +1,310 @@
+import atexit
+import json
+import logging
+import os
+import random
+import socket
+import threading
+import uuid
+from datetime import datetime, timedelta
+import click
+from flask import current_app
+from sqlalchemy import and_, or_, update
+from models import db, Job
+
+logger = logging.getLogger(__name__)
+
+# job type -> handler(payload) returning a JSON-serializable result
+JOB_HANDLERS = {}
+
+# The job the current thread is running, for is_final_attempt()
+_running = threading.local()
+
+class PermanentJobError(Exception):
+    """Raised by a handler when retrying the job cannot succeed"""
+    pass
+
+def job_handler(job_type):
+    """Register a function as the handler for a job type"""
+    def wrapper(fn):
+        JOB_HANDLERS[job_type] = fn
+        return fn
+    return wrapper
+
+def is_final_attempt():
+    """Whether the job being run by this thread won't be retried if it fails"""
+    job = getattr(_running, 'job', None)
+    return job is None or job.attempts >= job.max_attempts
+
+def find_active_job(dedupe_key):
+    """The queued or running job with this dedupe key, if any"""
+    return Job.query.filter(
+        Job.dedupe_key == dedupe_key,
+        Job.status.in_(Job.ACTIVE_STATUSES)
+    ).first()
+
+def find_recent_job(dedupe_key, within):
+    """
+    The newest job with this dedupe key that is still active or finished
+    less than `within` seconds ago, if any
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=within)
+    return Job.query.filter(
+        Job.dedupe_key == dedupe_key,
+        or_(Job.status.in_(Job.ACTIVE_STATUSES), Job.finished_at >= cutoff)
+    ).order_by(Job.created_at.desc()).first()
+
+def enqueue_job(job_type, payload=None, user_id=None, dedupe_key=None, max_attempts=None):
+    """
+    Queue a background job (commits the session)
+
+    Args:
+        job_type: Name registered with @job_handler
+        payload: JSON-serializable dict passed to the handler
+        user_id: User allowed to read the job status (None = anyone with the id)
+        dedupe_key: If a queued or running job has the same key, it is
+                    returned instead of creating a new one
+        max_attempts: Overrides JOB_MAX_ATTEMPTS
+
+    Returns:
+        Job: The queued (or already active) job
+    """
+    if dedupe_key:
+        existing = find_active_job(dedupe_key)
+        if existing:
+            db.session.commit()
+            return existing
+
+    job = Job(
+        type=job_type,
+        payload=json.dumps(payload or {}),
+        user_id=user_id,
+        dedupe_key=dedupe_key,
+        max_attempts=max_attempts or current_app.config.get('JOB_MAX_ATTEMPTS', 3),
+        run_at=datetime.utcnow()
+    )
+    db.session.add(job)
+    db.session.commit()
+    job_queue.notify()
+    return job
+
+class JobWorker:
+    """
+    Claims jobs from the jobs table and runs their handlers
+
+    On PostgreSQL a job is claimed with SELECT ... FOR UPDATE SKIP LOCKED;
+    elsewhere with a conditional UPDATE, so any number of workers (threads
+    or processes) can share the table. A running job whose lock is older
+    than JOB_LOCK_TIMEOUT is assumed lost and claimed again.
+    """
+
+    def __init__(self, app, name=None):
+        self.app = app
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.poll_interval = app.config.get('JOB_POLL_INTERVAL', 2)
+        self.lock_timeout = app.config.get('JOB_LOCK_TIMEOUT', 600)
+        self.retry_base_delay = app.config.get('JOB_RETRY_BASE_DELAY', 10)
+        self.retry_max_delay = app.config.get('JOB_RETRY_MAX_DELAY', 600)
+
+    def _claimable(self, now):
+        return or_(
+            and_(Job.status == Job.STATUS_QUEUED, Job.run_at <= now),
+            and_(Job.status == Job.STATUS_RUNNING, Job.locked_at < now - timedelta(seconds=self.lock_timeout))
+        )
+
+    def claim(self):
+        """Claim the next due job, or return None"""
+        now = datetime.utcnow()
+
+        if db.engine.dialect.name == 'postgresql':
+            job = Job.query.filter(self._claimable(now)).order_by(Job.run_at).with_for_update(skip_locked=True).first()
+            if job is None:
+                db.session.rollback()
+                return None
+            job.status = Job.STATUS_RUNNING
+            job.locked_by = self.name
+            job.locked_at = now
+            job.attempts += 1
+            db.session.commit()
+            return job
+
+        candidate_ids = [
+            job_id for (job_id,) in db.session.query(Job.id).filter(self._claimable(now)).order_by(Job.run_at).limit(5)
+        ]
+        for job_id in candidate_ids:
+            result = db.session.execute(
+                update(Job).where(Job.id == job_id, self._claimable(now)).values(
+                    status=Job.STATUS_RUNNING,
+                    locked_by=self.name,
+                    locked_at=now,
+                    attempts=Job.attempts + 1
+                ),
+                execution_options={'synchronize_session': False}
+            )
+            db.session.commit()
+            if result.rowcount == 1:
+                return db.session.get(Job, job_id)
+        return None
+
+    def run_job(self, job):
+        """Run a claimed job and record its outcome"""
+        job_id = job.id
+        handler = JOB_HANDLERS.get(job.type)
+
+        try:
+            if handler is None:
+                raise PermanentJobError(f"No handler registered for job type '{job.type}'")
+            if job.attempts > job.max_attempts:
+                raise PermanentJobError("Worker was lost while running the job")
+            _running.job = job
+            try:
+                result = handler(job.get_payload())
+            finally:
+                _running.job = None
+        except Exception as e:
+            db.session.rollback()
+            self._record_failure(db.session.get(Job, job_id), e)
+            return False
+
+        job = db.session.get(Job, job_id)
+        job.status = Job.STATUS_SUCCEEDED
+        job.result = json.dumps(result) if result is not None else None
+        job.error = None
+        job.finished_at = datetime.utcnow()
+        job.locked_by = None
+        job.locked_at = None
+        db.session.commit()
+        logger.info(f"Job {job_id} ({job.type}) succeeded on attempt {job.attempts}")
+        return True
+
+    def retry_delay(self, attempts):
+        """Exponential backoff with jitter for the given attempt number"""
+        delay = min(self.retry_max_delay, self.retry_base_delay * 2 ** (attempts - 1))
+        return delay * random.uniform(0.75, 1.25)
+
+    def _record_failure(self, job, error):
+        job.error = str(error)
+        job.locked_by = None
+        job.locked_at = None
+
+        if isinstance(error, PermanentJobError) or job.attempts >= job.max_attempts:
+            job.status = Job.STATUS_FAILED
+            job.finished_at = datetime.utcnow()
+            logger.error(f"Job {job.id} ({job.type}) failed after {job.attempts} attempts: {error}")
+        else:
+            delay = self.retry_delay(job.attempts)
+            job.status = Job.STATUS_QUEUED
+            job.run_at = datetime.utcnow() + timedelta(seconds=delay)
+            logger.warning(f"Job {job.id} ({job.type}) attempt {job.attempts} failed, retrying in {delay:.0f}s: {error}")
+
+        db.session.commit()
+
+    def run(self, stop_event, wakeup=None, once=False):
+        """
+        Process jobs until stop_event is set
+
+        Args:
+            stop_event: threading.Event that ends the loop
+            wakeup: Optional threading.Event set when a job is enqueued in this process
+            once: Return as soon as no job is due
+        """
+        while not stop_event.is_set():
+            ran_job = False
+            with self.app.app_context():
+                try:
+                    job = self.claim()
+                    if job is not None:
+                        self.run_job(job)
+                        ran_job = True
+                except Exception as e:
+                    db.session.rollback()
+                    logger.error(f"Job worker {self.name} error: {str(e)}")
+                finally:
+                    db.session.remove()
+
+            if ran_job:
+                continue
+            if once:
+                return
+
+            if wakeup is not None:
+                wakeup.wait(self.poll_interval)
+                wakeup.clear()
+            else:
+                stop_event.wait(self.poll_interval)
+
+class JobQueue:
+    """
+    Starts in-process worker threads and registers the `flask jobs-worker` command
+
+    With JOB_EMBEDDED_WORKERS > 0 every web process runs that many worker
+    threads, which is enough for development. With 0 (the production
+    default) `flask jobs-worker` runs as separate processes - the Procfile's
+    `worker` - so job work stays off the web workers entirely. Embedded threads start with the first request, so CLI
+    commands such as `flask db upgrade` never run jobs.
+    """
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._wakeup = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def init_app(self, app):
+        self._register_cli(app)
+
+        embedded_workers = app.config.get('JOB_EMBEDDED_WORKERS', 1)
+        if embedded_workers > 0:
+            @app.before_request
+            def start_embedded_job_workers():
+                if not self._threads:
+                    self._start_embedded(app, embedded_workers)
+
+    def _start_embedded(self, app, count):
+        with self._lock:
+            if self._threads:
+                return
+            for _ in range(count):
+                worker = JobWorker(app)
+                thread = threading.Thread(target=worker.run, args=(self._stop, self._wakeup), daemon=True)
+                thread.start()
+                self._threads.append(thread)
+            atexit.register(self.shutdown)
+
+    def notify(self):
+        """Wake embedded workers in this process after a job is enqueued"""
+        self._wakeup.set()
+
+    def shutdown(self):
+        self._stop.set()
+        self._wakeup.set()
+
+    def _register_cli(self, app):
+        @app.cli.command('jobs-worker')
+        @click.option('--threads', default=1, show_default=True, help='Worker threads in this process')
+        @click.option('--once', is_flag=True, help='Exit when no job is due')
+        def jobs_worker_command(threads, once):
+            """Run background jobs from the jobs table"""
+            stop_event = threading.Event()
+            workers = [JobWorker(app) for _ in range(threads)]
+            click.echo(f"✅ Job worker started with {threads} thread(s)")
+
+            worker_threads = [
+                threading.Thread(target=worker.run, args=(stop_event, None, once), daemon=True)
+                for worker in workers
+            ]
+            for thread in worker_threads:
+                thread.start()
+            try:
+                for thread in worker_threads:
+                    while thread.is_alive():
+                        thread.join(1)
+            except KeyboardInterrupt:
+                stop_event.set()
+                click.echo("ℹ️ Job worker stopping")
+
+job_queue = JobQueue()
+
+def init_jobs(app):
+    """Initialize the background job queue with the Flask app"""
+    job_queue.init_app(app)
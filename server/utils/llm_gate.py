@@ -0,0 +1,314 @@
+import fcntl
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+class LLMUnavailable(Exception):
+    """Raised instead of calling the model when the gate rejects a call"""
+    pass
+
+class FileSlotLimiter:
+    """
+    Host-wide concurrency limit shared by every gunicorn worker
+
+    Each slot is a file in `directory` held with an exclusive flock for the
+    duration of a call. The kernel releases the lock if the worker dies, so
+    slots can't leak.
+    """
+
+    def __init__(self, directory, limit):
+        self.directory = directory
+        self.limit = limit
+        os.makedirs(directory, exist_ok=True)
+
+    def try_acquire(self):
+        for slot in range(self.limit):
+            fd = os.open(os.path.join(self.directory, f"slot_{slot}.lock"), os.O_RDWR | os.O_CREAT, 0o644)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return fd
+            except BlockingIOError:
+                os.close(fd)
+        return None
+
+    def release(self, token):
+        fcntl.flock(token, fcntl.LOCK_UN)
+        os.close(token)
+
+    def in_flight(self):
+        held = 0
+        for slot in range(self.limit):
+            path = os.path.join(self.directory, f"slot_{slot}.lock")
+            if not os.path.exists(path):
+                continue
+            fd = os.open(path, os.O_RDWR)
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                fcntl.flock(fd, fcntl.LOCK_UN)
+            except BlockingIOError:
+                held += 1
+            finally:
+                os.close(fd)
+        return held
+
+class RedisSlotLimiter:
+    """
+    Concurrency limit shared across hosts through a Redis sorted set
+
+    Members are call tokens scored by acquisition time. Tokens older than
+    lease seconds are treated as abandoned and dropped.
+    """
+
+    def __init__(self, url, limit, lease, key='llm_gate:slots'):
+        import redis  # Optional dependency, only needed for the shared limit
+        self.client = redis.Redis.from_url(url)
+        self.limit = limit
+        self.lease = lease
+        self.key = key
+
+    def try_acquire(self):
+        token = uuid.uuid4().hex
+        now = time.time()
+        pipeline = self.client.pipeline()
+        pipeline.zremrangebyscore(self.key, 0, now - self.lease)
+        pipeline.zadd(self.key, {token: now})
+        pipeline.zrank(self.key, token)
+        _, _, rank = pipeline.execute()
+        if rank is not None and rank < self.limit:
+            return token
+        self.client.zrem(self.key, token)
+        return None
+
+    def release(self, token):
+        self.client.zrem(self.key, token)
+
+    def in_flight(self):
+        return self.client.zcount(self.key, time.time() - self.lease, '+inf')
+
+class CircuitBreaker:
+    """
+    Stops calling the model after repeated failures
+
+    closed: calls pass through. After failure_threshold consecutive errors
+    or timeouts the breaker opens and calls are rejected immediately for
+    reset_timeout seconds. Then it is half-open: one trial call is let
+    through, and its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_running = False
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return self.HALF_OPEN
+            return self._state
+
+    def allow(self):
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    return False
+                self._state = self.HALF_OPEN
+            if self._trial_running:
+                return False
+            self._trial_running = True
+            return True
+
+    def cancel(self):
+        """The allowed call never reached the model (e.g. no free slot)"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_success(self):
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._trial_running = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self._trial_running = False
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning(f"LLM circuit breaker opened after {self._failures} consecutive failures")
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+class LLMGate:
+    """
+    Bounded concurrency and fail-fast around model calls
+
+    A call needs a slot in this worker (max_concurrency) and, if configured,
+    in the shared limiter, waiting at most queue_timeout seconds for both.
+    Calls are also rejected while the circuit breaker is open. Rejections
+    raise LLMUnavailable, which AIAgent turns into its usual fallback text,
+    so a slow or failing backend can't tie up every web worker.
+    """
+
+    def __init__(self, max_concurrency=4, queue_timeout=5, call_timeout=30, breaker=None, shared_limiter=None):
+        self.max_concurrency = max_concurrency
+        self.queue_timeout = queue_timeout
+        self.call_timeout = call_timeout
+        self.breaker = breaker or CircuitBreaker()
+        self.shared_limiter = shared_limiter
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._metrics = {
+            'calls': 0,
+            'successes': 0,
+            'failures': 0,
+            'rejected_circuit_open': 0,
+            'rejected_queue_timeout': 0,
+            'shared_errors': 0
+        }
+
+    def _count(self, metric, delta=1):
+        with self._lock:
+            self._metrics[metric] += delta
+
+    def _acquire_shared(self, deadline):
+        if self.shared_limiter is None:
+            return None, True
+        while True:
+            try:
+                token = self.shared_limiter.try_acquire()
+            except Exception as e:
+                # Fall back to the per-worker limit rather than failing the call
+                self._count('shared_errors')
+                logger.warning(f"Shared LLM limiter unavailable: {str(e)}")
+                return None, True
+            if token is not None:
+                return token, True
+            if time.monotonic() >= deadline:
+                return None, False
+            time.sleep(0.05)
+
+    @contextmanager
+    def slot(self):
+        """
+        Hold a model-call slot for the duration of the block
+
+        Exceptions leaving the block count as failures for the breaker.
+
+        Raises:
+            LLMUnavailable: The breaker is open or no slot freed up in time
+        """
+        if not self.breaker.allow():
+            self._count('rejected_circuit_open')
+            raise LLMUnavailable('AI service temporarily unavailable (circuit open)')
+
+        deadline = time.monotonic() + self.queue_timeout
+        if not self._semaphore.acquire(timeout=self.queue_timeout):
+            self._count('rejected_queue_timeout')
+            self.breaker.cancel()
+            raise LLMUnavailable('AI service busy (queue timeout)')
+
+        token, acquired = self._acquire_shared(deadline)
+        if not acquired:
+            self._semaphore.release()
+            self._count('rejected_queue_timeout')
+            self.breaker.cancel()
+            raise LLMUnavailable('AI service busy (queue timeout)')
+
+        with self._lock:
+            self._in_flight += 1
+            self._metrics['calls'] += 1
+        try:
+            yield
+        except Exception:
+            self._count('failures')
+            self.breaker.record_failure()
+            raise
+        except BaseException:
+            # e.g. GeneratorExit when a streaming client disconnects
+            self.breaker.cancel()
+            raise
+        else:
+            self._count('successes')
+            self.breaker.record_success()
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+            if token is not None:
+                try:
+                    self.shared_limiter.release(token)
+                except Exception as e:
+                    logger.warning(f"Could not release shared LLM slot: {str(e)}")
+            self._semaphore.release()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._metrics)
+            stats['in_flight'] = self._in_flight
+        stats['max_concurrency'] = self.max_concurrency
+        stats['breaker_state'] = self.breaker.state
+        if self.shared_limiter is not None:
+            stats['shared_limit'] = self.shared_limiter.limit
+            try:
+                stats['shared_in_flight'] = self.shared_limiter.in_flight()
+            except Exception:
+                stats['shared_in_flight'] = None
+        return stats
+
+def create_llm_gate():
+    """
+    Build the LLM gate from environment variables
+
+    AI_MAX_CONCURRENCY: model calls in flight per worker (default 4)
+    AI_GLOBAL_CONCURRENCY: limit across workers, 0 = per-worker only (default 8)
+    AI_CONCURRENCY_URL: redis:// URL to share the global limit across hosts
+    AI_CONCURRENCY_DIR: directory of slot lock files for a host-wide limit
+                        (used when no URL is set, default <tmp>/ai_llm_slots)
+    AI_QUEUE_TIMEOUT: seconds a call may wait for a slot (default 5)
+    AI_CALL_TIMEOUT: seconds before a model request times out (default 30)
+    AI_BREAKER_FAILURES: consecutive failures that open the breaker (default 5)
+    AI_BREAKER_RESET: seconds the breaker stays open (default 30)
+    """
+    call_timeout = float(os.getenv('AI_CALL_TIMEOUT', 30))
+    global_limit = int(os.getenv('AI_GLOBAL_CONCURRENCY', 8))
+
+    shared_limiter = None
+    if global_limit > 0:
+        limiter_url = os.getenv('AI_CONCURRENCY_URL')
+        try:
+            if limiter_url:
+                # A lease longer than any call, so crashed holders free their slot
+                shared_limiter = RedisSlotLimiter(limiter_url, global_limit, lease=call_timeout * 4)
+            else:
+                directory = os.getenv('AI_CONCURRENCY_DIR') or os.path.join(tempfile.gettempdir(), 'ai_llm_slots')
+                shared_limiter = FileSlotLimiter(directory, global_limit)
+        except Exception as e:
+            print(f"⚠️ Global AI concurrency limit unavailable, using per-worker limit only: {e}")
+
+    return LLMGate(
+        max_concurrency=int(os.getenv('AI_MAX_CONCURRENCY', 4)),
+        queue_timeout=float(os.getenv('AI_QUEUE_TIMEOUT', 5)),
+        call_timeout=call_timeout,
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv('AI_BREAKER_FAILURES', 5)),
+            reset_timeout=float(os.getenv('AI_BREAKER_RESET', 30))
+        ),
+        shared_limiter=shared_limiter
+    )
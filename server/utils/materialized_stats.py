@@ -0,0 +1,301 @@
+import logging
+from collections import defaultdict
+from datetime import datetime, timedelta
+import click
+from sqlalchemy import event, func, inspect, literal, select, update, delete
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from models import (
+    db, Project, User, Role, Sales, Contribution,
+    ProjectStatsDaily, SalesStatsDaily, UserCount
+)
+from utils.stats import aggregate_stats, contribution_totals
+
+logger = logging.getLogger(__name__)
+
+# Statuses with their own column in project_stats_daily / sales_stats_daily.
+# Other values are only reflected in `total`.
+PROJECT_STATUSES = ('pending', 'approved', 'rejected')
+SALES_STATUSES = ('pending', 'paid', 'completed', 'cancelled', 'refunded')
+
+def _today():
+    return datetime.utcnow().date()
+
+def _old_and_new(obj, attr):
+    """(value before, value after) this flush for one attribute"""
+    history = inspect(obj).attrs[attr].history
+    if not history.has_changes():
+        value = getattr(obj, attr)
+        return value, value
+    old = history.deleted[0] if history.deleted else None
+    new = history.added[0] if history.added else None
+    return old, new
+
+def _project_delta(delta, status, featured, sign):
+    delta['total'] += sign
+    if status in PROJECT_STATUSES:
+        delta[status] += sign
+    if featured:
+        delta['featured'] += sign
+
+def _sales_delta(delta, status, amount, sign):
+    delta['total'] += sign
+    if status in SALES_STATUSES:
+        delta[status] += sign
+    if status == 'completed' and amount:
+        delta['revenue'] += sign * amount
+
+def collect_stats_delta(session):
+    """
+    Work out how pending ORM changes move the dashboard counters
+
+    Returns:
+        tuple: (project_delta, sales_delta, user_delta) - the first two map
+        column name -> change, the last maps role_id -> change
+    """
+    project_delta = defaultdict(int)
+    sales_delta = defaultdict(int)
+    user_delta = defaultdict(int)
+
+    for obj in session.new:
+        if isinstance(obj, Project):
+            _project_delta(project_delta, obj.status, obj.featured, 1)
+        elif isinstance(obj, Contribution):
+            project_delta['contributions'] += 1
+            project_delta['contribution_amount'] += obj.amount or 0
+        elif isinstance(obj, Sales):
+            _sales_delta(sales_delta, obj.status, obj.amount, 1)
+        elif isinstance(obj, User) and obj.role_id is not None:
+            user_delta[obj.role_id] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Project):
+            _project_delta(project_delta, obj.status, obj.featured, -1)
+        elif isinstance(obj, Contribution):
+            project_delta['contributions'] -= 1
+            project_delta['contribution_amount'] -= obj.amount or 0
+        elif isinstance(obj, Sales):
+            _sales_delta(sales_delta, obj.status, obj.amount, -1)
+        elif isinstance(obj, User) and obj.role_id is not None:
+            user_delta[obj.role_id] -= 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Project):
+            old_status, new_status = _old_and_new(obj, 'status')
+            old_featured, new_featured = _old_and_new(obj, 'featured')
+            if old_status != new_status or bool(old_featured) != bool(new_featured):
+                _project_delta(project_delta, old_status, old_featured, -1)
+                _project_delta(project_delta, new_status, new_featured, 1)
+        elif isinstance(obj, Contribution):
+            old_amount, new_amount = _old_and_new(obj, 'amount')
+            project_delta['contribution_amount'] += (new_amount or 0) - (old_amount or 0)
+        elif isinstance(obj, Sales):
+            old_status, new_status = _old_and_new(obj, 'status')
+            old_amount, new_amount = _old_and_new(obj, 'amount')
+            if old_status != new_status or old_amount != new_amount:
+                _sales_delta(sales_delta, old_status, old_amount, -1)
+                _sales_delta(sales_delta, new_status, new_amount, 1)
+        elif isinstance(obj, User):
+            old_role_id, new_role_id = _old_and_new(obj, 'role_id')
+            if old_role_id != new_role_id:
+                if old_role_id is not None:
+                    user_delta[old_role_id] -= 1
+                if new_role_id is not None:
+                    user_delta[new_role_id] += 1
+
+    return project_delta, sales_delta, user_delta
+
+def _insert_ignoring_conflicts(connection, table):
+    if connection.dialect.name == 'postgresql':
+        return postgresql.insert(table), True
+    if connection.dialect.name == 'sqlite':
+        return sqlite.insert(table), True
+    return table.insert(), False
+
+def _apply_daily(connection, model, delta):
+    """Add a delta to today's row, carrying yesterday's totals forward first"""
+    delta = {column: amount for column, amount in delta.items() if amount}
+    if not delta:
+        return
+
+    table = model.__table__
+    today = _today()
+    columns = [column.name for column in table.columns if column.name != 'day']
+
+    # Start today's row from the latest earlier one. Nothing is inserted
+    # before the first rebuild (empty table) or when today's row exists.
+    latest = select(
+        literal(today, type_=table.c.day.type),
+        *[table.c[column] for column in columns]
+    ).where(table.c.day < today).order_by(table.c.day.desc()).limit(1)
+
+    statement, ignores_conflicts = _insert_ignoring_conflicts(connection, table)
+    statement = statement.from_select(['day', *columns], latest)
+    if ignores_conflicts:
+        connection.execute(statement.on_conflict_do_nothing())
+    elif connection.execute(select(table.c.day).where(table.c.day == today)).first() is None:
+        connection.execute(statement)
+
+    connection.execute(
+        update(table).where(table.c.day == today).values({
+            table.c[column]: table.c[column] + amount
+            for column, amount in delta.items()
+        })
+    )
+
+def _apply_user_counts(connection, delta):
+    table = UserCount.__table__
+    for role_id, amount in delta.items():
+        if not amount:
+            continue
+        statement, handles_conflicts = _insert_ignoring_conflicts(connection, table)
+        if handles_conflicts:
+            # One upsert, so two first users of a role can't both insert
+            connection.execute(
+                statement.values(role_id=role_id, count=max(amount, 0)).on_conflict_do_update(
+                    index_elements=[table.c.role_id],
+                    set_={'count': table.c.count + amount}
+                )
+            )
+            continue
+        result = connection.execute(
+            update(table).where(table.c.role_id == role_id).values(count=table.c.count + amount)
+        )
+        if result.rowcount == 0:
+            connection.execute(statement.values(role_id=role_id, count=max(amount, 0)))
+
+@event.listens_for(Session, 'before_flush')
+def update_materialized_stats(session, flush_context, instances):
+    """Apply dashboard counter changes in the same transaction as the writes"""
+    project_delta, sales_delta, user_delta = collect_stats_delta(session)
+    if not (project_delta or sales_delta or user_delta):
+        return
+
+    connection = session.connection()
+    _apply_daily(connection, ProjectStatsDaily, project_delta)
+    _apply_daily(connection, SalesStatsDaily, sales_delta)
+    _apply_user_counts(connection, user_delta)
+
+def rebuild_stats(reset_history=False):
+    """
+    Recompute today's dashboard counters from the raw tables
+
+    Args:
+        reset_history: Also drop the rows for earlier days
+    """
+    today = _today()
+    aggregate_stats.invalidate()
+
+    if reset_history:
+        db.session.execute(delete(ProjectStatsDaily))
+        db.session.execute(delete(SalesStatsDaily))
+
+    projects = aggregate_stats.project_counts()
+    contributed = contribution_totals()
+    db.session.merge(ProjectStatsDaily(
+        day=today,
+        total=projects['total'],
+        featured=projects['featured'],
+        contributions=contributed['count'],
+        contribution_amount=contributed['total_amount'],
+        **{status: projects['by_status'].get(status, 0) for status in PROJECT_STATUSES}
+    ))
+
+    sales = aggregate_stats.sales_counts()
+    revenue = db.session.query(
+        func.coalesce(func.sum(Sales.amount), 0)
+    ).filter(Sales.status == 'completed').scalar()
+    db.session.merge(SalesStatsDaily(
+        day=today,
+        total=sales['total'],
+        revenue=revenue,
+        **{status: sales['by_status'].get(status, 0) for status in SALES_STATUSES}
+    ))
+
+    db.session.execute(delete(UserCount))
+    for role_id, count in db.session.query(User.role_id, func.count(User.id)).group_by(User.role_id).all():
+        db.session.add(UserCount(role_id=role_id, count=count))
+
+    db.session.commit()
+
+def project_counts():
+    """
+    Project and contribution totals from the latest project_stats_daily row
+
+    Falls back to live GROUP BY queries until the table has been built.
+    """
+    row = ProjectStatsDaily.query.order_by(ProjectStatsDaily.day.desc()).first()
+    if row is not None:
+        return row.to_dict()
+
+    counts = aggregate_stats.project_counts()
+    contributed = contribution_totals()
+    result = {
+        'day': _today().isoformat(),
+        'total': counts['total'],
+        'featured': counts['featured'],
+        'contributions': contributed['count'],
+        'contribution_amount': contributed['total_amount']
+    }
+    result.update({status: counts['by_status'].get(status, 0) for status in PROJECT_STATUSES})
+    return result
+
+def sales_counts():
+    """Sales totals from the latest sales_stats_daily row (live queries until built)"""
+    row = SalesStatsDaily.query.order_by(SalesStatsDaily.day.desc()).first()
+    if row is not None:
+        return row.to_dict()
+
+    counts = aggregate_stats.sales_counts()
+    result = {
+        'day': _today().isoformat(),
+        'total': counts['total'],
+        'revenue': db.session.query(
+            func.coalesce(func.sum(Sales.amount), 0)
+        ).filter(Sales.status == 'completed').scalar()
+    }
+    result.update({status: counts['by_status'].get(status, 0) for status in SALES_STATUSES})
+    return result
+
+def user_counts():
+    """
+    User totals by role from user_counts (live query until built)
+
+    Returns:
+        dict: {'total', 'by_role': {role_name: count}}
+    """
+    rows = db.session.query(Role.name, UserCount.count).join(UserCount, UserCount.role_id == Role.id).all()
+    if not rows:
+        return aggregate_stats.user_counts()
+
+    by_role = {role_name: count for role_name, count in rows}
+    return {
+        'total': sum(by_role.values()),
+        'by_role': by_role
+    }
+
+def project_stats_history(days=30):
+    """Daily project/contribution totals for the last N days, oldest first"""
+    since = _today() - timedelta(days=days)
+    rows = ProjectStatsDaily.query.filter(
+        ProjectStatsDaily.day > since
+    ).order_by(ProjectStatsDaily.day).all()
+    return [row.to_dict() for row in rows]
+
+def sales_stats_history(days=30):
+    """Daily sales totals for the last N days, oldest first"""
+    since = _today() - timedelta(days=days)
+    rows = SalesStatsDaily.query.filter(
+        SalesStatsDaily.day > since
+    ).order_by(SalesStatsDaily.day).all()
+    return [row.to_dict() for row in rows]
+
+def init_materialized_stats(app):
+    """Register the `flask rebuild-stats` command"""
+
+    @app.cli.command('rebuild-stats')
+    @click.option('--reset-history', is_flag=True, help='Also delete the rows for earlier days')
+    def rebuild_stats_command(reset_history):
+        """Recompute dashboard counters from the raw tables"""
+        rebuild_stats(reset_history)
+        click.echo("✅ Dashboard stats rebuilt")
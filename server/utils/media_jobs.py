@@ -0,0 +1,83 @@
+import json
+from models import db, Project
+from utils.cache import invalidate_project
+from utils.chunked_upload import chunked_uploads, ChunkedUploadError
+from utils.cloudinary_storage import delete_folder_from_cloudinary
+from utils.firebase_storage import delete_folder_from_firebase, delete_file_from_firebase
+from utils.jobs import job_handler, PermanentJobError
+
+# Job types
+PROJECT_MEDIA_CLEANUP_JOB = 'project_media_cleanup'
+CHUNKED_UPLOAD_COMMIT_JOB = 'chunked_upload_commit'
+
+@job_handler(PROJECT_MEDIA_CLEANUP_JOB)
+def cleanup_project_media(payload):
+    """
+    Delete a deleted project's media folder from Cloudinary and Firebase
+
+    Each run deletes whatever is still there, so a retry after a partial
+    failure only redoes the remainder.
+    """
+    folder_path = payload['folder_path']
+
+    cloudinary_ok, cloudinary_message, cloudinary_deleted = delete_folder_from_cloudinary(folder_path)
+    firebase_ok, firebase_message, firebase_deleted = delete_folder_from_firebase(folder_path)
+
+    if not (cloudinary_ok and firebase_ok):
+        # Leave the job to be retried with backoff
+        raise Exception(f"Media cleanup incomplete for {folder_path}: "
+                        f"Cloudinary: {cloudinary_message}; Firebase: {firebase_message}")
+
+    return {
+        'project_id': payload.get('project_id'),
+        'folder_path': folder_path,
+        'cloudinary_deleted': cloudinary_deleted,
+        'firebase_deleted': firebase_deleted
+    }
+
+@job_handler(CHUNKED_UPLOAD_COMMIT_JOB)
+def commit_chunked_upload(payload):
+    """
+    Upload an assembled chunked upload to Firebase and attach it to the project
+
+    The spool is only removed once the URL has been recorded, so a failed
+    upload or database write is retried from the same parts.
+    """
+    project = Project.query.get(payload['project_id'])
+    if not project:
+        raise PermanentJobError('Project not found')
+
+    try:
+        session = chunked_uploads.get(payload['upload_id'], project.id)
+        success, result = chunked_uploads.commit(session, payload['folder_path'])
+    except ChunkedUploadError as e:
+        if e.status == 423:
+            # Another worker holds the commit lock - try again later
+            raise
+        # Missing, expired or corrupt parts - the client has to re-send them
+        raise PermanentJobError(str(e))
+    if not success:
+        raise Exception(f"Upload to storage failed: {result}")
+
+    kind = session.meta['kind']
+    column = 'zip_urls' if kind == 'zip_files' else 'video_urls'
+    try:
+        db.session.refresh(project, with_for_update=True)
+        existing = json.loads(getattr(project, column)) if getattr(project, column) else []
+        existing.append(result['url'])
+        setattr(project, column, json.dumps(existing))
+        db.session.commit()
+    except Exception:
+        # Don't leave an object in storage that no project points to
+        db.session.rollback()
+        delete_file_from_firebase(result['path'])
+        raise
+
+    chunked_uploads.discard(session)
+    invalidate_project(project.id, project.category_id)
+
+    return {
+        'project_id': project.id,
+        'upload_id': session.upload_id,
+        'uploaded': {kind: [result]}
+    }
@@ -0,0 +1,143 @@
+import base64
+import json
+import logging
+from collections import namedtuple
+from datetime import date, datetime
+from flask import request, current_app
+from sqlalchemy import and_, or_, func, text
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# Column a keyset is ordered by. `default` replaces NULLs (through COALESCE)
+# so nullable columns can take part in the comparison.
+KeysetKey = namedtuple('KeysetKey', ['column', 'descending', 'default'], defaults=[True, None])
+
+class InvalidCursor(ValueError):
+    pass
+
+def clamp_page_size(size):
+    """Clamp a requested page size to 1..MAX_PER_PAGE"""
+    return max(1, min(size, current_app.config.get('MAX_PER_PAGE', 100)))
+
+def get_per_page(default=10):
+    """Read ?per_page= clamped to 1..MAX_PER_PAGE"""
+    return clamp_page_size(request.args.get('per_page', default, type=int) or default)
+
+def get_count_mode(default='exact'):
+    """
+    Read ?count= - how the total for a listing is computed
+
+    Returns:
+        str: 'exact' (COUNT(*)), 'estimate' (planner estimate on PostgreSQL,
+        exact elsewhere) or 'none' (skip the count)
+    """
+    mode = request.args.get('count', default)
+    return mode if mode in ('exact', 'estimate', 'none') else default
+
+def use_cursor_pagination():
+    """Cursor mode is selected by passing ?cursor= (empty for the first page)"""
+    return 'cursor' in request.args
+
+def encode_cursor(values):
+    """Encode keyset values into an opaque, URL-safe cursor"""
+    payload = [
+        {'dt': value.isoformat()} if isinstance(value, datetime)
+        else {'d': value.isoformat()} if isinstance(value, date)
+        else value
+        for value in values
+    ]
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, key_count):
+    """Decode a cursor produced by encode_cursor()"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = []
+        for value in payload:
+            if isinstance(value, dict) and 'dt' in value:
+                value = datetime.fromisoformat(value['dt'])
+            elif isinstance(value, dict) and 'd' in value:
+                value = date.fromisoformat(value['d'])
+            values.append(value)
+    except Exception:
+        raise InvalidCursor('Invalid cursor')
+
+    if not isinstance(payload, list) or len(values) != key_count:
+        raise InvalidCursor('Invalid cursor')
+    return values
+
+def _key_expression(key):
+    if key.default is None:
+        return key.column
+    return func.coalesce(key.column, key.default)
+
+def _key_value(item, key):
+    value = getattr(item, key.column.key)
+    return key.default if value is None else value
+
+def count_query(query, mode):
+    """Total row count for a query according to the count mode (None when skipped)"""
+    if mode == 'none':
+        return None
+
+    if mode == 'estimate' and db.engine.dialect.name == 'postgresql':
+        try:
+            statement = query.order_by(None).statement.compile(
+                dialect=db.engine.dialect,
+                compile_kwargs={'literal_binds': True}
+            )
+            plan = db.session.execute(text(f"EXPLAIN (FORMAT JSON) {statement}")).scalar()
+            return int(plan[0]['Plan']['Plan Rows'])
+        except Exception as e:
+            logger.warning(f"Count estimate failed, using exact count: {str(e)}")
+
+    return query.order_by(None).count()
+
+def keyset_paginate(query, keys, per_page, count_mode='none'):
+    """
+    Paginate a query by keyset (seek method) instead of OFFSET
+
+    The page is read with WHERE (k1, k2, ...) < (cursor values) ORDER BY
+    k1, k2, ... LIMIT per_page + 1, so deep pages cost the same as the
+    first one. The last key must be unique (normally the primary key).
+
+    Args:
+        query: Query to paginate (any ORDER BY is replaced)
+        keys: List of KeysetKey
+        per_page: Page size
+        count_mode: See get_count_mode()
+
+    Returns:
+        tuple: (items, next_cursor, total) - next_cursor is None on the last
+        page, total is None when not requested
+
+    Raises:
+        InvalidCursor: if ?cursor= cannot be decoded
+    """
+    total = count_query(query, count_mode)
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor, len(keys))
+        clauses = []
+        for i, key in enumerate(keys):
+            expression = _key_expression(key)
+            equal = [_key_expression(keys[j]) == values[j] for j in range(i)]
+            beyond = expression < values[i] if key.descending else expression > values[i]
+            clauses.append(and_(*equal, beyond))
+        query = query.filter(or_(*clauses))
+
+    query = query.order_by(None).order_by(*[
+        _key_expression(key).desc() if key.descending else _key_expression(key).asc()
+        for key in keys
+    ])
+
+    items = query.limit(per_page + 1).all()
+    next_cursor = None
+    if len(items) > per_page:
+        items = items[:per_page]
+        next_cursor = encode_cursor([_key_value(items[-1], key) for key in keys])
+
+    return items, next_cursor, total
@@ -0,0 +1,183 @@
+import hashlib
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, wait, FIRST_COMPLETED
+from io import BytesIO
+from PyPDF2 import PdfReader
+
+logger = logging.getLogger(__name__)
+
+def extract_pdf(file_stream):
+    """
+    Extract text and page count from a PDF file stream
+
+    Returns:
+        tuple: (text, page_count) - text is None if the PDF can't be parsed
+    """
+    try:
+        reader = PdfReader(file_stream)
+        text = "\n".join([page.extract_text() or "" for page in reader.pages])
+        return text, len(reader.pages)
+    except Exception as e:
+        print(f"PDF parse error: {e}")
+        return None, 0
+
+def extract_pdf_bytes(pdf_content):
+    """
+    Extract text and page count from PDF bytes
+
+    Module-level so it can run in a worker process.
+    """
+    return extract_pdf(BytesIO(pdf_content))
+
+class PdfResult:
+    """Outcome of one document; `error` is set on download failure or timeout"""
+
+    __slots__ = ('index', 'content', 'content_hash', 'text', 'page_count', 'error')
+
+    def __init__(self, index):
+        self.index = index
+        self.content = None
+        self.content_hash = None
+        self.text = None
+        self.page_count = 0
+        self.error = None
+
+class PdfPipeline:
+    """
+    Concurrent fetch-and-parse for a batch of PDFs
+
+    Fetches (network I/O) run on a thread pool. Each PDF is handed to a
+    process pool for parsing as soon as its bytes arrive, so downloads and
+    CPU-bound PyPDF2 work overlap and parsing is not serialized by the GIL.
+    Each document gets doc_timeout seconds per stage and the whole batch
+    total_deadline seconds; documents that miss either are returned with
+    error='timeout'. A parse that times out keeps its pool process busy
+    until it finishes, but the request no longer waits for it.
+    """
+
+    def __init__(self, download_workers=8, parse_workers=2, doc_timeout=30, total_deadline=60):
+        self.download_workers = download_workers
+        self.parse_workers = parse_workers
+        self.doc_timeout = doc_timeout
+        self.total_deadline = total_deadline
+        self._lock = threading.Lock()
+        self._download_pool = None
+        self._parse_pool = None
+
+    def _pools(self):
+        with self._lock:
+            if self._download_pool is None:
+                self._download_pool = ThreadPoolExecutor(
+                    max_workers=self.download_workers, thread_name_prefix='pdf-download'
+                )
+            if self._parse_pool is None and self.parse_workers > 0:
+                try:
+                    # spawn: forking a multi-threaded web worker is not safe
+                    self._parse_pool = ProcessPoolExecutor(
+                        max_workers=self.parse_workers,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+                except Exception as e:
+                    logger.warning(f"PDF parse process pool unavailable, parsing in threads: {str(e)}")
+                    self.parse_workers = 0
+            return self._download_pool, self._parse_pool
+
+    def run(self, items, fetch):
+        """
+        Fetch and parse a batch of PDFs
+
+        Args:
+            items: Sequence of document descriptors (e.g. storage paths)
+            fetch: Callable(item) -> PDF bytes, or None if the document is missing
+
+        Returns:
+            list: PdfResult per item, in the order of `items`
+        """
+        results = [PdfResult(index) for index in range(len(items))]
+        if not items:
+            return results
+
+        download_pool, parse_pool = self._pools()
+        deadline = time.monotonic() + self.total_deadline
+        started = {}  # future -> (stage, index, started_at)
+
+        def submit_parse(index):
+            if parse_pool is not None:
+                future = parse_pool.submit(extract_pdf_bytes, results[index].content)
+            else:
+                future = download_pool.submit(extract_pdf_bytes, results[index].content)
+            started[future] = ('parse', index, time.monotonic())
+
+        for index, item in enumerate(items):
+            started[download_pool.submit(fetch, item)] = ('download', index, time.monotonic())
+
+        while started:
+            now = time.monotonic()
+            if now >= deadline:
+                break
+
+            # Wake up for whichever comes first: a completion, the oldest
+            # stage's per-document timeout or the batch deadline
+            next_timeout = min(started_at + self.doc_timeout for _, _, started_at in started.values())
+            done, _ = wait(list(started), timeout=max(0, min(next_timeout, deadline) - now), return_when=FIRST_COMPLETED)
+
+            for future in done:
+                stage, index, _ = started.pop(future)
+                result = results[index]
+                try:
+                    value = future.result()
+                except Exception as e:
+                    result.error = f"{stage} failed: {str(e)}"
+                    continue
+
+                if stage == 'download':
+                    if value is None:
+                        result.error = 'not found'
+                        continue
+                    result.content = value
+                    result.content_hash = hashlib.sha256(value).hexdigest()
+                    submit_parse(index)
+                else:
+                    result.text, result.page_count = value
+
+            now = time.monotonic()
+            for future, (stage, index, started_at) in list(started.items()):
+                if now - started_at >= self.doc_timeout:
+                    future.cancel()
+                    started.pop(future)
+                    results[index].error = 'timeout'
+
+        for future, (stage, index, _) in started.items():
+            future.cancel()
+            results[index].error = 'timeout'
+
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            if self._download_pool is not None:
+                self._download_pool.shutdown(wait=False, cancel_futures=True)
+                self._download_pool = None
+            if self._parse_pool is not None:
+                self._parse_pool.shutdown(wait=False, cancel_futures=True)
+                self._parse_pool = None
+
+def create_pdf_pipeline():
+    """
+    Build the PDF pipeline from environment variables
+
+    PDF_DOWNLOAD_WORKERS: concurrent downloads per web process (default 8)
+    PDF_PARSE_WORKERS: parser processes per web process, 0 = parse in threads (default 2)
+    PDF_DOC_TIMEOUT: seconds allowed per document and stage (default 30)
+    PDF_TOTAL_DEADLINE: seconds allowed for a whole batch (default 60)
+    """
+    return PdfPipeline(
+        download_workers=int(os.getenv('PDF_DOWNLOAD_WORKERS', 8)),
+        parse_workers=int(os.getenv('PDF_PARSE_WORKERS', 2)),
+        doc_timeout=float(os.getenv('PDF_DOC_TIMEOUT', 30)),
+        total_deadline=float(os.getenv('PDF_TOTAL_DEADLINE', 60))
+    )
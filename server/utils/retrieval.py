@@ -0,0 +1,310 @@
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+import numpy as np
+from models import db, ProjectTextIndex
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9][a-z0-9+#.\-]*[a-z0-9+#]|[a-z0-9]")
+STOPWORDS = frozenset("""
+a about above after again all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has
+have having he her here hers him his how i if in into is it its itself just me more most my no
+nor not of off on once only or other our ours out over own same she should so some such than
+that the their theirs them then there these they this those through to too under until up very
+was we were what when where which while who whom why will with would you your yours project
+""".split())
+
+def tokenize(text):
+    """Lowercase word tokens without stopwords (keeps terms like c++, node.js, c#)"""
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if '-' in token:
+            # "m-pesa" also matches "mpesa"
+            tokens.append(token.replace('-', ''))
+    return tokens
+
+def chunk_text(text, chunk_chars=1200, overlap=200):
+    """
+    Split text into chunks of about chunk_chars characters
+
+    Chunks end on a paragraph, sentence or word boundary where possible and
+    overlap by roughly `overlap` characters so an answer spanning a boundary
+    is still retrievable from one chunk.
+    """
+    text = re.sub(r'[ \t]+', ' ', text).strip()
+    chunks = []
+    start = 0
+    while start < len(text):
+        end = min(start + chunk_chars, len(text))
+        if end < len(text):
+            window = text[start:end]
+            for separator in ('\n\n', '. ', '\n', ' '):
+                cut = window.rfind(separator, chunk_chars // 2)
+                if cut != -1:
+                    end = start + cut + len(separator)
+                    break
+        chunk = text[start:end].strip()
+        if chunk:
+            chunks.append(chunk)
+        if end >= len(text):
+            break
+        # Step back for the overlap, starting on a word boundary
+        next_start = max(end - overlap, start + 1)
+        space = text.find(' ', next_start, end)
+        start = space + 1 if space != -1 else next_start
+    return chunks
+
+class BM25Index:
+    """
+    Okapi BM25 over a list of chunks, held as NumPy posting arrays
+
+    For every term the index keeps the ids of the chunks containing it and
+    the term frequency in each, so scoring a question only touches the
+    postings of its own terms.
+    """
+
+    K1 = 1.5
+    B = 0.75
+
+    def __init__(self, chunks, sources, terms, offsets, chunk_ids, frequencies, lengths):
+        self.chunks = chunks
+        self.sources = sources  # Document number of each chunk
+        self.terms = {term: i for i, term in enumerate(terms)}
+        self._term_list = terms
+        self.offsets = offsets
+        self.chunk_ids = chunk_ids
+        self.frequencies = frequencies
+        self.lengths = lengths
+        self.average_length = float(lengths.mean()) if len(lengths) else 0.0
+        document_frequency = np.diff(offsets).astype(np.float32)
+        self.idf = np.log1p((len(chunks) - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    @classmethod
+    def build(cls, documents, chunk_chars=1200, overlap=200):
+        """Index a list of document texts"""
+        chunks, sources, postings = [], [], {}
+        lengths = []
+        for source, text in enumerate(documents):
+            for chunk in chunk_text(text, chunk_chars, overlap):
+                tokens = tokenize(chunk)
+                chunk_id = len(chunks)
+                chunks.append(chunk)
+                sources.append(source)
+                lengths.append(len(tokens))
+                counts = {}
+                for token in tokens:
+                    counts[token] = counts.get(token, 0) + 1
+                for token, count in counts.items():
+                    postings.setdefault(token, []).append((chunk_id, count))
+
+        terms = sorted(postings)
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        chunk_ids, frequencies = [], []
+        for i, term in enumerate(terms):
+            for chunk_id, count in postings[term]:
+                chunk_ids.append(chunk_id)
+                frequencies.append(count)
+            offsets[i + 1] = len(chunk_ids)
+
+        return cls(
+            chunks, sources, terms, offsets,
+            np.asarray(chunk_ids, dtype=np.int32),
+            np.asarray(frequencies, dtype=np.float32),
+            np.asarray(lengths, dtype=np.float32)
+        )
+
+    def search(self, query, top_k=5):
+        """Return [(chunk_id, score)] for the best matching chunks, best first"""
+        scores = np.zeros(len(self.chunks), dtype=np.float32)
+        if not len(self.chunks):
+            return []
+
+        length_norm = self.K1 * (1 - self.B + self.B * self.lengths / max(self.average_length, 1.0))
+        for term in set(tokenize(query)):
+            term_id = self.terms.get(term)
+            if term_id is None:
+                continue
+            start, end = self.offsets[term_id], self.offsets[term_id + 1]
+            ids = self.chunk_ids[start:end]
+            tf = self.frequencies[start:end]
+            scores[ids] += self.idf[term_id] * tf * (self.K1 + 1) / (tf + length_norm[ids])
+
+        matched = np.flatnonzero(scores > 0)
+        if not len(matched):
+            return []
+        best = matched[np.argsort(-scores[matched], kind='stable')[:top_k]]
+        return [(int(chunk_id), float(scores[chunk_id])) for chunk_id in best]
+
+    def to_bytes(self):
+        buffer = io.BytesIO()
+        np.savez_compressed(
+            buffer,
+            text=np.frombuffer(json.dumps({
+                'chunks': self.chunks,
+                'sources': self.sources,
+                'terms': self._term_list
+            }).encode('utf-8'), dtype=np.uint8),
+            offsets=self.offsets,
+            chunk_ids=self.chunk_ids,
+            frequencies=self.frequencies,
+            lengths=self.lengths
+        )
+        return buffer.getvalue()
+
+    @classmethod
+    def from_bytes(cls, data):
+        with np.load(io.BytesIO(data), allow_pickle=False) as arrays:
+            text = json.loads(arrays['text'].tobytes().decode('utf-8'))
+            return cls(
+                text['chunks'], text['sources'], text['terms'],
+                arrays['offsets'], arrays['chunk_ids'], arrays['frequencies'], arrays['lengths']
+            )
+
+def corpus_hash(documents):
+    """Identity of a set of ProjectDocuments, in order"""
+    digest = hashlib.sha256()
+    for document in documents:
+        digest.update(f"{document.storage_path}:{document.content_hash}\n".encode('utf-8'))
+    return digest.hexdigest()
+
+class ProjectRetriever:
+    """
+    Picks the parts of a project's documentation relevant to a question
+
+    Each project's extracted PDF text is chunked and BM25-indexed once. The
+    index is persisted in project_text_indexes and kept in a small per-worker
+    LRU, and rebuilt whenever the project's documents change.
+    """
+
+    def __init__(self, chunk_chars=1200, overlap=200, top_k=5, context_chars=6000, cache_size=64):
+        self.chunk_chars = chunk_chars
+        self.overlap = overlap
+        self.top_k = top_k
+        self.context_chars = context_chars
+        self.cache_size = cache_size
+        self._lock = threading.Lock()
+        self._indexes = OrderedDict()  # project_id -> (corpus_hash, BM25Index)
+
+    def _cached(self, project_id, expected_hash):
+        with self._lock:
+            entry = self._indexes.get(project_id)
+            if entry is None or entry[0] != expected_hash:
+                return None
+            self._indexes.move_to_end(project_id)
+            return entry[1]
+
+    def _remember(self, project_id, expected_hash, index):
+        with self._lock:
+            self._indexes[project_id] = (expected_hash, index)
+            self._indexes.move_to_end(project_id)
+            while len(self._indexes) > self.cache_size:
+                self._indexes.popitem(last=False)
+
+    def get_index(self, project_id, documents):
+        """
+        Load or build the index for a project's extracted documents
+
+        Args:
+            project_id: Project the documents belong to
+            documents: Extracted ProjectDocuments, in display order
+        """
+        expected_hash = corpus_hash(documents)
+        index = self._cached(project_id, expected_hash)
+        if index is not None:
+            return index
+
+        row = db.session.get(ProjectTextIndex, project_id)
+        if row is not None and row.corpus_hash == expected_hash:
+            try:
+                index = BM25Index.from_bytes(row.data)
+            except Exception as e:
+                logger.warning(f"Discarding unreadable text index for project {project_id}: {str(e)}")
+                index = None
+
+        if index is None:
+            index = BM25Index.build(
+                [document.extracted_text for document in documents],
+                chunk_chars=self.chunk_chars,
+                overlap=self.overlap
+            )
+            try:
+                if row is None:
+                    row = ProjectTextIndex(project_id=project_id)
+                    db.session.add(row)
+                row.corpus_hash = expected_hash
+                row.chunk_count = len(index.chunks)
+                row.data = index.to_bytes()
+                db.session.commit()
+                print(f"✅ Indexed {len(documents)} documents ({len(index.chunks)} chunks) for project {project_id}")
+            except Exception as e:
+                # Another worker may have saved the same index first
+                db.session.rollback()
+                logger.warning(f"Could not save text index for project {project_id}: {str(e)}")
+
+        self._remember(project_id, expected_hash, index)
+        return index
+
+    def select_context(self, project_id, documents, question):
+        """
+        Documentation excerpts most relevant to a question
+
+        The top-k chunks (or, if nothing matches, the opening chunks) are
+        returned in document order, within the context_chars budget.
+
+        Returns:
+            str: Excerpts joined with separators, or None without documents
+        """
+        if not documents:
+            return None
+
+        index = self.get_index(project_id, documents)
+        ranked = [chunk_id for chunk_id, _ in index.search(question, self.top_k)]
+        if not ranked:
+            ranked = list(range(min(self.top_k, len(index.chunks))))
+
+        separator = "\n\n=== EXCERPT ===\n\n"
+        excerpts, used = {}, 0
+        for chunk_id in ranked:
+            excerpt = f"[Document {index.sources[chunk_id] + 1}]\n{index.chunks[chunk_id]}"
+            cost = len(excerpt) + (len(separator) if excerpts else 0)
+            if excerpts and used + cost > self.context_chars:
+                continue
+            excerpts[chunk_id] = excerpt[:self.context_chars]
+            used += cost
+
+        return separator.join(excerpts[chunk_id] for chunk_id in sorted(excerpts)) or None
+
+    def invalidate(self, project_id):
+        """Drop this worker's copy of a project's index (the stored one is checked by hash)"""
+        with self._lock:
+            self._indexes.pop(project_id, None)
+
+def create_project_retriever():
+    """
+    Build the project retriever from environment variables
+
+    RETRIEVAL_CHUNK_CHARS: target chunk size in characters (default 1200)
+    RETRIEVAL_CHUNK_OVERLAP: characters shared by consecutive chunks (default 200)
+    RETRIEVAL_TOP_K: chunks placed in a prompt (default 5)
+    RETRIEVAL_CONTEXT_CHARS: documentation budget per prompt (default 6000)
+    RETRIEVAL_INDEX_CACHE_SIZE: project indexes kept in memory per worker (default 64)
+    """
+    return ProjectRetriever(
+        chunk_chars=int(os.getenv('RETRIEVAL_CHUNK_CHARS', 1200)),
+        overlap=int(os.getenv('RETRIEVAL_CHUNK_OVERLAP', 200)),
+        top_k=int(os.getenv('RETRIEVAL_TOP_K', 5)),
+        context_chars=int(os.getenv('RETRIEVAL_CONTEXT_CHARS', 6000)),
+        cache_size=int(os.getenv('RETRIEVAL_INDEX_CACHE_SIZE', 64))
+    )
+
+project_retriever = create_project_retriever()
@@ -0,0 +1,103 @@
+import re
+import logging
+from sqlalchemy import or_, func, inspect, literal_column, text
+from models import db, Project
+
+logger = logging.getLogger(__name__)
+
+# Search objects created by migration a6d090d9cb26 (not mapped on Project)
+POSTGRES_SEARCH_COLUMN = 'search_vector'
+SQLITE_FTS_TABLE = 'projects_fts'
+
+# Relative weight of title / description / tech_stack for SQLite bm25()
+SQLITE_BM25_WEIGHTS = (10.0, 1.0, 5.0)
+
+# Only the first few words of a search are used
+MAX_SEARCH_TOKENS = 10
+
+_backends = {}
+
+def get_search_backend():
+    """
+    Determine which full-text search backend the current database supports
+
+    Returns:
+        str: 'postgresql', 'sqlite' or 'ilike' (database not migrated or
+        unsupported dialect)
+    """
+    engine = db.engine
+    key = str(engine.url)
+
+    if key not in _backends:
+        backend = 'ilike'
+        try:
+            inspector = inspect(engine)
+            if engine.dialect.name == 'postgresql':
+                columns = [column['name'] for column in inspector.get_columns('projects')]
+                if POSTGRES_SEARCH_COLUMN in columns:
+                    backend = 'postgresql'
+            elif engine.dialect.name == 'sqlite':
+                if SQLITE_FTS_TABLE in inspector.get_table_names():
+                    backend = 'sqlite'
+        except Exception as e:
+            logger.warning(f"Could not inspect database for search support: {str(e)}")
+
+        if backend == 'ilike':
+            logger.warning("Full-text search index not found, falling back to ILIKE search")
+        _backends[key] = backend
+
+    return _backends[key]
+
+def tokenize_search(term):
+    """Split a search string into lowercase word tokens safe to use in FTS queries"""
+    return re.findall(r'\w+', (term or '').lower())[:MAX_SEARCH_TOKENS]
+
+def search_projects(query, term):
+    """
+    Filter a Project query by a search term and order it by relevance
+
+    Every word must match (as a prefix) in the title, description or tech
+    stack. Relevance ordering is added before any ordering the caller applies
+    afterwards, which then only breaks ties.
+
+    Args:
+        query: Project query
+        term: Raw search string from the request
+
+    Returns:
+        Query: Filtered and ranked query
+    """
+    tokens = tokenize_search(term)
+    if not tokens:
+        return query
+
+    backend = get_search_backend()
+
+    if backend == 'postgresql':
+        search_vector = literal_column(f'projects.{POSTGRES_SEARCH_COLUMN}')
+        ts_query = func.to_tsquery('english', ' & '.join(f'{token}:*' for token in tokens))
+        return query.filter(search_vector.op('@@')(ts_query)).order_by(
+            func.ts_rank(search_vector, ts_query).desc()
+        )
+
+    if backend == 'sqlite':
+        weights = ', '.join(str(weight) for weight in SQLITE_BM25_WEIGHTS)
+        matches = text(
+            f"SELECT rowid AS project_id, bm25({SQLITE_FTS_TABLE}, {weights}) AS rank "
+            f"FROM {SQLITE_FTS_TABLE} WHERE {SQLITE_FTS_TABLE} MATCH :match"
+        ).bindparams(
+            match=' '.join(f'"{token}"*' for token in tokens)
+        ).columns(
+            project_id=db.Integer,
+            rank=db.Float
+        ).subquery('project_search')
+        # bm25() is lower for better matches
+        return query.join(matches, matches.c.project_id == Project.id).order_by(matches.c.rank)
+
+    return query.filter(
+        or_(
+            Project.title.ilike(f'%{term}%'),
+            Project.description.ilike(f'%{term}%'),
+            Project.tech_stack.ilike(f'%{term}%')
+        )
+    )
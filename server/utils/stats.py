@@ -0,0 +1,211 @@
+import logging
+import threading
+import time
+from sqlalchemy import event, func
+from sqlalchemy.orm import Session
+from models import db, Project, User, Role, Sales, Contribution, UserProject
+
+logger = logging.getLogger(__name__)
+
+# Model classes whose writes invalidate each group of counts
+STATS_GROUPS = {
+    'projects': (Project,),
+    'users': (User, Role),
+    'sales': (Sales,)
+}
+
+class AggregateStats:
+    """
+    Shared row counts for the admin views
+
+    Each group is computed with a single GROUP BY over its table and
+    memoized for STATS_CACHE_TTL seconds. Writes made through the ORM in
+    this worker drop the affected group immediately; writes in other
+    workers show up once the TTL expires.
+    """
+
+    def __init__(self):
+        self.ttl = 30
+        self._lock = threading.Lock()
+        self._entries = {}  # group -> (expires_at, counts)
+
+    def init_app(self, app):
+        self.ttl = app.config.get('STATS_CACHE_TTL', 30)
+
+    def project_counts(self):
+        """
+        Project counts by status and featured flag
+
+        Returns:
+            dict: {'total', 'featured', 'by_status': {status: count}}
+        """
+        return self._memoize('projects', self._count_projects)
+
+    def user_counts(self):
+        """
+        User counts by role
+
+        Returns:
+            dict: {'total', 'by_role': {role_name: count}}
+        """
+        return self._memoize('users', self._count_users)
+
+    def sales_counts(self):
+        """
+        Sales counts by status
+
+        Returns:
+            dict: {'total', 'by_status': {status: count}}
+        """
+        return self._memoize('sales', self._count_sales)
+
+    def invalidate(self, *groups):
+        """Drop memoized counts for the given groups (all when none given)"""
+        with self._lock:
+            for group in groups or list(self._entries):
+                self._entries.pop(group, None)
+
+    def _memoize(self, group, compute):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(group)
+            if entry is not None and entry[0] > now:
+                return entry[1]
+
+        counts = compute()
+        if self.ttl > 0:
+            with self._lock:
+                self._entries[group] = (now + self.ttl, counts)
+        return counts
+
+    def _count_projects(self):
+        rows = db.session.query(
+            Project.status,
+            Project.featured,
+            func.count(Project.id)
+        ).group_by(Project.status, Project.featured).all()
+
+        by_status = {}
+        featured = 0
+        for status, is_featured, count in rows:
+            by_status[status] = by_status.get(status, 0) + count
+            if is_featured:
+                featured += count
+
+        return {
+            'total': sum(by_status.values()),
+            'featured': featured,
+            'by_status': by_status
+        }
+
+    def _count_users(self):
+        rows = db.session.query(
+            Role.name,
+            func.count(User.id)
+        ).select_from(User).outerjoin(Role, User.role_id == Role.id).group_by(Role.name).all()
+
+        by_role = {role_name: count for role_name, count in rows}
+        return {
+            'total': sum(by_role.values()),
+            'by_role': by_role
+        }
+
+    def _count_sales(self):
+        rows = db.session.query(
+            Sales.status,
+            func.count(Sales.id)
+        ).group_by(Sales.status).all()
+
+        by_status = {status: count for status, count in rows}
+        return {
+            'total': sum(by_status.values()),
+            'by_status': by_status
+        }
+
+aggregate_stats = AggregateStats()
+
+def _contribution_query(*columns, project_id=None, user_id=None):
+    query = db.session.query(*columns).select_from(Contribution)
+    if project_id is not None or user_id is not None:
+        query = query.join(UserProject, Contribution.users_projects_id == UserProject.id)
+    if project_id is not None:
+        query = query.filter(UserProject.project_id == project_id)
+    if user_id is not None:
+        query = query.filter(UserProject.user_id == user_id)
+    return query
+
+def _contribution_totals_columns():
+    return (
+        func.coalesce(func.sum(Contribution.amount), 0),
+        func.count(Contribution.id)
+    )
+
+def contribution_totals(project_id=None, user_id=None):
+    """
+    Sum and count of contributions, computed in SQL
+
+    Args:
+        project_id: Only contributions to this project
+        user_id: Only contributions made by this user
+
+    Returns:
+        dict: {'total_amount', 'count'}
+    """
+    total_amount, count = _contribution_query(
+        *_contribution_totals_columns(), project_id=project_id, user_id=user_id
+    ).one()
+    return {'total_amount': total_amount, 'count': count}
+
+def contribution_totals_by_day(project_id=None, user_id=None, since=None):
+    """
+    Contribution sum and count per day, oldest first
+
+    Args:
+        project_id: Only contributions to this project
+        user_id: Only contributions made by this user
+        since: Optional first date to include
+
+    Returns:
+        list: [{'date', 'total_amount', 'count'}]
+    """
+    query = _contribution_query(
+        Contribution.date, *_contribution_totals_columns(),
+        project_id=project_id, user_id=user_id
+    )
+    if since is not None:
+        query = query.filter(Contribution.date >= since)
+
+    rows = query.group_by(Contribution.date).order_by(Contribution.date).all()
+    return [
+        {
+            'date': day.isoformat() if day else None,
+            'total_amount': total_amount,
+            'count': count
+        }
+        for day, total_amount, count in rows
+    ]
+
+def sales_totals_for_user(user_id):
+    """Order count and amount per status for one user as {status: {'amount', 'count'}}"""
+    rows = db.session.query(
+        Sales.status,
+        func.coalesce(func.sum(Sales.amount), 0),
+        func.count(Sales.id)
+    ).filter(Sales.user_id == user_id).group_by(Sales.status).all()
+
+    return {status: {'amount': amount, 'count': count} for status, amount, count in rows}
+
+def init_aggregate_stats(app):
+    """Initialize the aggregate stats memo with the Flask app"""
+    aggregate_stats.init_app(app)
+
+@event.listens_for(Session, 'after_flush')
+def invalidate_changed_stats(session, flush_context):
+    """Drop memoized counts for every group touched by the flush"""
+    changed = session.new | session.dirty | session.deleted
+    groups = [
+        group for group, models in STATS_GROUPS.items()
+        if any(isinstance(instance, models) for instance in changed)
+    ]
+    if groups:
+        aggregate_stats.invalidate(*groups)
@@ -0,0 +1,225 @@
+import hashlib
+import logging
+import os
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class DiskTextTier:
+    """
+    Extracted text stored as zlib-compressed files in a local directory
+
+    Every gunicorn worker on the host reads and writes the same directory,
+    and the files survive restarts. Expired files are ignored on read and
+    removed lazily.
+    """
+
+    def __init__(self, directory, ttl):
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, f"{digest}.txt.z")
+
+    def get(self, key):
+        path = self._path(key)
+        try:
+            if self.ttl > 0 and os.path.getmtime(path) + self.ttl < time.time():
+                os.remove(path)
+                return None
+            with open(path, 'rb') as f:
+                return zlib.decompress(f.read()).decode('utf-8')
+        except FileNotFoundError:
+            return None
+
+    def set(self, key, text):
+        # Write to a temporary file and rename so readers never see partial data
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(zlib.compress(text.encode('utf-8')))
+            os.replace(temp_path, self._path(key))
+        except Exception:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+class RedisTextTier:
+    """Extracted text shared by every worker and host through Redis"""
+
+    def __init__(self, url, ttl, prefix='ai_text:'):
+        import redis  # Optional dependency, only needed for the shared tier
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return zlib.decompress(value).decode('utf-8') if value is not None else None
+
+    def set(self, key, text):
+        value = zlib.compress(text.encode('utf-8'))
+        if self.ttl > 0:
+            self.client.setex(self.prefix + key, self.ttl, value)
+        else:
+            self.client.set(self.prefix + key, value)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+class TextCache:
+    """
+    Two-tier cache for text extracted from PDFs
+
+    The first tier is an in-process LRU bounded by the UTF-8 size of the
+    cached text (max_bytes) with a per-entry TTL. The optional second tier
+    (DiskTextTier or RedisTextTier) is shared between workers and survives
+    restarts; hits there are promoted into memory.
+    """
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, ttl=24 * 3600, shared_tier=None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.shared_tier = shared_tier
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, text, size)
+        self._bytes = 0
+        self._metrics = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'shared_errors': 0
+        }
+
+    def get(self, key):
+        """Return cached text for a key, or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] >= time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._metrics['hits'] += 1
+                    return entry[1]
+                self._remove(key)
+                self._metrics['expirations'] += 1
+
+        text = None
+        if self.shared_tier is not None:
+            try:
+                text = self.shared_tier.get(key)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"Shared text cache read failed: {str(e)}")
+
+        if text is None:
+            self._count('misses')
+            return None
+
+        self._count('shared_hits')
+        self._set_local(key, text)
+        return text
+
+    def set(self, key, text):
+        """Cache text in memory and in the shared tier"""
+        if text is None:
+            return
+        self._set_local(key, text)
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.set(key, text)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"Shared text cache write failed: {str(e)}")
+
+    def pop(self, key):
+        """Remove a key from both tiers"""
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.delete(key)
+            except Exception as e:
+                self._count('shared_errors')
+                logger.warning(f"Shared text cache delete failed: {str(e)}")
+
+    def stats(self):
+        """Hit/miss/eviction counters and current memory usage for this worker"""
+        with self._lock:
+            lookups = self._metrics['hits'] + self._metrics['shared_hits'] + self._metrics['misses']
+            return {
+                **self._metrics,
+                'hit_rate': round((self._metrics['hits'] + self._metrics['shared_hits']) / lookups, 4) if lookups else None,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'ttl': self.ttl,
+                'shared_tier': type(self.shared_tier).__name__ if self.shared_tier is not None else None
+            }
+
+    def _set_local(self, key, text):
+        size = len(text.encode('utf-8'))
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                # Larger than the whole budget - leave it to the shared tier
+                return
+            self._entries[key] = (time.monotonic() + self.ttl if self.ttl > 0 else float('inf'), text, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self._metrics['evictions'] += 1
+
+    def _remove(self, key):
+        _, _, size = self._entries.pop(key)
+        self._bytes -= size
+
+    def _count(self, metric):
+        with self._lock:
+            self._metrics[metric] += 1
+
+def create_text_cache():
+    """
+    Build the AI text cache from environment variables
+
+    AI_TEXT_CACHE_MAX_MB: in-memory budget per worker (default 64)
+    AI_TEXT_CACHE_TTL: entry TTL in seconds, 0 = no expiry (default 86400)
+    AI_TEXT_CACHE_URL: redis:// URL for a shared tier across hosts
+    AI_TEXT_CACHE_DIR: directory for a shared on-disk tier (used when no URL is set)
+    """
+    max_bytes = int(float(os.getenv('AI_TEXT_CACHE_MAX_MB', 64)) * 1024 * 1024)
+    ttl = int(os.getenv('AI_TEXT_CACHE_TTL', 24 * 3600))
+
+    shared_tier = None
+    cache_url = os.getenv('AI_TEXT_CACHE_URL')
+    cache_dir = os.getenv('AI_TEXT_CACHE_DIR')
+    if cache_url:
+        try:
+            shared_tier = RedisTextTier(cache_url, ttl)
+            print("✅ Shared AI text cache enabled (Redis)")
+        except Exception as e:
+            print(f"⚠️ Shared AI text cache unavailable, using in-process cache only: {e}")
+    elif cache_dir:
+        try:
+            shared_tier = DiskTextTier(cache_dir, ttl)
+            print(f"✅ Shared AI text cache enabled ({cache_dir})")
+        except Exception as e:
+            print(f"⚠️ AI text cache directory unavailable, using in-process cache only: {e}")
+
+    return TextCache(max_bytes=max_bytes, ttl=ttl, shared_tier=shared_tier)
@@ -0,0 +1,99 @@
+import hashlib
+import io
+import os
+import tempfile
+
+class UploadTooLarge(Exception):
+    """Raised when an upload exceeds the buffer's size cap"""
+    pass
+
+class _PositionalReader(io.RawIOBase):
+    """Independent read-only view of a file descriptor, using pread"""
+
+    def __init__(self, fd, size):
+        self._fd = fd
+        self._size = size
+        self._position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self._position
+        elif whence == io.SEEK_END:
+            offset += self._size
+        self._position = max(0, offset)
+        return self._position
+
+    def readinto(self, buffer):
+        data = os.pread(self._fd, min(len(buffer), max(0, self._size - self._position)), self._position)
+        buffer[:len(data)] = data
+        self._position += len(data)
+        return len(data)
+
+class UploadBuffer:
+    """
+    Reads an upload stream once, hashing it and enforcing a size cap
+
+    Content up to spool_bytes stays in memory; larger uploads spill to an
+    anonymous temporary file. reader() hands out independent seekable views
+    of the same buffer, so hashing, parsing and the storage upload can all
+    use it (even concurrently) without reading the request stream again.
+    """
+
+    CHUNK_SIZE = 64 * 1024
+
+    def __init__(self, stream, max_bytes, spool_bytes=1024 * 1024):
+        digest = hashlib.sha256()
+        memory = bytearray()
+        self._file = None
+        self.size = 0
+
+        while True:
+            chunk = stream.read(self.CHUNK_SIZE)
+            if not chunk:
+                break
+            self.size += len(chunk)
+            if self.size > max_bytes:
+                self.close()
+                raise UploadTooLarge(f"Upload exceeds {max_bytes // (1024 * 1024)}MB")
+            digest.update(chunk)
+            if self._file is None and len(memory) + len(chunk) > spool_bytes:
+                self._file = tempfile.TemporaryFile()
+                self._file.write(memory)
+                memory = None
+            if self._file is not None:
+                self._file.write(chunk)
+            else:
+                memory.extend(chunk)
+
+        if self._file is not None:
+            self._file.flush()
+            self._memory = None
+        else:
+            self._memory = bytes(memory)
+        self.content_hash = digest.hexdigest()
+
+    def reader(self):
+        """A new file-like object positioned at the start of the content"""
+        if self._file is None:
+            return io.BytesIO(self._memory)
+        return io.BufferedReader(_PositionalReader(self._file.fileno(), self.size))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
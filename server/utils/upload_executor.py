@@ -0,0 +1,88 @@
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app, has_app_context
+
+logger = logging.getLogger(__name__)
+
+# Marks executor threads, so nested run() calls don't wait on their own pool
+_task_state = threading.local()
+
+class UploadExecutor:
+    """
+    Runs storage uploads concurrently with two bounds
+
+    max_workers threads are shared by every request in the process, so
+    total upload concurrency per worker stays fixed no matter how many
+    requests upload at once. A single request has at most per_request
+    uploads in flight, so one large submission can't take every thread.
+    Tasks run inside the caller's app context. run() called from inside a
+    task runs its tasks inline instead of queueing behind itself.
+    """
+
+    def __init__(self, max_workers=8, per_request=4):
+        self.max_workers = max_workers
+        self.per_request = per_request
+        self._lock = threading.Lock()
+        self._pool = None
+
+    def init_app(self, app):
+        self.max_workers = app.config.get('UPLOAD_MAX_WORKERS', 8)
+        self.per_request = app.config.get('UPLOAD_MAX_PER_REQUEST', 4)
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='upload')
+            return self._pool
+
+    def run(self, tasks):
+        """
+        Run callables concurrently and return their results in order
+
+        Args:
+            tasks: List of zero-argument callables
+
+        Returns:
+            list: Each task's return value, or the exception it raised
+        """
+        if len(tasks) <= 1 or self.per_request <= 1 or getattr(_task_state, 'active', False):
+            return [self._call(task) for task in tasks]
+
+        app = current_app._get_current_object() if has_app_context() else None
+        gate = threading.BoundedSemaphore(self.per_request)
+
+        def call(task):
+            _task_state.active = True
+            try:
+                if app is None:
+                    return self._call(task)
+                with app.app_context():
+                    return self._call(task)
+            finally:
+                _task_state.active = False
+                gate.release()
+
+        pool = self._get_pool()
+        futures = []
+        for task in tasks:
+            gate.acquire()
+            futures.append(pool.submit(call, task))
+        return [future.result() for future in futures]
+
+    def _call(self, task):
+        try:
+            return task()
+        except Exception as e:
+            logger.error(f"Upload task failed: {str(e)}")
+            return e
+
+    def map(self, fn, items):
+        """run() for fn applied to every item"""
+        return self.run([lambda item=item: fn(item) for item in items])
+
+upload_executor = UploadExecutor()
+
+def init_upload_executor(app):
+    """Initialize the shared upload executor with the Flask app"""
+    upload_executor.init_app(app)
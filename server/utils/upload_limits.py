@@ -0,0 +1,104 @@
+import io
+from functools import wraps
+from flask import request, current_app
+
+# Room for multipart boundaries and form fields around the file itself
+MULTIPART_OVERHEAD = 64 * 1024
+
+class UploadLimitExceeded(Exception):
+    """Raised by CountingStream once more than its limit has been read"""
+
+    def __init__(self, limit):
+        super().__init__(f"File too large. Maximum size: {limit // (1024 * 1024)}MB")
+        self.limit = limit
+
+class CountingStream(io.RawIOBase):
+    """
+    Read-only wrapper that counts bytes and enforces a size limit
+
+    The storage client reads the upload through this wrapper, so an
+    oversized file is stopped as soon as the limit is crossed instead of
+    being measured up front by seeking to the end.
+    """
+
+    def __init__(self, stream, limit, name=None):
+        self._stream = stream
+        self._seekable = getattr(stream, 'seekable', lambda: False)()
+        self._start = stream.tell() if self._seekable else 0
+        self._position = 0
+        self.limit = limit
+        self.bytes_read = 0
+        self.name = name or getattr(stream, 'name', None)
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return self._seekable
+
+    def tell(self):
+        return self._position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        # Resumable uploads seek back to re-send a failed chunk
+        if not self._seekable or whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('CountingStream only seeks to absolute positions')
+        self._stream.seek(self._start + offset)
+        self._position = offset
+        return offset
+
+    def _count(self, data):
+        self._position += len(data)
+        self.bytes_read = max(self.bytes_read, self._position)
+        if self.bytes_read > self.limit:
+            raise UploadLimitExceeded(self.limit)
+        return data
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            # Read in pieces so at most limit + one piece is ever buffered
+            chunks = []
+            while True:
+                chunk = self.read(1024 * 1024)
+                if not chunk:
+                    return b''.join(chunks)
+                chunks.append(chunk)
+        return self._count(self._stream.read(size))
+
+    def readinto(self, buffer):
+        data = self.read(len(buffer))
+        buffer[:len(data)] = data
+        return len(data)
+
+def limit_content_length(max_bytes):
+    """
+    Reject a request whose Content-Length is over max_bytes (plus multipart
+    overhead) before its body is read
+
+    Args:
+        max_bytes: Int, or callable returning the limit for the current request
+    """
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            limit = max_bytes() if callable(max_bytes) else max_bytes
+            max_content_length = current_app.config.get('MAX_CONTENT_LENGTH')
+            if max_content_length:
+                limit = min(limit, max_content_length)
+            if request.content_length is not None and request.content_length > limit + MULTIPART_OVERHEAD:
+                return {'error': f"Upload too large. Maximum size: {limit // (1024 * 1024)}MB"}, 413
+            return fn(*args, **kwargs)
+        return decorator
+    return wrapper
+
+def init_upload_limits(app):
+    """
+    Reject requests whose Content-Length is over MAX_CONTENT_LENGTH before
+    any of the body is read (Werkzeug enforces it again while streaming
+    bodies that don't declare a length)
+    """
+    @app.before_request
+    def reject_oversized_requests():
+        max_content_length = app.config.get('MAX_CONTENT_LENGTH')
+        if max_content_length and request.content_length and request.content_length > max_content_length:
+            return {'error': f"Upload too large. Maximum request size: {max_content_length // (1024 * 1024)}MB"}, 413